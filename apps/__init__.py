@@ -1,10 +1,12 @@
 import os
 
 from flask import Flask
-from apps.api import api_bp
+from apps.api import api, api_bp
+from apps.commands import register_commands
 from apps.config import Config
 from apps.models.models import Role
-from extensions import db, jwt
+from apps.services import passwords
+from extensions import cache, db, jwt, metrics, pool_metrics, replica_router, request_timing, slow_query_log
 from extensions.migrate import migrate
 
 
@@ -12,15 +14,34 @@ from extensions.migrate import migrate
 
 
 def register_extensions(app):
+    # Первым: время запроса в метриках считается от первого обработчика before_request
+    metrics.init_app(app)
+    pool_metrics.init_app(app)
     db.init_app(app)
+    replica_router.init_app(app)
+    request_timing.init_app(app)
+    slow_query_log.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    cache.init_app(app)
+    # Кэш общий для всех запросов процесса — не наполняем его из отстающей реплики
+    cache.loader_context = replica_router.primary
 
 
 def register_blueprints(app):
     app.register_blueprint(api_bp)
 
 
+def register_metrics(app):
+    metrics.add_api(api)
+    metrics.add_stats(
+        'eventer_db_pool', lambda: pool_metrics.stats_by_bind(db.engines), ['checkouts', 'timeouts'], label='bind',
+    )
+    metrics.add_stats('eventer_reference_cache', cache.stats, ['hits', 'misses'])
+    metrics.add_stats('eventer_password_hashing', passwords.pool.stats, ['calls', 'rejected'])
+    metrics.add_stats('eventer_slow_queries', lambda: {'logged': slow_query_log.total}, ['logged'])
+
+
 def configure_database(app):
     @app.before_first_request
     def initialize_database():
@@ -41,5 +62,7 @@ def create_app(testing=False):
         app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('TEST_DATABASE_URL')
     register_extensions(app)
     register_blueprints(app)
+    register_metrics(app)
     configure_database(app)
+    register_commands(app)
     return app
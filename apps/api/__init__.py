@@ -1,13 +1,18 @@
 """API blueprint configuration."""
 from flask import Blueprint
 from flask_restx import Api
+from flask_restx.representations import output_json
+
+from extensions import request_timing
 
 from .mock_data import namespace as mock_data_ns
 from .auth import namespace as auth_ns
 from .booking import namespace as booking_ns
+from .cache import namespace as cache_ns
 from .category import namespace as category_ns
 from .city import namespace as city_ns
 from .country import namespace as country_ns
+from .database import namespace as database_ns
 from .event import namespace as event_ns
 from .event_dates import namespace as event_dates_ns
 from .event_donation import namespace as event_donation_ns
@@ -48,5 +53,12 @@ api.add_namespace(event_dates_ns, path="/event_dates")
 api.add_namespace(event_donation_ns, path="/event_donation")
 api.add_namespace(feedback_ns, path="/feedback")
 api.add_namespace(favourite_organizer_ns, path="/favourite_organizer")
+api.add_namespace(cache_ns, path="/cache")
+api.add_namespace(database_ns, path="/database")
 
 
+@api.representation('application/json')
+def timed_output_json(data, code, headers=None):
+    # Кодирование ответа в JSON — тоже время сериализации
+    with request_timing.measure('marshal'):
+        return output_json(data, code, headers)
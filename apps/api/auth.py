@@ -1,13 +1,13 @@
 from datetime import timedelta
 
-from flask import jsonify
+from flask import abort, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, create_refresh_token
-from flask_restx import Resource, Namespace
+from flask_restx import Resource, Namespace, fields
 from flask_restx.inputs import email
 from flask_restx.reqparse import RequestParser
-from werkzeug.security import check_password_hash
 
 from apps.models import User
+from apps.services import passwords
 from extensions import db
 
 namespace = Namespace(name='auth')
@@ -24,6 +24,16 @@ login_parser.add_argument(
 )
 
 
+hashing_stats_response_model = namespace.model('Hashing stats response', {
+    'workers': fields.Integer(),
+    'calls': fields.Integer(),
+    'rejected': fields.Integer(),
+    'queueAvgMs': fields.Float(),
+    'queueMaxMs': fields.Float(),
+    'hashAvgMs': fields.Float(),
+})
+
+
 @namespace.route("/login", endpoint="auth_login")
 class LoginUser(Resource):
     @namespace.expect(login_parser)
@@ -32,11 +42,19 @@ class LoginUser(Resource):
         email = data['email']
         password = data['password']
         user = db.session.query(User).filter_by(email=email).first()
+        # Без пользователя хэш не считаем вовсе
         if not user:
             return {'message': 'User not found'}, 404
 
-        if not check_password_hash(user.password, password):
-            return {'message': 'Invalid password'}, 401
+        try:
+            if not passwords.check_password(user.password, password):
+                return {'message': 'Invalid password'}, 401
+            # Пароль известен только сейчас — заодно перехэшируем его с текущими параметрами
+            if passwords.needs_rehash(user.password):
+                user.password = passwords.hash_password(password)
+                db.session.commit()
+        except passwords.HashingBusy as e:
+            abort(503, str(e))
 
         # Создаём токен доступа
         access_token = create_access_token(
@@ -56,6 +74,15 @@ class LoginUser(Resource):
         return response
 
 
+@namespace.route('/hashing/stats')
+@namespace.doc(security='Bearer', )
+class HashingStats(Resource):
+    @namespace.marshal_with(hashing_stats_response_model)
+    @jwt_required()
+    def get(self):
+        return passwords.pool.stats()
+
+
 @namespace.route('/refresh_token')
 @namespace.doc(security='Bearer', )
 class JwtRefresh(Resource):
@@ -1,10 +1,17 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required
-from flask_restx.reqparse import RequestParser
-from flask import request
+
+from flask import abort, request
+from sqlalchemy.exc import IntegrityError
 
 from apps.api.event import event_response_model
-from apps.models import Booking, Event, User, EventDates, TicketTypeEnum, Ticket
+from apps.models import Booking, Event, User, EventDates, TicketTypeEnum
+from apps.services import seats
+from apps.utils.export import EXPORT_FORMATS, export_response
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from apps.utils.serializers import serialize
+from apps.utils.sparse import FIELDS_ARG, fields_parser, fieldset
 from extensions import db
 
 namespace = Namespace(name='booking', description='Booking operations')
@@ -37,21 +44,27 @@ booking_response_model = namespace.model('Booking response', {
     'event': fields.Nested(event_response_model),
     'tickets': fields.List(fields.Nested(ticket_expect_model))
 })
+booking_page_model = page_model(namespace, booking_response_model)
 
-booking_parser = RequestParser(bundle_errors=True)
+booking_parser = pagination_parser.copy()
 booking_parser.add_argument(name="eventDatesId", type=int, location='args')
 booking_parser.add_argument(name="eventId", type=int, location='args')
 booking_parser.add_argument(name="userId", type=int, location='args')
+booking_parser.add_argument(name="format", type=str, choices=EXPORT_FORMATS, location='args')
+booking_parser.add_argument(name=FIELDS_ARG, type=str, location='args')
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class BookingList(Resource):
-    @namespace.marshal_list_with(booking_response_model)
+    @namespace.response(
+        200, 'Bookings list, a Booking page when cursor or limit is given, or an NDJSON/CSV export', booking_page_model
+    )
     @namespace.expect(booking_parser)
     @jwt_required()
     def get(self):
-        bookings = Booking.query
+        selected = fieldset(booking_response_model, booking_page_model)
+        bookings = Booking.query.options(*loader_options(selected.model, Booking, only=selected.sparse))
 
         event_id = request.args.get('eventId')
         user_id = request.args.get('userId')
@@ -60,8 +73,11 @@ class BookingList(Resource):
             bookings = bookings.filter_by(eventId=int(event_id))
         if user_id:
             bookings = bookings.filter_by(userId=int(user_id))
-        bookings = bookings.all()
-        return bookings
+
+        export_format = booking_parser.parse_args()['format']
+        if export_format:
+            return export_response(bookings.order_by(Booking.id), selected.model, export_format, 'bookings')
+        return paginate_list(bookings, [Booking.id], selected.model, selected.page)
 
     @namespace.expect(booking_expect_model)
     @namespace.marshal_with(booking_response_model, code=201)
@@ -75,19 +91,34 @@ class BookingList(Resource):
         event_dates_id: int = ticket['eventDatesId']
 
         User.query.get_or_404(user_id, 'User not found')
-        EventDates.query.get_or_404(event_dates_id, 'EventDates not found')
+        event_dates = EventDates.query.get_or_404(event_dates_id, 'EventDates not found')
+        if event_dates.eventId != event_id:
+            abort(400, 'EventDates does not belong to the event')
 
         booking_exist = Booking.query.filter_by(userId=user_id, eventId=event_id).first()
 
         if booking_exist is None:
             new_booking = Booking(**data)
-            db.session.add(new_booking)
-            db.session.flush()
+            try:
+                # Параллельный запрос мог создать ту же бронь: уникальный индекс (userId, eventId) не даст второй
+                with db.session.begin_nested():
+                    db.session.add(new_booking)
+            except IntegrityError:
+                new_booking = Booking.query.filter_by(userId=user_id, eventId=event_id).one()
         else:
             new_booking = booking_exist
 
-        ticket = Ticket(**ticket, bookingId=new_booking.id)
-        db.session.add(ticket)
+        # Место резервируем последним, чтобы блокировка строки eventDates держалась до коммита как можно меньше
+        try:
+            seats.allocate(
+                event_dates_id, new_booking.id, ticket.get('ticketType') or TicketTypeEnum.NUMERIC, ticket.get('seat')
+            )
+        except seats.InvalidSeat as e:
+            db.session.rollback()
+            abort(400, str(e))
+        except seats.SeatError as e:
+            db.session.rollback()
+            abort(409, str(e))
 
         db.session.commit()
         return new_booking, 201
@@ -97,11 +128,15 @@ class BookingList(Resource):
 @namespace.param('id', 'The unique identifier of a Booking')
 @namespace.doc(security='Bearer', )
 class BookingApi(Resource):
-    @namespace.marshal_with(booking_response_model)
+    @namespace.response(200, 'Success', booking_response_model)
+    @namespace.expect(fields_parser)
     @jwt_required()
     def get(self, id):
-        booking = Booking.query.get_or_404(id, 'Booking not found')
-        return booking
+        selected = fieldset(booking_response_model)
+        booking = Booking.query.options(
+            *loader_options(selected.model, Booking, only=selected.sparse)
+        ).get_or_404(id, 'Booking not found')
+        return serialize(booking, selected.model)
 
     @namespace.expect(booking_expect_model)
     @namespace.marshal_with(booking_response_model)
@@ -132,6 +167,7 @@ class BookingApi(Resource):
     @jwt_required()
     def delete(self, id):
         booking = Booking.query.get_or_404(id, 'Booking not found')
+        # Места билетов брони возвращает событие маппера в apps.services.seats
         db.session.delete(booking)
         db.session.commit()
         return '', 204
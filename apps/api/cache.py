@@ -0,0 +1,23 @@
+from flask_jwt_extended import jwt_required
+from flask_restx import Namespace, Resource, fields
+
+from extensions import cache
+
+namespace = Namespace(name='cache', description='Reference data cache')
+
+cache_stats_response_model = namespace.model('Cache stats response', {
+    'hits': fields.Integer(),
+    'misses': fields.Integer(),
+    'hitRatio': fields.Float(),
+    'size': fields.Integer(),
+    'ttl': fields.Integer(),
+})
+
+
+@namespace.route('/stats')
+@namespace.doc(security='Bearer', )
+class CacheStats(Resource):
+    @namespace.marshal_with(cache_stats_response_model)
+    @jwt_required()
+    def get(self):
+        return cache.stats()
@@ -1,8 +1,11 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required
 
 from apps.models import Category
-from extensions import db
+from apps.utils.etag import etag
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from extensions import cache, db
 
 namespace = Namespace(name='category', description='Categories operations')
 
@@ -15,16 +18,21 @@ category_response_model = namespace.model('Category response', {
     'id': fields.Integer(),
     'name': fields.String()
 })
+category_page_model = page_model(namespace, category_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class CategoryList(Resource):
-    @namespace.marshal_list_with(category_response_model)
+    @namespace.response(200, 'Categories list, or a Category page when cursor or limit is given', category_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
+    @etag('category')
     def get(self):
-        categories = Category.query.all()
-        return categories
+        return paginate_list(
+            Category.query.options(*loader_options(category_response_model, Category)), [Category.id],
+            category_response_model, category_page_model, cache_namespace='category',
+        )
 
     @namespace.expect(category_model)
     @namespace.marshal_with(category_response_model, code=201)
@@ -34,6 +42,7 @@ class CategoryList(Resource):
         new_category = Category(**data)
         db.session.add(new_category)
         db.session.commit()
+        cache.invalidate('category')
         return new_category, 201
 
 
@@ -41,11 +50,16 @@ class CategoryList(Resource):
 @namespace.param('id', 'The unique identifier of a Category')
 @namespace.doc(security='Bearer', )
 class CategoryApi(Resource):
-    @namespace.marshal_with(category_response_model)
+    @namespace.response(200, 'Category', category_response_model)
     @jwt_required()
+    @etag('category')
     def get(self, id):
-        category = Category.query.get_or_404(id, 'Category not found')
-        return category
+        return cache.get_or_set('category', id, lambda: marshal(
+            Category.query.options(
+                *loader_options(category_response_model, Category)
+            ).get_or_404(id, 'Category not found'),
+            category_response_model,
+        ))
 
     @namespace.expect(category_model)
     @namespace.marshal_with(category_response_model)
@@ -59,6 +73,7 @@ class CategoryApi(Resource):
             setattr(category, key, value)
 
         db.session.commit()
+        cache.invalidate('category')
         return category
 
     @namespace.response(204, 'Category deleted')
@@ -67,4 +82,5 @@ class CategoryApi(Resource):
         category = Category.query.get_or_404(id, 'Category not found')
         db.session.delete(category)
         db.session.commit()
+        cache.invalidate('category')
         return '', 204
@@ -1,9 +1,14 @@
-from flask_restx import Namespace, Resource, fields
+from flask import abort
+from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 
 from apps.api.state import state_response_model
 from apps.models import City, State
-from extensions import db
+from apps.services.locations import locations
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from extensions import cache, db
 
 namespace = Namespace(name='city', description='City operations')
 
@@ -18,16 +23,20 @@ city_response_model = namespace.model('City response', {
     'name': fields.String(),
     'state': fields.Nested(state_response_model)
 })
+city_page_model = page_model(namespace, city_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class CityList(Resource):
-    @namespace.marshal_list_with(city_response_model)
+    @namespace.response(200, 'Cities list, or a City page when cursor or limit is given', city_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        cities = City.query.all()
-        return cities
+        return paginate_list(
+            City.query.options(*loader_options(city_response_model, City)), [City.id],
+            city_response_model, city_page_model, cache_namespace='city',
+        )
 
     @namespace.expect(city_model)
     @namespace.marshal_with(city_response_model, code=201)
@@ -37,7 +46,12 @@ class CityList(Resource):
         State.query.get_or_404(data['stateId'], 'State not found')
         new_city = City(**data)
         db.session.add(new_city)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'City with this name already exists in the state')
+        cache.invalidate('city')
         return new_city, 201
 
 
@@ -45,11 +59,13 @@ class CityList(Resource):
 @namespace.param('id', 'The unique identifier of a City')
 @namespace.doc(security='Bearer', )
 class CityApi(Resource):
-    @namespace.marshal_with(city_response_model)
+    @namespace.response(200, 'City', city_response_model)
     @jwt_required()
     def get(self, id):
-        city = City.query.get_or_404(id, 'City not found')
-        return city
+        return cache.get_or_set('city', id, lambda: marshal(
+            City.query.options(*loader_options(city_response_model, City)).get_or_404(id, 'City not found'),
+            city_response_model,
+        ))
 
     @namespace.expect(city_model)
     @namespace.marshal_with(city_response_model)
@@ -67,7 +83,13 @@ class CityApi(Resource):
             if key not in ['stateId']:
                 setattr(city, key, value)
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'City with this name already exists in the state')
+        cache.invalidate('city')
+        locations.forget()
         return city
 
     @namespace.response(204, 'City deleted')
@@ -76,4 +98,6 @@ class CityApi(Resource):
         city = City.query.get_or_404(id, 'City not found')
         db.session.delete(city)
         db.session.commit()
+        cache.invalidate('city')
+        locations.forget()
         return '', 204
@@ -1,8 +1,13 @@
-from flask_restx import Namespace, Resource, fields
+from flask import abort
+from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 
 from apps.models import Country
-from extensions import db
+from apps.services.locations import locations
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from extensions import cache, db
 
 namespace = Namespace(name='country', description='Countries operations')
 
@@ -15,16 +20,20 @@ country_response_model = namespace.model('Country response', {
     'id': fields.Integer(),
     'name': fields.String(),
 })
+country_page_model = page_model(namespace, country_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class CountryList(Resource):
-    @namespace.marshal_list_with(country_response_model)
+    @namespace.response(200, 'Countries list, or a Country page when cursor or limit is given', country_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        countries = Country.query.all()
-        return countries
+        return paginate_list(
+            Country.query.options(*loader_options(country_response_model, Country)), [Country.id],
+            country_response_model, country_page_model, cache_namespace='country',
+        )
 
     @namespace.expect(country_model)
     @namespace.marshal_with(country_response_model, code=201)
@@ -33,7 +42,12 @@ class CountryList(Resource):
         data = namespace.payload
         new_country = Country(**data)
         db.session.add(new_country)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'Country with this name already exists')
+        cache.invalidate('country', 'state', 'city')
         return new_country, 201
 
 
@@ -41,11 +55,13 @@ class CountryList(Resource):
 @namespace.param('id', 'The unique identifier of a Country')
 @namespace.doc(security='Bearer', )
 class CountryApi(Resource):
-    @namespace.marshal_with(country_response_model)
+    @namespace.response(200, 'Country', country_response_model)
     @jwt_required()
     def get(self, id):
-        country = Country.query.get_or_404(id, 'Country not found')
-        return country
+        return cache.get_or_set('country', id, lambda: marshal(
+            Country.query.options(*loader_options(country_response_model, Country)).get_or_404(id, 'Country not found'),
+            country_response_model,
+        ))
 
     @namespace.expect(country_model)
     @namespace.marshal_with(country_response_model)
@@ -58,7 +74,13 @@ class CountryApi(Resource):
         for key, value in data.items():
             setattr(country, key, value)
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'Country with this name already exists')
+        cache.invalidate('country', 'state', 'city')
+        locations.forget()
         return country
 
     @namespace.response(204, 'Country deleted')
@@ -67,4 +89,6 @@ class CountryApi(Resource):
         country = Country.query.get_or_404(id, 'Country not found')
         db.session.delete(country)
         db.session.commit()
+        cache.invalidate('country', 'state', 'city')
+        locations.forget()
         return '', 204
@@ -0,0 +1,54 @@
+from flask_jwt_extended import jwt_required
+from flask_restx import Namespace, Resource, fields
+
+from extensions import db, pool_metrics, slow_query_log
+
+namespace = Namespace(name='database', description='Database connection pools and slow queries of this worker')
+
+pool_stats_response_model = namespace.model('Pool stats response', {
+    'bind': fields.String(description='primary, or the replica bind (replica0, replica1...)'),
+    'checkouts': fields.Integer(),
+    'timeouts': fields.Integer(),
+    'inUse': fields.Integer(),
+    'waitAvgMs': fields.Float(),
+    'waitMaxMs': fields.Float(),
+    'size': fields.Integer(),
+    'idle': fields.Integer(),
+    'overflow': fields.Integer(),
+})
+
+
+@namespace.route('/pool')
+@namespace.doc(security='Bearer', )
+class PoolStats(Resource):
+    @namespace.marshal_list_with(pool_stats_response_model)
+    @jwt_required()
+    def get(self):
+        return [{'bind': bind, **stats} for bind, stats in pool_metrics.stats_by_bind(db.engines).items()]
+
+
+slow_query_response_model = namespace.model('Slow query response', {
+    'at': fields.String(),
+    'durationMs': fields.Float(),
+    'statement': fields.String(),
+    'parameters': fields.Raw(description='Bound values of SELECT statements; <redacted> for writes and the user table'),
+    'endpoint': fields.String(),
+    'method': fields.String(),
+    'path': fields.String(),
+    'plan': fields.String(description='EXPLAIN (ANALYZE, BUFFERS) output, for a sample of slow SELECT statements'),
+})
+
+
+@namespace.route('/slow_queries')
+@namespace.doc(security='Bearer', )
+class SlowQueries(Resource):
+    @namespace.marshal_list_with(slow_query_response_model)
+    @jwt_required()
+    def get(self):
+        return slow_query_log.entries()
+
+    @namespace.response(204, 'Slow query log cleared')
+    @jwt_required()
+    def delete(self):
+        slow_query_log.clear()
+        return '', 204
@@ -1,24 +1,39 @@
 import datetime
+import json
+import re
 
 from flask import request, jsonify, abort
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource, fields
-from flask_restx.reqparse import RequestParser
 from sqlalchemy import func
+from sqlalchemy.orm import with_expression
 from apps.api.category import category_response_model
 from apps.api.city import city_response_model
-from apps.models import Event, Organizer, ValidateStatusEnum, StatusEnum, EventDates, Country, Venue, State, \
-    City, Genre, Feedback, Booking
-from extensions import db
+from apps.models import Event, Organizer, ValidateStatusEnum, StatusEnum, EventDates, Venue, Genre
+from apps.services.event_import import MAX_BATCH_SIZE, import_events
+from apps.services import seats
+from apps.services.locations import locations
+from apps.utils.etag import etag
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import clamp_limit, page_model, paginate_list, pagination_parser
+from apps.utils.serializers import serialize
+from apps.utils.sparse import FIELDS_ARG, fields_parser, fieldset
+from extensions import cache, db
 
 PER_PAGE = 15
+# Таблицы, из которых собирается ответ с событием, — от них зависит ETag
+EVENT_TABLES = (
+    'event', 'eventDates', 'venue', 'country', 'state', 'city', 'genre', 'category', 'organizer', 'booking', 'feedback',
+)
 
 namespace = Namespace(name='event', description='Events operations')
 
-event_req_parser = RequestParser(bundle_errors=True)
+event_req_parser = pagination_parser.copy()
 event_req_parser.add_argument(name="page", type=int)
 event_req_parser.add_argument(name="name", type=str, nullable=False, location="args")
 event_req_parser.add_argument(name="organizerId", type=int, nullable=False, location="args")
+event_req_parser.add_argument(name="search", type=str, location="args")
+event_req_parser.add_argument(name=FIELDS_ARG, type=str, location="args")
 
 event_dates_expect_model = namespace.model('EventDates event_expect', {
     'id': fields.Integer(readonly=True),
@@ -83,18 +98,66 @@ event_response_model = namespace.model('Event response', {
     'organizer': fields.Nested(event_organizer_response_model),
     'eventDates': fields.List(fields.Nested(event_dates_expect_model)),
     'venues': fields.List(fields.Nested(event_venues_response_model)),
-    'number': fields.Integer(attribute=lambda event: Booking.query.filter_by(eventId=event.id).count())
+    'number': fields.Integer(attribute='bookingsCount'),
+    'averageRate': fields.Float(),
+    'ratingCount': fields.Integer(),
 })
 
+event_page_model = page_model(namespace, event_response_model)
+
+event_search_response_model = namespace.inherit('Event search_response', event_response_model, {
+    'searchRank': fields.Float(),
+    'nameHighlight': fields.String(description='HTML-escaped name with the matches wrapped in <b></b>'),
+    'descriptionHighlight': fields.String(description='HTML-escaped description with the matches wrapped in <b></b>'),
+})
+
+event_bulk_result_model = namespace.model('Event bulk_result', {
+    'index': fields.Integer(),
+    'id': fields.Integer(),
+    'errors': fields.List(fields.String()),
+})
+
+event_bulk_response_model = namespace.model('Event bulk_response', {
+    'created': fields.Integer(),
+    'failed': fields.Integer(),
+    'results': fields.List(fields.Nested(event_bulk_result_model)),
+})
+
+HEADLINE_OPTIONS = 'StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=20, MinWords=5'
+
+
+def escape_html(column):
+    # Клиенты выводят подсветку как HTML: экранируем текст организатора до того, как ts_headline добавит <b>
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')):
+        column = func.replace(column, char, entity)
+    return column
+
+
+def to_prefix_tsquery(text: str):
+    # Каждое слово ищем как префикс ('рок':* & 'фест':*), чтобы поиск работал по мере ввода.
+    # В запрос попадают только \w-символы, поэтому синтаксис tsquery из ввода не протекает
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return func.to_tsquery('simple', ' & '.join(f"{word}:*" for word in words))
+
 
 @namespace.route('/')
 # @namespace.doc(security='Bearer', )
 class EventList(Resource):
-    @namespace.marshal_list_with(event_response_model)
+    @namespace.response(200, 'Events list, or an Event page when cursor or limit is given', event_page_model)
     @namespace.expect(event_req_parser)
     # @jwt_required()
-    def get(self) -> list[Event]:
-        query = Event.query.filter_by(status='ACTIVE')
+    @etag(*EVENT_TABLES)
+    def get(self) -> list[dict] | dict:
+        search = request.args.get('search')
+        if search:
+            selected = fieldset(event_search_response_model)
+        else:
+            selected = fieldset(event_response_model, event_page_model)
+        query = Event.query.options(*loader_options(selected.model, Event, only=selected.sparse)).filter_by(
+            status='ACTIVE'
+        )
 
         name = request.args.get('name')
         organizer_id = request.args.get('organizerId')
@@ -104,12 +167,35 @@ class EventList(Resource):
             query = query.filter(Event.name.ilike(f'%{name}%'))
         if organizer_id:
             query = query.filter_by(organizerId=int(organizer_id))
-        if page:
-            query = query.paginate(page=int(page), per_page=PER_PAGE)
 
-        events = query.items if page else query.all()
+        if search:
+            args = event_req_parser.parse_args()
+            return serialize(self.search(query, search, args['limit'], selected.model), selected.model)
+
+        if page and not ('cursor' in request.args or 'limit' in request.args):
+            return serialize(query.paginate(page=int(page), per_page=PER_PAGE).items, selected.model)
 
-        return events
+        return paginate_list(query, [Event.id], selected.model, selected.page)
+
+    @staticmethod
+    def search(query, text, limit=None, model=event_search_response_model):
+        ts_query = to_prefix_tsquery(text)
+        if ts_query is None:
+            return []
+
+        rank = func.ts_rank(Event.searchVector, ts_query)
+        expressions = {
+            'searchRank': rank,
+            'nameHighlight': func.ts_headline('simple', escape_html(Event.name), ts_query, HEADLINE_OPTIONS),
+            'descriptionHighlight': func.ts_headline(
+                'simple', escape_html(Event.description), ts_query, HEADLINE_OPTIONS
+            ),
+        }
+        # ts_headline дорогой — считаем только запрошенные поля
+        options = [with_expression(getattr(Event, name), expr) for name, expr in expressions.items() if name in model]
+        return query.filter(Event.searchVector.op('@@')(ts_query)).options(*options).order_by(
+            rank.desc(), Event.id
+        ).limit(clamp_limit(limit)).all()
 
     @staticmethod
     def is_valid_dates(dates):
@@ -156,35 +242,17 @@ class EventList(Resource):
 
             # Добавляем места проведения мероприятия
             for venue in venues_data:
-                country_name = venue.pop('country')
-                state_name = venue.pop('state')
-                city_name = venue.pop('city')
-
-                # Проверяем, существуют ли страна, регион и город
-                country = Country.query.filter_by(name=country_name).first()
-                if not country:
-                    country = Country(name=country_name)
-                    db.session.add(country)
-                    db.session.flush()
-
-                state = State.query.filter_by(name=state_name, countryId=country.id).first()
-                if not state:
-                    state = State(name=state_name, countryId=country.id)
-                    db.session.add(state)
-                    db.session.flush()
-
-                city = City.query.filter_by(name=city_name, stateId=state.id).first()
-                if not city:
-                    city = City(name=city_name, stateId=state.id)
-                    db.session.add(city)
-                    db.session.flush()
+                # Находим или создаем страну, регион и город
+                country_id, state_id, city_id = locations.resolve(
+                    venue.pop('country'), venue.pop('state'), venue.pop('city')
+                )
 
                 # Создаем новое место проведения мероприятия
                 new_venue = Venue(
                     **venue,
-                    countryId=country.id,
-                    stateId=state.id,
-                    cityId=city.id,
+                    countryId=country_id,
+                    stateId=state_id,
+                    cityId=city_id,
                     eventId=new_event.id
                 )
                 db.session.add(new_venue)
@@ -197,18 +265,67 @@ class EventList(Resource):
 
         # Сохраняем изменения в базе данных
         db.session.commit()
+        # Места проведения могли добавить страну, регион или город
+        cache.invalidate('country', 'state', 'city')
         return new_event, 201
 
 
-@namespace.route('/<id>')
+@namespace.route('/bulk')
+@namespace.doc(security='Bearer', )
+class EventBulk(Resource):
+    @staticmethod
+    def read_items() -> list:
+        # NDJSON — по одному событию на строку, иначе ожидаем JSON-массив
+        if request.mimetype == 'application/x-ndjson':
+            items = []
+            for number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    abort(400, description=f'Line {number} is not valid JSON')
+            return items
+
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            abort(400, description='Expected a JSON array of events')
+        return items
+
+    @namespace.expect([event_expect_model])
+    @namespace.marshal_with(event_bulk_response_model, code=201)
+    @jwt_required()
+    def post(self):
+        items = self.read_items()
+        if len(items) > MAX_BATCH_SIZE:
+            abort(413, description=f'At most {MAX_BATCH_SIZE} events per request')
+
+        try:
+            results = import_events(items)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            abort(400, description=str(e))
+        cache.invalidate('country', 'state', 'city')
+
+        created = sum(1 for result in results if result['id'] is not None)
+        return {'created': created, 'failed': len(results) - created, 'results': results}, 201 if created else 400
+
+
+@namespace.route('/<int:id>')
 @namespace.param('id', 'The unique identifier of an Event')
 @namespace.doc(security='Bearer', )
 class EventApi(Resource):
-    @namespace.marshal_with(event_response_model)
+    @namespace.response(200, 'Success', event_response_model)
+    @namespace.expect(fields_parser)
     @jwt_required()
+    @etag(*EVENT_TABLES)
     def get(self, id):
-        event = Event.query.get_or_404(id, 'Event not found')
-        return event
+        selected = fieldset(event_response_model)
+        event = Event.query.options(
+            *loader_options(selected.model, Event, only=selected.sparse)
+        ).get_or_404(id, 'Event not found')
+        return serialize(event, selected.model)
 
     @namespace.expect(event_expect_model)
     @namespace.marshal_with(event_response_model)
@@ -234,30 +351,21 @@ class EventApi(Resource):
             venue = Venue.query.get(venue_id)
             venues_data = data.pop('venues')
             for i in venues_data:
-                if i.get('country'):
-                    if not Country.query.filter_by(name=i['country']).first():
-                        db.session.add(Country(name=i['country']))
-                        db.session.flush()
-                    country = Country.query.filter_by(name=i.pop('country')).first()
-                    venue.country = country
-
-                if i.get('state'):
-                    if not State.query.filter_by(name=i['state']).first():
-                        db.session.add(State(name=i['state'], countryId=venue.country.id))
-                        db.session.flush()
-                    state = State.query.filter_by(name=i.pop('state')).first()
-                    venue.state = state
-
-                if i.get('city'):
-                    if not City.query.filter_by(name=i['city']).first():
-                        db.session.add(City(name=i['city'], stateId=venue.state.id))
-                        db.session.flush()
-                    city = City.query.filter_by(name=i.pop('city')).first()
-                    venue.city = city
+                country_name, state_name, city_name = i.pop('country', None), i.pop('state', None), i.pop('city', None)
+                if country_name or state_name or city_name:
+                    # Незаданные уровни берем из текущего места проведения
+                    venue.countryId, venue.stateId, venue.cityId = locations.resolve(
+                        country_name or venue.country.name,
+                        state_name or venue.state.name,
+                        city_name or venue.city.name,
+                    )
 
                 if i.get('photos'):
                     venue.photos = i.pop('photos')
 
+                if i.get('seats') is not None:
+                    seats.reset_capacity(venue.eventId)
+
                 for field, value in i.items():
                     if value is not None and value not in ['photos', 'country', 'city', 'state']:
                         setattr(venue, field, value)
@@ -267,6 +375,7 @@ class EventApi(Resource):
             if value is not None and value not in ['eventDateTimes', 'venues']:
                 setattr(event, field, value)
         db.session.commit()
+        cache.invalidate('country', 'state', 'city')
 
         return event, 201
 
@@ -279,10 +388,15 @@ class EventApi(Resource):
         return '', 204
 
 
-@namespace.route('/rate/<id>')
+@namespace.route('/rate/<int:id>')
 @namespace.doc(security='Bearer', )
 class EventRate(Resource):
     @jwt_required()
+    @etag('event', 'feedback')
     def get(self, id):
-        average_rate = db.session.query(func.avg(Feedback.rate)).filter_by(eventId=id).scalar()
-        return {"averageRate": float(average_rate)}
+        event = Event.query.get_or_404(id, 'Event not found')
+        return {
+            "averageRate": event.averageRate,
+            "ratingCount": event.ratingCount,
+            "histogram": {str(rate): count for rate, count in enumerate(event.ratingHistogram, start=1)},
+        }
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required
 
 from apps.api.event import event_response_model
 from apps.models import EventDates, Event
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='event_dates', description='Event Dates operations')
@@ -20,16 +22,20 @@ event_dates_response_model = namespace.model('Event Dates response', {
     'endDateTime': fields.DateTime(),
     'event': fields.Nested(event_response_model)
 })
+event_dates_page_model = page_model(namespace, event_dates_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class EventDatesList(Resource):
-    @namespace.marshal_list_with(event_dates_response_model)
+    @namespace.response(
+        200, 'Event Dates list, or an Event Dates page when cursor or limit is given', event_dates_page_model
+    )
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        event_dates = EventDates.query.all()
-        return event_dates
+        event_dates = EventDates.query.options(*loader_options(event_dates_response_model, EventDates))
+        return paginate_list(event_dates, [EventDates.id], event_dates_response_model, event_dates_page_model)
 
     @namespace.expect(event_dates_model)
     @namespace.marshal_with(event_dates_response_model, code=201)
@@ -50,7 +56,9 @@ class EventDatesApi(Resource):
     @namespace.marshal_with(event_dates_response_model)
     @jwt_required()
     def get(self, id):
-        event_dates = EventDates.query.get_or_404(id, 'Event Dates not found')
+        event_dates = EventDates.query.options(
+            *loader_options(event_dates_response_model, EventDates)
+        ).get_or_404(id, 'Event Dates not found')
         return event_dates
 
     @namespace.expect(event_dates_model)
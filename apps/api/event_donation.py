@@ -1,11 +1,13 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required
-from flask_restx.reqparse import RequestParser
 
 from apps.api.event import event_response_model
 from apps.api.user import user_response_model
 from apps.models import EventDonation, User, Event
+from apps.utils.export import EXPORT_FORMATS, export_response
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='event_donation', description='Event Donation operations')
@@ -27,20 +29,25 @@ event_donation_response_model = namespace.model('Event Donation response', {
     'user': fields.Nested(user_response_model),
     'event': fields.Nested(event_response_model)
 })
+event_donation_page_model = page_model(namespace, event_donation_response_model)
 
-event_req_parser = RequestParser(bundle_errors=True)
+event_req_parser = pagination_parser.copy()
 event_req_parser.add_argument(name="eventId", type=int, location="args")
 event_req_parser.add_argument(name="userId", type=int, location="args")
+event_req_parser.add_argument(name="format", type=str, choices=EXPORT_FORMATS, location="args")
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class EventDonationList(Resource):
-    @namespace.marshal_list_with(event_donation_response_model)
+    @namespace.response(
+        200, 'Event Donations list, a page when cursor or limit is given, or an NDJSON/CSV export',
+        event_donation_page_model,
+    )
     @namespace.expect(event_req_parser)
     @jwt_required()
     def get(self):
-        query = EventDonation.query
+        query = EventDonation.query.options(*loader_options(event_donation_response_model, EventDonation))
 
         event_id = request.args.get('eventId')
         user_id = request.args.get('userId')
@@ -50,7 +57,12 @@ class EventDonationList(Resource):
         if user_id:
             query = query.filter_by(userId=int(user_id))
 
-        return query.all()
+        export_format = event_req_parser.parse_args()['format']
+        if export_format:
+            return export_response(
+                query.order_by(EventDonation.id), event_donation_response_model, export_format, 'donations'
+            )
+        return paginate_list(query, [EventDonation.id], event_donation_response_model, event_donation_page_model)
 
     @namespace.expect(event_donation_model)
     @namespace.marshal_with(event_donation_response_model, code=201)
@@ -72,7 +84,9 @@ class EventDonationApi(Resource):
     @namespace.marshal_with(event_donation_response_model)
     @jwt_required()
     def get(self, id):
-        event_donation = EventDonation.query.get_or_404(id, 'Event Donation not found')
+        event_donation = EventDonation.query.options(
+            *loader_options(event_donation_response_model, EventDonation)
+        ).get_or_404(id, 'Event Donation not found')
         return event_donation
 
     @namespace.expect(event_donation_model)
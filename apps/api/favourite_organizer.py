@@ -2,6 +2,8 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from apps.models import FavouriteOrganizer, Organizer, User
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='favourite_organizer', description='Favourite Organizer operations')
@@ -48,16 +50,25 @@ favourite_organizer_response_model = namespace.model('Favourite Organizer respon
     'user': fields.Nested(user_response_model),
     'organizer': fields.Nested(organizer_response_model)
 })
+favourite_organizer_page_model = page_model(namespace, favourite_organizer_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class FavouriteOrganizerList(Resource):
-    @namespace.marshal_list_with(favourite_organizer_response_model)
+    @namespace.response(
+        200, 'Favourite Organizers list, or a page when cursor or limit is given', favourite_organizer_page_model
+    )
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        favourite_organizers = FavouriteOrganizer.query.all()
-        return favourite_organizers
+        favourite_organizers = FavouriteOrganizer.query.options(
+            *loader_options(favourite_organizer_response_model, FavouriteOrganizer)
+        )
+        return paginate_list(
+            favourite_organizers, [FavouriteOrganizer.id], favourite_organizer_response_model,
+            favourite_organizer_page_model
+        )
 
     @namespace.expect(favourite_organizer_model)
     @namespace.marshal_with(favourite_organizer_response_model, code=201)
@@ -83,7 +94,9 @@ class FavouriteOrganizerApi(Resource):
     @namespace.marshal_with(favourite_organizer_response_model)
     @jwt_required()
     def get(self, id):
-        favourite_organizer = FavouriteOrganizer.query.get_or_404(id, 'Favourite Organizer not found')
+        favourite_organizer = FavouriteOrganizer.query.options(
+            *loader_options(favourite_organizer_response_model, FavouriteOrganizer)
+        ).get_or_404(id, 'Favourite Organizer not found')
         return favourite_organizer
 
     @namespace.expect(favourite_organizer_model)
@@ -123,9 +136,17 @@ class FavouriteOrganizerApi(Resource):
 @namespace.route('/user_favourite_organizers')
 @namespace.doc(security='Bearer', )
 class UserFavorites(Resource):
-    @namespace.marshal_with(favourite_organizer_response_model)
+    @namespace.response(
+        200, 'Favourite Organizers list, or a page when cursor or limit is given', favourite_organizer_page_model
+    )
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
         user_id = get_jwt_identity()['userId']
-        favourite_organizers = FavouriteOrganizer.query.filter_by(userId=user_id).all()
-        return favourite_organizers
+        favourite_organizers = FavouriteOrganizer.query.options(
+            *loader_options(favourite_organizer_response_model, FavouriteOrganizer)
+        ).filter_by(userId=user_id)
+        return paginate_list(
+            favourite_organizers, [FavouriteOrganizer.id], favourite_organizer_response_model,
+            favourite_organizer_page_model
+        )
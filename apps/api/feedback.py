@@ -1,10 +1,13 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required
-from flask_restx.reqparse import RequestParser
-from flask import request
+from flask import request, abort
 from apps.api.event import event_response_model
 from apps.api.user import user_response_model
 from apps.models import Feedback, Event, User, Organizer
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from apps.utils.serializers import serialize
+from apps.utils.sparse import FIELDS_ARG, fields_parser, fieldset
 from extensions import db
 
 PER_PAGE = 15
@@ -30,54 +33,72 @@ feedback_response_model = namespace.model('Feedback response', {
     'event': fields.Nested(event_response_model),
     'user': fields.Nested(user_response_model)
 })
-feedback_req_parser = RequestParser(bundle_errors=True)
+feedback_page_model = page_model(namespace, feedback_response_model)
+
+feedback_req_parser = pagination_parser.copy()
 feedback_req_parser.add_argument(name="organizerId", type=int, location="args")
 feedback_req_parser.add_argument(name="page", type=int, nullable=False, location="args")
+feedback_req_parser.add_argument(name=FIELDS_ARG, type=str, location="args")
+
+
+def validate_rate(rate):
+    # Оценка попадает в гистограмму события, поэтому допускаем только 1..5
+    if not isinstance(rate, int) or isinstance(rate, bool) or not 1 <= rate <= 5:
+        abort(400, 'Rate must be an integer from 1 to 5')
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class FeedbackList(Resource):
-    @namespace.marshal_list_with(feedback_response_model)
+    @namespace.response(200, 'Feedbacks list, or a Feedback page when cursor or limit is given', feedback_page_model)
     @namespace.expect(feedback_req_parser)
     @jwt_required()
     def get(self):
         orginzer_id = request.args.get('organizerId')
         page = request.args.get('page')
-        feedbacks = Feedback.query
+        selected = fieldset(feedback_response_model, feedback_page_model)
+        feedbacks = Feedback.query.options(*loader_options(selected.model, Feedback, only=selected.sparse))
         if orginzer_id:
             feedbacks = feedbacks.filter(
                 Feedback.eventId == Event.id,
                 Event.organizerId == Organizer.id,
-                Organizer.id == orginzer_id
+                Organizer.id == int(orginzer_id)
             )
-        if page:
-            return feedbacks.paginate(page=int(page), per_page=PER_PAGE).items
-        else:
-            return feedbacks.all()
+        if page and not ('cursor' in request.args or 'limit' in request.args):
+            return serialize(feedbacks.paginate(page=int(page), per_page=PER_PAGE).items, selected.model)
+        # Новые отзывы первыми: ключ (dateTime, id) по убыванию
+        return paginate_list(
+            feedbacks, [Feedback.dateTime, Feedback.id], selected.model, selected.page, descending=True
+        )
 
     @namespace.expect(feedback_model)
     @namespace.marshal_with(feedback_response_model, code=201)
     @jwt_required()
     def post(self):
         data = namespace.payload
+        validate_rate(data.get('rate'))
         Event.query.get_or_404(data['eventId'], 'Event not found')
         User.query.get_or_404(data['userId'], 'User not found')
         new_feedback = Feedback(**data)
         db.session.add(new_feedback)
+        # Агрегаты оценок события и организатора обновляются в этой же транзакции, см. apps.services.stats
         db.session.commit()
         return new_feedback, 201
 
 
-@namespace.route('/<id>')
+@namespace.route('/<int:id>')
 @namespace.param('id', 'The unique identifier of a Feedback')
 @namespace.doc(security='Bearer', )
 class FeedbackApi(Resource):
-    @namespace.marshal_with(feedback_response_model)
+    @namespace.response(200, 'Success', feedback_response_model)
+    @namespace.expect(fields_parser)
     @jwt_required()
     def get(self, id):
-        feedback = Feedback.query.get_or_404(id, 'Feedback not found')
-        return feedback
+        selected = fieldset(feedback_response_model)
+        feedback = Feedback.query.options(
+            *loader_options(selected.model, Feedback, only=selected.sparse)
+        ).get_or_404(id, 'Feedback not found')
+        return serialize(feedback, selected.model)
 
     @namespace.expect(feedback_model)
     @namespace.marshal_with(feedback_response_model)
@@ -88,6 +109,8 @@ class FeedbackApi(Resource):
         data = namespace.payload
         event_id = data.get('eventId')
         user_id = data.get('userId')
+        if 'rate' in data:
+            validate_rate(data['rate'])
 
         if event_id:
             Event.query.get_or_404(event_id, 'Event not found')
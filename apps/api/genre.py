@@ -2,8 +2,11 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required
 
 from apps.api.category import category_response_model
-from apps.api.event import event_response_model
+from apps.api.event import EVENT_TABLES, event_response_model
 from apps.models import Genre, Category, Event
+from apps.utils.etag import etag
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='genre', description='Genre operations')
@@ -20,16 +23,22 @@ genre_response_model = namespace.model('Genre response', {
     'category': fields.Nested(category_response_model),
     'events': fields.Nested(event_response_model)
 })
+genre_page_model = page_model(namespace, genre_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class GenreList(Resource):
-    @namespace.marshal_list_with(genre_response_model)
+    @namespace.response(200, 'Genres list, or a Genre page when cursor or limit is given', genre_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
+    @etag(*EVENT_TABLES)
     def get(self):
-        genres = Genre.query.all()
-        return genres
+        # Жанры не кэшируются: в ответ вложены события с бронями и отзывами, которые часто меняются
+        return paginate_list(
+            Genre.query.options(*loader_options(genre_response_model, Genre)), [Genre.id],
+            genre_response_model, genre_page_model,
+        )
 
     @namespace.expect(genre_model)
     @namespace.marshal_with(genre_response_model, code=201)
@@ -49,9 +58,9 @@ class GenreList(Resource):
 class GenreApi(Resource):
     @namespace.marshal_with(genre_response_model)
     @jwt_required()
+    @etag(*EVENT_TABLES)
     def get(self, id):
-        genre = Genre.query.get_or_404(id, 'Genre not found')
-        return genre
+        return Genre.query.options(*loader_options(genre_response_model, Genre)).get_or_404(id, 'Genre not found')
 
     @namespace.expect(genre_model)
     @namespace.marshal_with(genre_response_model)
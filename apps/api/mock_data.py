@@ -1,13 +1,42 @@
-from flask import jsonify
-from flask_restx import Resource, Namespace
-from tests.database_mock import mock_database
+from flask import current_app, jsonify
+from flask_jwt_extended import jwt_required
+from flask_restx import Resource, Namespace, fields
+
+from apps.services.mock_data import API_SCALE_LIMIT, Scale, analyze, generate
+from extensions import cache, db
 
 namespace = Namespace(name='mock_data')
 
+mock_data_model = namespace.model('Mock data scale', {
+    **{
+        name: fields.Integer(default=default, max=getattr(API_SCALE_LIMIT, name))
+        for name, default in Scale._field_defaults.items()
+    },
+    'seed': fields.Integer(default=0),
+})
+
 
 @namespace.route("/generate", endpoint="mock_data")
+@namespace.doc(security='Bearer', )
 class MockData(Resource):
-    @staticmethod
-    def post():
-        mock_database()
-        return jsonify(message='success')
+    @namespace.expect(mock_data_model, validate=False)
+    @namespace.response(404, 'Generation through the API is off, see MOCK_DATA_API')
+    @jwt_required()
+    def post(self):
+        # Генерация пишет сотни тысяч строк, поэтому на рабочих стендах эндпоинт выключен
+        if not current_app.config.get('MOCK_DATA_API', False):
+            namespace.abort(404, 'Mock data generation is disabled')
+        data = namespace.payload or {}
+        try:
+            scale = Scale(**{name: int(data[name]) for name in Scale._fields if name in data})
+            seed = int(data.get('seed', 0))
+        except (TypeError, ValueError):
+            namespace.abort(400, 'Scale fields and seed must be integers')
+        try:
+            counts = generate(scale, seed=seed, limit=API_SCALE_LIMIT)
+        except ValueError as e:
+            namespace.abort(400, str(e))
+        db.session.commit()
+        analyze(counts)
+        cache.clear()
+        return jsonify(message='success', counts=counts)
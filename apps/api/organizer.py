@@ -3,11 +3,15 @@ from flask import request
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource, fields
 from flask_restx.reqparse import RequestParser
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 
 from apps.api.user import user_response_model
-from apps.models import Organizer, User, FavouriteOrganizer, Event, Feedback
-from extensions import db
+from apps.models import Organizer, User, FavouriteOrganizer
+from apps.services.stats import organizer_stats
+from apps.utils.etag import etag
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from extensions import db, replica_router
 from flask_jwt_extended import get_jwt_identity
 
 namespace = Namespace(name='organizer', description='Organizers operations')
@@ -43,6 +47,7 @@ organizer_response_model = namespace.model('Organizer response', {
     'instagram': fields.String(),
     'user': fields.Nested(user_response_model)
 })
+organizer_page_model = page_model(namespace, organizer_response_model)
 
 organizer_info_response_model = namespace.model('OrganizerInfo response', {
     'countOfSubscribers': fields.Integer(),
@@ -60,11 +65,15 @@ organizer_info_parser.add_argument(
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class OrganizerList(Resource):
-    @namespace.marshal_list_with(organizer_response_model)
+    @namespace.response(
+        200, 'Organizers list, or an Organizer page when cursor or limit is given', organizer_page_model
+    )
+    @namespace.expect(pagination_parser)
     @jwt_required()
+    @etag('organizer', 'user')
     def get(self):
-        organizers = Organizer.query.all()
-        return organizers
+        organizers = Organizer.query.options(*loader_options(organizer_response_model, Organizer))
+        return paginate_list(organizers, [Organizer.id], organizer_response_model, organizer_page_model)
 
     @namespace.expect(organizer_model)
     @namespace.marshal_with(organizer_response_model, code=201)
@@ -84,8 +93,11 @@ class OrganizerList(Resource):
 class OrganizerApi(Resource):
     @namespace.marshal_with(organizer_response_model)
     @jwt_required()
+    @etag('organizer', 'user')
     def get(self, id):
-        organizer = Organizer.query.get_or_404(id, 'Organizer not found')
+        organizer = Organizer.query.options(
+            *loader_options(organizer_response_model, Organizer)
+        ).get_or_404(id, 'Organizer not found')
         return organizer
 
     @namespace.expect(organizer_model)
@@ -118,7 +130,7 @@ class OrganizerApi(Resource):
         return '', 204
 
 
-@namespace.route('/info/<id>')
+@namespace.route('/info/<int:id>')
 @namespace.param('id', 'The unique identifier of an Organizer')
 @namespace.doc(security='Bearer', )
 class OrganizerInfo(Resource):
@@ -126,33 +138,39 @@ class OrganizerInfo(Resource):
     @namespace.expect(organizer_info_parser)
     @jwt_required()
     def get(self, id):
-        Organizer.query.get_or_404(id, 'Organizer not found')
-
         user_id = get_jwt_identity()['userId']
         toggle_subscribe = request.args.get('toggle_subscribe', default=False, type=lambda v: v.lower() == 'true')
 
-        is_subscribed = True if FavouriteOrganizer.query.filter_by(organizerId=id, userId=user_id).first() else False
-
         if toggle_subscribe:
-            if is_subscribed:
+            # Переключение читает текущую подписку перед записью — только с основной базы
+            with replica_router.primary():
                 favourite_organizer = FavouriteOrganizer.query.filter_by(organizerId=id, userId=user_id).first()
-                db.session.delete(favourite_organizer)
-                is_subscribed = False
-            else:
-                favourite_organizer = FavouriteOrganizer(dateTime=datetime.now(), userId=user_id, organizerId=id)
-                db.session.add(favourite_organizer)
-                is_subscribed = True
-
-        db.session.commit()
-
-        count_of_subscribers = FavouriteOrganizer.query.filter_by(organizerId=id).count()
-        count_of_events = Event.query.filter_by(organizerId=id).count()
-        average_rate = db.session.query(func.avg(Feedback.rate)).join(Event).join(Organizer).filter(
-            Organizer.id == id).scalar()
+                is_subscribed = favourite_organizer is not None
+                Organizer.query.get_or_404(id, 'Organizer not found')
+                if is_subscribed:
+                    db.session.delete(favourite_organizer)
+                else:
+                    db.session.add(FavouriteOrganizer(dateTime=datetime.now(), userId=user_id, organizerId=id))
+                # Счетчики в organizerStats обновляются в той же транзакции, см. apps.services.stats
+                try:
+                    db.session.commit()
+                    is_subscribed = not is_subscribed
+                except IntegrityError:
+                    # Параллельный запрос уже подписал пользователя
+                    db.session.rollback()
+                    is_subscribed = True
+        else:
+            favourite_organizer = FavouriteOrganizer.query.filter_by(organizerId=id, userId=user_id).first()
+            is_subscribed = favourite_organizer is not None
+
+        # Статистика хранится готовой: одно чтение по первичному ключу вместо трех агрегатов
+        stats = organizer_stats(id)
+        if stats is None:
+            Organizer.query.get_or_404(id, 'Organizer not found')
 
         return {
-            'countOfSubscribers': count_of_subscribers,
-            'countOfEvents': count_of_events,
-            "averageRate": average_rate,
+            'countOfSubscribers': stats.subscribersCount if stats else 0,
+            'countOfEvents': stats.eventsCount if stats else 0,
+            "averageRate": stats.ratingSum / stats.ratingCount if stats and stats.ratingCount else None,
             'isSubscribed': is_subscribed,
         }
@@ -1,9 +1,14 @@
-from flask_restx import Namespace, Resource, fields
+from flask import abort
+from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 
 from apps.api.country import country_response_model
 from apps.models import State, Country
-from extensions import db
+from apps.services.locations import locations
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from extensions import cache, db
 
 namespace = Namespace(name='state', description='State operations')
 
@@ -18,16 +23,20 @@ state_response_model = namespace.model('State response', {
     'name': fields.String(),
     'country': fields.Nested(country_response_model),
 })
+state_page_model = page_model(namespace, state_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class StateList(Resource):
-    @namespace.marshal_list_with(state_response_model)
+    @namespace.response(200, 'States list, or a State page when cursor or limit is given', state_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        states = State.query.all()
-        return states
+        return paginate_list(
+            State.query.options(*loader_options(state_response_model, State)), [State.id],
+            state_response_model, state_page_model, cache_namespace='state',
+        )
 
     @namespace.expect(state_model)
     @namespace.marshal_with(state_response_model, code=201)
@@ -37,7 +46,12 @@ class StateList(Resource):
         Country.query.get_or_404(data['countryId'], 'Country not found')
         new_state = State(**data)
         db.session.add(new_state)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'State with this name already exists in the country')
+        cache.invalidate('state', 'city')
         return new_state, 201
 
 
@@ -45,11 +59,13 @@ class StateList(Resource):
 @namespace.param('id', 'The unique identifier of a State')
 @namespace.doc(security='Bearer', )
 class StateApi(Resource):
-    @namespace.marshal_with(state_response_model)
+    @namespace.response(200, 'State', state_response_model)
     @jwt_required()
     def get(self, id):
-        state = State.query.get_or_404(id, 'State not found')
-        return state
+        return cache.get_or_set('state', id, lambda: marshal(
+            State.query.options(*loader_options(state_response_model, State)).get_or_404(id, 'State not found'),
+            state_response_model,
+        ))
 
     @namespace.expect(state_model)
     @namespace.marshal_with(state_response_model)
@@ -68,7 +84,13 @@ class StateApi(Resource):
             if key not in ['countryId']:
                 setattr(state, key, value)
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'State with this name already exists in the country')
+        cache.invalidate('state', 'city')
+        locations.forget()
         return state
 
     @namespace.response(204, 'State deleted')
@@ -77,4 +99,6 @@ class StateApi(Resource):
         state = State.query.get_or_404(id, 'State not found')
         db.session.delete(state)
         db.session.commit()
+        cache.invalidate('state', 'city')
+        locations.forget()
         return '', 204
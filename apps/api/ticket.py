@@ -1,9 +1,15 @@
-from datetime import datetime
-
+from flask import abort
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required
-
-from apps.models import Ticket, Event, TicketTypeEnum, Booking
+from sqlalchemy.exc import IntegrityError
+
+from apps.models import Ticket, EventDates, TicketTypeEnum, Booking
+from apps.services import seats
+from apps.utils.export import EXPORT_FORMATS, export_response
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
+from apps.utils.serializers import serialize
+from apps.utils.sparse import FIELDS_ARG, fields_parser, fieldset
 from extensions import db
 
 namespace = Namespace(name='ticket', description='Ticket operations')
@@ -61,26 +67,58 @@ ticket_response_model = namespace.model('Ticket response', {
     'booking': fields.Nested(booking_response_model),
     'eventDates': fields.Nested(event_dates_response_model),
 })
+ticket_page_model = page_model(namespace, ticket_response_model)
+
+ticket_parser = pagination_parser.copy()
+ticket_parser.add_argument(name="eventId", type=int, location='args')
+ticket_parser.add_argument(name="eventDatesId", type=int, location='args')
+ticket_parser.add_argument(name="format", type=str, choices=EXPORT_FORMATS, location='args')
+ticket_parser.add_argument(name=FIELDS_ARG, type=str, location='args')
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class TicketList(Resource):
-    @namespace.marshal_list_with(ticket_response_model)
+    @namespace.response(
+        200, 'Tickets list, a Ticket page when cursor or limit is given, or an NDJSON/CSV export', ticket_page_model
+    )
+    @namespace.expect(ticket_parser)
     @jwt_required()
     def get(self):
-        tickets = Ticket.query.all()
-        return tickets
+        args = ticket_parser.parse_args()
+        selected = fieldset(ticket_response_model, ticket_page_model)
+        tickets = Ticket.query.options(*loader_options(selected.model, Ticket, only=selected.sparse))
+
+        # Для проверки на входе организатору нужны билеты одного события или одной даты
+        if args['eventId']:
+            tickets = tickets.join(Ticket.eventDates).filter(EventDates.eventId == args['eventId'])
+        if args['eventDatesId']:
+            tickets = tickets.filter(Ticket.eventDatesId == args['eventDatesId'])
+
+        if args['format']:
+            return export_response(tickets.order_by(Ticket.id), selected.model, args['format'], 'tickets')
+        return paginate_list(tickets, [Ticket.id], selected.model, selected.page)
 
     @namespace.expect(ticket_model)
     @namespace.marshal_with(ticket_response_model, code=201)
     @jwt_required()
     def post(self):
         data = namespace.payload
-        Event.query.get_or_404(data['eventDatesId'], 'Event not found')
+        EventDates.query.get_or_404(data['eventDatesId'], 'EventDates not found')
         Booking.query.get_or_404(data['bookingId'], 'Booking not found')
-        new_ticket = Ticket(**data, dateTime=datetime.now())
-        db.session.add(new_ticket)
+        try:
+            new_ticket = seats.allocate(
+                data['eventDatesId'],
+                data['bookingId'],
+                data.get('ticketType') or TicketTypeEnum.NUMERIC,
+                data.get('seat'),
+            )
+        except seats.InvalidSeat as e:
+            db.session.rollback()
+            abort(400, str(e))
+        except seats.SeatError as e:
+            db.session.rollback()
+            abort(409, str(e))
         db.session.commit()
         return new_ticket, 201
 
@@ -89,11 +127,15 @@ class TicketList(Resource):
 @namespace.param('id', 'The unique identifier of a Ticket')
 @namespace.doc(security='Bearer', )
 class TicketApi(Resource):
-    @namespace.marshal_with(ticket_response_model)
+    @namespace.response(200, 'Success', ticket_response_model)
+    @namespace.expect(fields_parser)
     @jwt_required()
     def get(self, id):
-        ticket = Ticket.query.get_or_404(id, 'Ticket not found')
-        return ticket
+        selected = fieldset(ticket_response_model)
+        ticket = Ticket.query.options(
+            *loader_options(selected.model, Ticket, only=selected.sparse)
+        ).get_or_404(id, 'Ticket not found')
+        return serialize(ticket, selected.model)
 
     @namespace.expect(ticket_model)
     @namespace.marshal_with(ticket_response_model)
@@ -102,13 +144,32 @@ class TicketApi(Resource):
         data = namespace.payload
 
         ticket = Ticket.query.get_or_404(id, 'Ticket not found')
-        Event.query.get_or_404(data.get('eventDatesId'), 'EventDates not found')
+        EventDates.query.get_or_404(data.get('eventDatesId'), 'EventDates not found')
         Booking.query.get_or_404(data.get('bookingId'), 'Booking not found')
 
+        # Перенос билета на другую дату занимает место там; старое место освободит событие маппера
+        try:
+            if data['eventDatesId'] != ticket.eventDatesId:
+                capacity = seats.reserve(data['eventDatesId'])
+            else:
+                capacity = seats.capacity(ticket.eventDatesId)
+            if data.get('seat') is not None:
+                seats.check_seat(data['seat'], capacity)
+        except seats.InvalidSeat as e:
+            db.session.rollback()
+            abort(400, str(e))
+        except seats.SoldOut as e:
+            db.session.rollback()
+            abort(409, str(e))
+
         for key, value in data.items():
             setattr(ticket, key, value)
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, 'Seat is already taken')
         return ticket
 
     @namespace.response(204, 'Ticket deleted')
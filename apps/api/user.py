@@ -1,9 +1,11 @@
 from flask import abort
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource, fields
-from werkzeug.security import generate_password_hash
 
 from apps.models import User
+from apps.services import passwords
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='user', description='Users operations')
@@ -51,14 +53,16 @@ user_response_model = namespace.model('User response', {
     'organizers': fields.List(fields.Nested(organizer_list_response_model)),
     'roleId': fields.Integer(),
 })
+user_page_model = page_model(namespace, user_response_model)
 
 
 @namespace.route('/')
 class UserList(Resource):
-    @namespace.marshal_list_with(user_response_model)
+    @namespace.response(200, 'Users list, or a User page when cursor or limit is given', user_page_model)
+    @namespace.expect(pagination_parser)
     def get(self):
-        users = User.query.all()
-        return users
+        users = User.query.options(*loader_options(user_response_model, User))
+        return paginate_list(users, [User.id], user_response_model, user_page_model)
 
     @namespace.expect(user_model)
     @namespace.marshal_with(user_response_model, code=201)
@@ -67,7 +71,10 @@ class UserList(Resource):
         if User.query.filter_by(email=data['email']).first():
             abort(401, 'Email exists')
         new_user = User(**data)
-        new_user.password = generate_password_hash(new_user.password)
+        try:
+            new_user.password = passwords.hash_password(new_user.password)
+        except passwords.HashingBusy as e:
+            abort(503, str(e))
         db.session.add(new_user)
         db.session.commit()
         return new_user, 201
@@ -78,7 +85,7 @@ class UserList(Resource):
 class UserApi(Resource):
     @namespace.marshal_with(user_response_model)
     def get(self, id):
-        user = User.query.get_or_404(id, 'User not found')
+        user = User.query.options(*loader_options(user_response_model, User)).get_or_404(id, 'User not found')
         return user
 
     @namespace.expect(user_model)
@@ -90,9 +97,11 @@ class UserApi(Resource):
         data = namespace.payload
 
         for key, value in data.items():
-            print(key, value)
             if key == 'password':
-                value = generate_password_hash(value)
+                try:
+                    value = passwords.hash_password(value)
+                except passwords.HashingBusy as e:
+                    abort(503, str(e))
             setattr(user, key, value)
 
         db.session.commit()
@@ -6,6 +6,9 @@ from apps.api.country import country_response_model
 from apps.api.event import event_response_model
 from apps.api.state import state_response_model
 from apps.models import Venue, Country, State, City, Event
+from apps.services import seats
+from apps.utils.loaders import loader_options
+from apps.utils.pagination import page_model, paginate_list, pagination_parser
 from extensions import db
 
 namespace = Namespace(name='venue', description='Venue operations')
@@ -34,16 +37,18 @@ venue_response_model = namespace.model('Venue response', {
     'city': fields.Nested(city_response_model),
     'event': fields.Nested(event_response_model)
 })
+venue_page_model = page_model(namespace, venue_response_model)
 
 
 @namespace.route('/')
 @namespace.doc(security='Bearer', )
 class VenueList(Resource):
-    @namespace.marshal_list_with(venue_response_model)
+    @namespace.response(200, 'Venues list, or a Venue page when cursor or limit is given', venue_page_model)
+    @namespace.expect(pagination_parser)
     @jwt_required()
     def get(self):
-        venues = Venue.query.all()
-        return venues
+        venues = Venue.query.options(*loader_options(venue_response_model, Venue))
+        return paginate_list(venues, [Venue.id], venue_response_model, venue_page_model)
 
     @namespace.expect(venue_model)
     @namespace.marshal_with(venue_response_model, code=201)
@@ -58,6 +63,8 @@ class VenueList(Resource):
 
         new_venue = Venue(**data)
         db.session.add(new_venue)
+        # Вместимость дат события считается по местам площадок — пересчитаем при следующей продаже
+        seats.reset_capacity(new_venue.eventId)
         db.session.commit()
         return new_venue, 201
 
@@ -69,7 +76,7 @@ class VenueApi(Resource):
     @namespace.marshal_with(venue_response_model)
     @jwt_required()
     def get(self, id):
-        venue = Venue.query.get_or_404(id, 'Venue not found')
+        venue = Venue.query.options(*loader_options(venue_response_model, Venue)).get_or_404(id, 'Venue not found')
         return venue
 
     @namespace.expect(venue_model)
@@ -77,6 +84,7 @@ class VenueApi(Resource):
     @jwt_required()
     def put(self, id):
         venue = Venue.query.get_or_404(id, 'Venue not found')
+        seats.reset_capacity(venue.eventId)
 
         data = namespace.payload
         country_id = data.get('countryId')
@@ -99,6 +107,7 @@ class VenueApi(Resource):
         if event_id:
             Event.query.get_or_404(event_id, 'Event not found')
             venue.eventId = event_id
+            seats.reset_capacity(event_id)
 
         for key, value in data.items():
             if key not in ['countryId', 'stateId', 'cityId', 'eventId']:
@@ -111,6 +120,7 @@ class VenueApi(Resource):
     @jwt_required()
     def delete(self, id):
         venue = Venue.query.get_or_404(id, 'Venue not found')
+        seats.reset_capacity(venue.eventId)
         db.session.delete(venue)
         db.session.commit()
         return '', 204
@@ -0,0 +1 @@
+"""ASGI serving mode: hot read endpoints on asyncpg, everything else on the WSGI app, see ``apps.asgi.app``."""
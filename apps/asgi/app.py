@@ -0,0 +1,113 @@
+"""ASGI application for the read-heavy endpoints.
+
+``AsgiApp`` wraps the Flask app. GET and HEAD requests to ``HOT_ENDPOINTS`` go through the
+unchanged Flask view, but inside ``AsyncSession.run_sync``. ``db.session`` in that request is
+the sync facade of an asyncpg session, so every query the view makes is awaited on the event
+loop instead of blocking a thread. Responses are the same as in WSGI mode because the same
+views, parsers, serializers and error handlers produce them. All other requests go to the
+WSGI app in a thread pool.
+
+Run with ``uvicorn asgi:app --workers 4``.
+"""
+from a2wsgi import WSGIMiddleware
+from flask import request
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import HTTPException
+
+from apps.asgi.database import async_engine
+from apps.asgi.environ import build_environ
+from extensions import db
+
+HOT_ENDPOINTS = frozenset({
+    'api.event_event_list',
+    'api.event_event_api',
+    'api.event_event_rate',
+    'api.organizer_organizer_info',
+    'api.feedback_feedback_list',
+    'api.feedback_feedback_api',
+    'api.category_category_list',
+    'api.genre_genre_list',
+    'api.country_country_list',
+    'api.state_state_list',
+    'api.city_city_list',
+})
+HOT_METHODS = frozenset({'GET', 'HEAD'})
+SESSION_ENVIRON_KEY = 'eventer.db_session'
+
+
+def _use_async_session():
+    session = request.environ.get(SESSION_ENVIRON_KEY)
+    if session is not None:
+        db.session.registry.set(session)
+
+
+class AsgiApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app)
+        self.engine = async_engine(flask_app.config)
+        # Обычная сессия SQLAlchemy, а не сессия Flask-SQLAlchemy: та выбирает синхронные движки db.engines
+        self.sessions = async_sessionmaker(self.engine, sync_session_class=Session)
+        # Сессия должна подмениться раньше всех остальных обработчиков before_request
+        flask_app.before_request_funcs.setdefault(None, []).insert(0, _use_async_session)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and self.is_hot(scope):
+            await self._dispatch(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    def is_hot(self, scope) -> bool:
+        if scope['method'] not in HOT_METHODS:
+            return False
+        adapter = self.flask_app.url_map.bind('localhost', script_name=scope.get('root_path') or None)
+        path = scope['path'][len(scope.get('root_path', '')):]
+        try:
+            endpoint, _ = adapter.match(path, method=scope['method'])
+        except HTTPException:
+            # 404, 405 и редиректы на путь со слэшем отдает WSGI-приложение
+            return False
+        return endpoint in HOT_ENDPOINTS
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _dispatch(self, scope, receive, send):
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        async with self.sessions() as session:
+            status, headers, chunks = await session.run_sync(self._run_view, build_environ(scope, body))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    def _run_view(self, session, environ) -> tuple[int, list, list]:
+        environ[SESSION_ENVIRON_KEY] = session
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+        result = self.flask_app(environ, start_response)
+        try:
+            chunks = list(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return started['status'], started['headers'], chunks
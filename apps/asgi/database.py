@@ -0,0 +1,31 @@
+from sqlalchemy import NullPool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def async_database_url(url: str, pgbouncer: bool = False):
+    url = make_url(url).set(drivername='postgresql+asyncpg')
+    if pgbouncer:
+        # В режиме transaction подготовленный оператор остается на чужом серверном соединении
+        url = url.update_query_dict({'prepared_statement_cache_size': '0'})
+    return url
+
+
+def async_engine_options(config) -> dict:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` of the WSGI app adapted to an asyncio engine."""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    poolclass = options.pop('poolclass', None)
+    # Пул с очередью для asyncio свой — оставляем только NullPool
+    if poolclass is not None and issubclass(poolclass, NullPool):
+        options['poolclass'] = NullPool
+    if config.get('DB_PGBOUNCER'):
+        options['connect_args'] = {'statement_cache_size': 0}
+    return options
+
+
+def async_engine(config):
+    """asyncpg engine for the database of ``config``."""
+    return create_async_engine(
+        async_database_url(config['SQLALCHEMY_DATABASE_URI'], config.get('DB_PGBOUNCER')),
+        **async_engine_options(config),
+    )
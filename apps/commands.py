@@ -0,0 +1,26 @@
+import click
+from flask.cli import with_appcontext
+
+from apps.services.mock_data import Scale, analyze, generate
+from extensions import db
+
+
+@click.command('mock-data')
+@click.option('--seed', default=0, show_default=True, help='Same seed gives the same dataset.')
+@with_appcontext
+def mock_data_command(seed, **scale):
+    """Fill the database with generated data for load testing."""
+    counts = generate(Scale(**scale), seed=seed)
+    db.session.commit()
+    analyze(counts)
+    for table, count in counts.items():
+        click.echo(f'{table}: {count}')
+
+
+# Параметры --users, --events, ... берутся из полей Scale
+for _name, _default in Scale._field_defaults.items():
+    mock_data_command = click.option(f'--{_name}', default=_default, show_default=True)(mock_data_command)
+
+
+def register_commands(app):
+    app.cli.add_command(mock_data_command)
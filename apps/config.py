@@ -2,14 +2,58 @@ import os
 from datetime import timedelta
 
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
 
 
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name: str) -> list[str]:
+    return [item.strip() for item in os.getenv(name, '').split(',') if item.strip()]
+
+
+def engine_options() -> dict:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` from the ``DB_POOL_*`` and ``DB_PGBOUNCER`` variables."""
+    if env_flag('DB_PGBOUNCER'):
+        # Пулом управляет PgBouncer в режиме transaction: соединение не переживает транзакцию,
+        # поэтому серверное состояние между транзакциями (prepared statements, SET, курсоры WITH HOLD)
+        # недопустимо. psycopg2 ничего не подготавливает на сервере, а свой пул процессу не нужен
+        return {'poolclass': NullPool}
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': env_flag('DB_POOL_PRE_PING', True),
+    }
+
+
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options()
+    DB_PGBOUNCER = env_flag('DB_PGBOUNCER')
+    SQLALCHEMY_BINDS = {f'replica{index}': url for index, url in enumerate(env_list('DB_REPLICA_URLS'))}
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+    DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 10))
+    DB_REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5))
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     SECRET_KEY = os.getenv('SECRET_KEY')
     PROPAGATE_EXCEPTIONS = True
+    REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 300))
+    REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv('REFERENCE_CACHE_MAX_ENTRIES', 1024))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+    MAX_LIST_SIZE = int(os.getenv('MAX_LIST_SIZE', 1000))
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 32))
+    SERVER_TIMING = env_flag('SERVER_TIMING', True)
+    REQUEST_STATEMENTS_THRESHOLD = int(os.getenv('REQUEST_STATEMENTS_THRESHOLD', 0))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE', 0.1))
+    SLOW_QUERY_BUFFER = int(os.getenv('SLOW_QUERY_BUFFER', 100))
+    MOCK_DATA_API = env_flag('MOCK_DATA_API')
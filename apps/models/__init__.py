@@ -1,3 +1,3 @@
 from apps.models.enums import ProviderEnum, ValidateStatusEnum, StatusEnum, TicketTypeEnum
 from apps.models.models import Booking, Category, City, Country, Event, EventDates, EventDonation, FavouriteOrganizer, \
-    Feedback, Genre, Organizer, State, Ticket, User, Venue
+    Feedback, Genre, Organizer, OrganizerStats, State, Ticket, User, Venue
@@ -1,8 +1,8 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import backref
+from sqlalchemy import ForeignKey, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import backref, column_property, deferred, query_expression
 
 from apps.models import ProviderEnum, ValidateStatusEnum, StatusEnum, TicketTypeEnum
 from extensions import db
@@ -16,6 +16,10 @@ class Role(db.Model):
 
 class User(db.Model):
     __tablename__ = 'user'
+    __table_args__ = (
+        db.Index('ix_user_email', 'email'),
+        db.Index('ix_user_roleId', 'roleId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     firstName = db.Column(db.String(255), nullable=False)
@@ -32,6 +36,9 @@ class User(db.Model):
 
 class Organizer(db.Model):
     __tablename__ = 'organizer'
+    __table_args__ = (
+        db.Index('ix_organizer_userId', 'userId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -50,8 +57,36 @@ class Organizer(db.Model):
     user = db.relationship('User', backref=backref("organizers", cascade="all,delete"))
 
 
+class OrganizerStats(db.Model):
+    __tablename__ = 'organizerStats'
+
+    organizerId = db.Column(db.Integer, ForeignKey('organizer.id', ondelete='CASCADE'), primary_key=True)
+    subscribersCount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    eventsCount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    ratingSum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    ratingCount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
+# Таблицы, от которых зависят ETag (apps.utils.etag). Версия таблицы — своя последовательность:
+# nextval не блокирует строк, поэтому пишущие транзакции не выстраиваются в очередь за общим счетчиком
+VERSIONED_TABLES = (
+    'booking', 'category', 'city', 'country', 'event', 'eventDates', 'feedback', 'genre', 'organizer', 'state', 'user',
+    'venue',
+)
+table_version_sequences = {
+    table: db.Sequence(f'tableVersion_{table}', metadata=db.metadata) for table in VERSIONED_TABLES
+}
+
+
 class Event(db.Model):
     __tablename__ = 'event'
+    __table_args__ = (
+        db.Index('ix_event_searchVector', 'searchVector', postgresql_using='gin'),
+        db.Index('ix_event_organizerId', 'organizerId'),
+        db.Index('ix_event_genreId', 'genreId'),
+        # Списки показывают только активные события по возрастанию id
+        db.Index('ix_event_active_id', 'id', postgresql_where=text("status = 'ACTIVE'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -70,9 +105,33 @@ class Event(db.Model):
     organizerId = db.Column(db.Integer, ForeignKey('organizer.id'), nullable=False)
     organizer = db.relationship('Organizer', backref=backref("events", cascade="all,delete"))
 
+    searchVector = deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
+    searchRank = query_expression()
+    nameHighlight = query_expression()
+    descriptionHighlight = query_expression()
+
+    # Агрегаты оценок из отзывов, обновляются в apps.services.stats; ratingHistogram[i] — число оценок i (1..5)
+    ratingSum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    ratingCount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    ratingHistogram = db.Column(
+        ARRAY(db.Integer), nullable=False, default=lambda: [0] * 5, server_default='{0,0,0,0,0}'
+    )
+
+    @property
+    def averageRate(self):
+        return self.ratingSum / self.ratingCount if self.ratingCount else None
+
 
 class Ticket(db.Model):
     __tablename__ = 'ticket'
+    __table_args__ = (
+        db.Index('uq_ticket_eventDatesId_seat', 'eventDatesId', 'seat', unique=True),
+        db.Index('ix_ticket_bookingId', 'bookingId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     dateTime = db.Column(db.DateTime, nullable=False, default=datetime.utcnow())
@@ -88,6 +147,12 @@ class Ticket(db.Model):
 
 class Venue(db.Model):
     __tablename__ = 'venue'
+    __table_args__ = (
+        db.Index('ix_venue_eventId', 'eventId'),
+        db.Index('ix_venue_countryId', 'countryId'),
+        db.Index('ix_venue_stateId', 'stateId'),
+        db.Index('ix_venue_cityId', 'cityId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -112,6 +177,9 @@ class Venue(db.Model):
 
 class Country(db.Model):
     __tablename__ = 'country'
+    __table_args__ = (
+        db.Index('uq_country_name', 'name', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -119,6 +187,9 @@ class Country(db.Model):
 
 class State(db.Model):
     __tablename__ = 'state'
+    __table_args__ = (
+        db.Index('uq_state_countryId_name', 'countryId', 'name', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -129,6 +200,9 @@ class State(db.Model):
 
 class City(db.Model):
     __tablename__ = 'city'
+    __table_args__ = (
+        db.Index('uq_city_stateId_name', 'stateId', 'name', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -139,10 +213,16 @@ class City(db.Model):
 
 class EventDates(db.Model):
     __tablename__ = 'eventDates'
+    __table_args__ = (
+        db.Index('ix_eventDates_eventId', 'eventId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     startDateTime = db.Column(db.DateTime, nullable=False)
     endDateTime = db.Column(db.DateTime, nullable=False)
+    # Заполняются при первой продаже билета, см. apps.services.seats
+    capacity = db.Column(db.Integer)
+    remainingSeats = db.Column(db.Integer)
 
     eventId = db.Column(db.Integer, ForeignKey('event.id'), nullable=False)
     event = db.relationship('Event', backref=backref("eventDates", cascade="all,delete"))
@@ -150,6 +230,10 @@ class EventDates(db.Model):
 
 class EventDonation(db.Model):
     __tablename__ = 'eventDonation'
+    __table_args__ = (
+        db.Index('ix_eventDonation_eventId_id', 'eventId', 'id'),
+        db.Index('ix_eventDonation_userId_id', 'userId', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     dateTime = db.Column(db.DateTime, nullable=False)
@@ -165,6 +249,10 @@ class EventDonation(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'booking'
+    __table_args__ = (
+        db.Index('uq_booking_userId_eventId', 'userId', 'eventId', unique=True),
+        db.Index('ix_booking_eventId_id', 'eventId', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -175,6 +263,14 @@ class Booking(db.Model):
     user = db.relationship('User', backref=backref("bookings", cascade="all,delete"))
 
 
+# Количество бронирований считается коррелированным подзапросом в том же SELECT, что и само событие.
+# Колонка отложенная: списки подгружают её через undefer(Event.bookingsCount)
+Event.bookingsCount = column_property(
+    select(func.count(Booking.id)).where(Booking.eventId == Event.id).correlate_except(Booking).scalar_subquery(),
+    deferred=True,
+)
+
+
 class Category(db.Model):
     __tablename__ = 'category'
 
@@ -186,6 +282,9 @@ class Category(db.Model):
 
 class Genre(db.Model):
     __tablename__ = 'genre'
+    __table_args__ = (
+        db.Index('ix_genre_categoryId', 'categoryId'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -196,6 +295,11 @@ class Genre(db.Model):
 
 class Feedback(db.Model):
     __tablename__ = 'feedback'
+    __table_args__ = (
+        db.Index('ix_feedback_eventId', 'eventId'),
+        db.Index('ix_feedback_userId', 'userId'),
+        db.Index('ix_feedback_dateTime_id', 'dateTime', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.Text)
@@ -212,6 +316,10 @@ class Feedback(db.Model):
 
 class FavouriteOrganizer(db.Model):
     __tablename__ = 'favouriteOrganizer'
+    __table_args__ = (
+        db.Index('uq_favouriteOrganizer_organizerId_userId', 'organizerId', 'userId', unique=True),
+        db.Index('ix_favouriteOrganizer_userId_id', 'userId', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     dateTime = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,158 @@
+"""Bulk event import: validate a whole batch, then insert it with a handful of set-based statements."""
+import datetime
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+
+from sqlalchemy import func, insert, select
+
+from apps.models import Event, EventDates, Genre, Organizer, StatusEnum, ValidateStatusEnum, Venue
+from apps.services.locations import locations
+from apps.services.stats import bump_organizer
+from extensions import db
+
+MAX_BATCH_SIZE = 10000
+
+EVENT_FIELDS = {
+    'name': str,
+    'description': str,
+    'expectedAmount': Decimal,
+    'recommendedDonation': Decimal,
+    'validateStatus': ValidateStatusEnum,
+    'countOfMembers': int,
+    'status': StatusEnum,
+    'concession': str,
+    'genreId': int,
+    'organizerId': int,
+}
+VENUE_FIELDS = {
+    'name': str,
+    'description': str,
+    'address': str,
+    'seats': int,
+    'country': str,
+    'state': str,
+    'city': str,
+}
+
+
+class ItemError(ValueError):
+    pass
+
+
+def _convert(data: dict, schema: dict, prefix: str = '') -> dict:
+    values = {}
+    for field, type_ in schema.items():
+        value = data.get(field)
+        if value is None:
+            raise ItemError(f'{prefix}{field} is required')
+        if type_ is int and isinstance(value, bool):
+            raise ItemError(f'{prefix}{field} must be int')
+        try:
+            values[field] = type_(str(value)) if type_ is Decimal else type_(value)
+        except (ValueError, TypeError, InvalidOperation):
+            if issubclass(type_, Enum):
+                raise ItemError(f'{prefix}{field} must be one of {", ".join(enum.value for enum in type_)}')
+            raise ItemError(f'{prefix}{field} must be {type_.__name__}')
+    return values
+
+
+def _validate(item) -> tuple[dict, list, list]:
+    if not isinstance(item, dict):
+        raise ItemError('item must be an object')
+
+    event = _convert(item, EVENT_FIELDS)
+
+    dates = []
+    for i, date_time in enumerate(item.get('eventDateTimes') or []):
+        try:
+            start = datetime.datetime.fromisoformat(date_time['startDateTime'])
+            end = datetime.datetime.fromisoformat(date_time['endDateTime'])
+        except (KeyError, TypeError, ValueError):
+            raise ItemError(f'eventDateTimes[{i}] must have ISO startDateTime and endDateTime')
+        if end < start:
+            raise ItemError(f'eventDateTimes[{i}] ends before it starts')
+        dates.append({'startDateTime': start, 'endDateTime': end})
+    if not dates:
+        raise ItemError('eventDateTimes must not be empty')
+
+    venues = []
+    for i, venue in enumerate(item.get('venues') or []):
+        if not isinstance(venue, dict):
+            raise ItemError(f'venues[{i}] must be an object')
+        values = _convert(venue, VENUE_FIELDS, prefix=f'venues[{i}].')
+        photos = venue.get('photos') or []
+        if not isinstance(photos, list) or not all(isinstance(photo, str) for photo in photos):
+            raise ItemError(f'venues[{i}].photos must be a list of strings')
+        values['photos'] = photos
+        venues.append(values)
+
+    return event, dates, venues
+
+
+def _existing_ids(model, ids) -> set:
+    if not ids:
+        return set()
+    return set(db.session.execute(select(model.id).where(model.id.in_(ids))).scalars())
+
+
+def import_events(items: list) -> list[dict]:
+    """Insert every valid item of ``items`` and return one result per item, in order.
+
+    Invalid items are reported with their errors and skipped; valid ones are inserted
+    in the current transaction, which the caller commits.
+    """
+    results = [{'index': index, 'id': None, 'errors': []} for index in range(len(items))]
+
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, *_validate(item)))
+        except ItemError as e:
+            results[index]['errors'].append(str(e))
+
+    # Жанры и организаторов проверяем одним запросом на всю пачку
+    genres = _existing_ids(Genre, {event['genreId'] for _, event, _, _ in valid})
+    organizers = _existing_ids(Organizer, {event['organizerId'] for _, event, _, _ in valid})
+    checked = []
+    for index, event, dates, venues in valid:
+        if event['genreId'] not in genres:
+            results[index]['errors'].append('Genre not found')
+        elif event['organizerId'] not in organizers:
+            results[index]['errors'].append('Organizer not found')
+        else:
+            checked.append((index, event, dates, venues))
+    if not checked:
+        return results
+
+    resolved = locations.resolve_many(
+        (venue['country'], venue['state'], venue['city']) for _, _, _, venues in checked for venue in venues
+    )
+
+    # id событий берем из последовательности заранее, чтобы даты и места ссылались на них без RETURNING
+    event_ids = db.session.execute(
+        select(func.nextval(func.pg_get_serial_sequence('event', 'id'))).select_from(
+            func.generate_series(1, len(checked))
+        )
+    ).scalars().all()
+
+    event_rows, dates_rows, venue_rows = [], [], []
+    for event_id, (index, event, dates, venues) in zip(event_ids, checked):
+        event_rows.append({'id': event_id, **event})
+        dates_rows.extend({'eventId': event_id, **dates_data} for dates_data in dates)
+        for venue in venues:
+            country_id, state_id, city_id = resolved[(venue.pop('country'), venue.pop('state'), venue.pop('city'))]
+            venue_rows.append({
+                'eventId': event_id, 'countryId': country_id, 'stateId': state_id, 'cityId': city_id, **venue
+            })
+        results[index]['id'] = event_id
+
+    db.session.execute(insert(Event), event_rows)
+    db.session.execute(insert(EventDates), dates_rows)
+    if venue_rows:
+        db.session.execute(insert(Venue), venue_rows)
+
+    # Core-вставка не вызывает mapper events, поэтому счетчики организаторов обновляем сами
+    for organizer_id, count in Counter(event['organizerId'] for event in event_rows).items():
+        bump_organizer(db.session.connection(), organizer_id, eventsCount=count)
+    return results
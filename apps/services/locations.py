@@ -0,0 +1,119 @@
+"""Get-or-create for the Country → State → City hierarchy used by event venues."""
+import threading
+
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from apps.models import City, Country, State
+from extensions import db
+
+MEMO_MAX_SIZE = 10000
+
+
+class LocationResolver:
+    """Resolves location names to ids with one statement per unknown level.
+
+    Each level is an ``INSERT ... ON CONFLICT DO NOTHING RETURNING id`` combined with a select
+    of the existing row, so concurrent requests cannot create duplicates (the unique indexes
+    arbitrate). Resolved ids are memoized per process once the transaction that produced them
+    commits; a known (country, state, city) triple then costs no queries at all.
+    """
+
+    def __init__(self):
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, country_name: str, state_name: str, city_name: str) -> tuple[int, int, int]:
+        country_id = self._get_or_create(Country, name=country_name)
+        state_id = self._get_or_create(State, name=state_name, countryId=country_id)
+        city_id = self._get_or_create(City, name=city_name, stateId=state_id)
+        return country_id, state_id, city_id
+
+    def resolve_many(self, triples) -> dict:
+        """Resolve many (country, state, city) name triples with two statements per level."""
+        triples = set(triples)
+        countries = self._get_or_create_many(Country, [{'name': country} for country, _, _ in triples])
+        states = self._get_or_create_many(State, [
+            {'name': state, 'countryId': countries[(country,)]} for country, state, _ in triples
+        ])
+        cities = self._get_or_create_many(City, [
+            {'name': city, 'stateId': states[(state, countries[(country,)])]} for country, state, city in triples
+        ])
+        resolved = {}
+        for country, state, city in triples:
+            country_id = countries[(country,)]
+            state_id = states[(state, country_id)]
+            resolved[(country, state, city)] = (country_id, state_id, cities[(city, state_id)])
+        return resolved
+
+    def forget(self):
+        with self._lock:
+            self._memo.clear()
+
+    def _get_or_create(self, model, **values) -> int:
+        key = (model.__tablename__, *values.values())
+        with self._lock:
+            row_id = self._memo.get(key)
+        if row_id is not None:
+            db.session.info.setdefault('resolved_locations', {})[key] = row_id
+            return row_id
+
+        inserted = insert(model).values(**values).on_conflict_do_nothing(
+            index_elements=list(values)
+        ).returning(model.id).cte('inserted')
+        existing = select(model.id).filter_by(**values)
+        row_id = db.session.execute(select(inserted.c.id).union_all(existing).limit(1)).scalar()
+        if row_id is None:
+            # Строку вставила параллельная транзакция уже после снимка нашего запроса — перечитываем
+            row_id = db.session.execute(existing).scalar_one()
+
+        db.session.info.setdefault('resolved_locations', {})[key] = row_id
+        return row_id
+
+    def _get_or_create_many(self, model, rows) -> dict:
+        """Map each row's values tuple to an id; rows must share the same keys."""
+        rows = list({tuple(row.values()): row for row in rows}.values())
+        if not rows:
+            return {}
+        keys = list(rows[0])
+        resolved = {}
+        with self._lock:
+            for row in rows:
+                row_id = self._memo.get((model.__tablename__, *row.values()))
+                if row_id is not None:
+                    resolved[tuple(row.values())] = row_id
+        unknown = [row for row in rows if tuple(row.values()) not in resolved]
+
+        if unknown:
+            db.session.execute(insert(model).values(unknown).on_conflict_do_nothing(index_elements=keys))
+            columns = [getattr(model, key) for key in keys]
+            found = db.session.execute(
+                select(model.id, *columns).where(tuple_(*columns).in_([tuple(row.values()) for row in unknown]))
+            )
+            for row_id, *values in found:
+                resolved[tuple(values)] = row_id
+
+        memo = db.session.info.setdefault('resolved_locations', {})
+        for values, row_id in resolved.items():
+            memo[(model.__tablename__, *values)] = row_id
+        return resolved
+
+    def _commit(self, session):
+        resolved = session.info.pop('resolved_locations', None)
+        if resolved:
+            with self._lock:
+                if len(self._memo) + len(resolved) > MEMO_MAX_SIZE:
+                    self._memo.clear()
+                self._memo.update(resolved)
+
+    def _rollback(self, session):
+        # id из откатанной транзакции может не существовать, а ошибка FK означает устаревший memo
+        if session.info.pop('resolved_locations', None) is not None:
+            self.forget()
+
+
+locations = LocationResolver()
+
+event.listen(Session, 'after_commit', locations._commit)
+event.listen(Session, 'after_rollback', locations._rollback)
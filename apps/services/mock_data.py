@@ -0,0 +1,346 @@
+"""Bulk generator of realistic data for load testing.
+
+``generate(scale, seed)`` adds a dataset of the given ``Scale`` in the current transaction. The
+text values come from pools drawn once from a seeded ``Faker('ru_RU')`` and are combined with a
+seeded ``random.Random``. The same seed therefore gives the same dataset, and a million rows
+need only a few thousand Faker calls. Popularity is skewed: a few events collect most bookings
+and feedback.
+
+Rows are streamed with ``COPY ... FROM STDIN`` in batches of ``BATCH_SIZE``. Ids are assigned
+here, after the current maximum, so child rows reference their parents without a round trip;
+the sequences are moved past them at the end. COPY bypasses the mapper events, so the counters
+of ``apps.services.stats``, the seat counters and the table versions are recomputed afterwards
+with a few set-based statements.
+"""
+import csv
+import datetime
+import io
+import random
+from array import array
+from collections import namedtuple
+from itertools import islice
+
+from faker import Faker
+from sqlalchemy import func, select, text
+
+from apps.models import Booking, Category, Event, EventDates, EventDonation, FavouriteOrganizer, Feedback, Genre, \
+    Organizer, ProviderEnum, StatusEnum, Ticket, TicketTypeEnum, User, ValidateStatusEnum, Venue
+from apps.models.models import Role
+from apps.services import passwords
+from apps.services.locations import locations
+from apps.services.versions import mark_changed
+from extensions import db
+
+BATCH_SIZE = 50000
+# Сколько значений каждого вида берем у Faker; строки собираются из них случайным выбором
+POOL_SIZE = 1000
+# Пароль всех сгенерированных пользователей, почта — user<id>@example.com
+PASSWORD = 'password'
+COUNTRIES, STATES_PER_COUNTRY, CITIES_PER_STATE = 5, 4, 5
+CATEGORIES, GENRES_PER_CATEGORY = 5, 4
+
+# dates — дат на событие, tickets — билетов на бронирование, остальное — число строк
+Scale = namedtuple(
+    'Scale',
+    ['users', 'organizers', 'events', 'dates', 'bookings', 'tickets', 'feedbacks', 'donations', 'favourites'],
+    defaults=[1000, 50, 500, 3, 5000, 2, 2000, 1000, 2000],
+)
+# Предел для генерации через API: одна такая загрузка занимает воркер не дольше минуты
+API_SCALE_LIMIT = Scale(
+    users=100000, organizers=5000, events=50000, dates=10, bookings=500000, tickets=10, feedbacks=200000,
+    donations=100000, favourites=200000,
+)
+
+
+def generate(scale: Scale = Scale(), seed: int = 0, limit: Scale | None = None) -> dict:
+    """Insert a ``scale`` dataset and return the number of new rows per table. The caller commits.
+
+    ``limit`` caps every field of the scale; the command line generator has none.
+    """
+    if min(scale.users, scale.organizers, scale.events) < 1:
+        raise ValueError('users, organizers and events must be positive')
+    if min(scale) < 0:
+        raise ValueError('scale must not be negative')
+    if limit is not None:
+        for name, value, maximum in zip(Scale._fields, scale, limit):
+            if value > maximum:
+                raise ValueError(f'{name} must not exceed {maximum}')
+    return _Generator(seed).run(scale)
+
+
+def analyze(tables):
+    """Refresh planner statistics after a bulk load; run after the commit."""
+    for table in tables:
+        db.session.execute(text(f'ANALYZE "{table}"'))
+    db.session.commit()
+
+
+def _array(values) -> str:
+    return '{' + ','.join('"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"' for value in values) + '}'
+
+
+class _Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.now = datetime.datetime(2023, 6, 1)
+        self.counts = {}
+
+    def run(self, scale: Scale) -> dict:
+        self._pools()
+        self._reference_data()
+        self.cursor = db.session.connection().connection.cursor()
+
+        users = self._copy(User, self._users(scale.users))
+        organizers = self._copy(Organizer, self._organizers(scale.organizers, users))
+        events = self._copy(Event, self._events(scale.events, organizers))
+        self._copy(Venue, self._venues(events))
+        dates = self._copy(EventDates, self._event_dates(events, scale.dates))
+        bookings = self._copy(Booking, self._bookings(scale.bookings, events, users))
+        self._copy(Ticket, self._tickets(bookings, events, dates, scale.dates, scale.tickets))
+        self._copy(Feedback, self._feedbacks(scale.feedbacks, events, users))
+        self._copy(EventDonation, self._donations(scale.donations, events, users))
+        self._copy(FavouriteOrganizer, self._favourites(scale.favourites, organizers, users))
+
+        self._recompute(events, organizers, dates)
+        mark_changed(db.session, 'organizerStats', *self.counts)
+        return self.counts
+
+    def _pools(self):
+        fake, size = self.fake, POOL_SIZE
+        self.first_names = [fake.first_name() for _ in range(size)]
+        self.last_names = [fake.last_name() for _ in range(size)]
+        self.middle_names = [fake.middle_name() for _ in range(size)]
+        self.companies = [fake.company() for _ in range(size)]
+        self.sentences = [fake.sentence()[:255] for _ in range(size)]
+        self.texts = [fake.text() for _ in range(size)]
+        self.urls = [fake.url() for _ in range(size)]
+        self.images = [fake.image_url() for _ in range(size)]
+        self.addresses = [fake.address()[:255] for _ in range(size)]
+        self.cards = [fake.credit_card_number() for _ in range(size)]
+        self.names = [fake.name() for _ in range(size)]
+
+    def _reference_data(self):
+        fake = self.fake
+        if db.session.get(Role, 1) is None:
+            db.session.add(Role(role='user'))
+
+        categories = [Category(name=fake.unique.word()) for _ in range(CATEGORIES)]
+        genres = [Genre(name=fake.unique.word(), category=category)
+                  for category in categories for _ in range(GENRES_PER_CATEGORY)]
+        db.session.add_all(categories + genres)
+        db.session.flush()
+        self.genre_ids = [genre.id for genre in genres]
+
+        triples = [
+            (country, state, fake.unique.city())
+            for country in [fake.unique.country() for _ in range(COUNTRIES)]
+            for state in [fake.unique.region() for _ in range(STATES_PER_COUNTRY)]
+            for _ in range(CITIES_PER_STATE)
+        ]
+        fake.unique.clear()
+        self.locations = list(locations.resolve_many(triples).values())
+
+    def _copy(self, model, rows) -> range:
+        """COPY the rows of ``model`` (tuples in column order, id first); return their ids."""
+        table = model.__table__
+        columns, rows = next(rows), iter(rows)
+        start = db.session.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar() + 1
+        statement = 'COPY "{}" ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            table.name, ', '.join(f'"{column}"' for column in ['id', *columns])
+        )
+
+        count = 0
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows((start + count + index, *row) for index, row in enumerate(batch))
+            buffer.seek(0)
+            self.cursor.copy_expert(statement, buffer)
+            count += len(batch)
+
+        self.counts[table.name] = count
+        if count:
+            db.session.execute(
+                text('SELECT setval(pg_get_serial_sequence(:table, \'id\'), :last)'),
+                {'table': f'"{table.name}"', 'last': start + count - 1},
+            )
+        return range(start, start + count)
+
+    def _skewed(self, ids: range) -> int:
+        # Квадрат равномерного числа: первые id заметно популярнее последних
+        return ids[int(len(ids) * self.rng.random() ** 2)]
+
+    def _date(self, days: int) -> datetime.datetime:
+        return self.now + datetime.timedelta(days=self.rng.randrange(-days, days), minutes=self.rng.randrange(1440))
+
+    def _users(self, count: int):
+        yield ['firstName', 'lastName', 'middleName', 'birthday', 'password', 'email', 'avatar', 'trusted',
+               'provider', 'roleId']
+        # Хэш с текущими параметрами, чтобы вход не перехэшировал пароль
+        rng, password = self.rng, passwords.hash_password(PASSWORD)
+        # email зависит от id, а id назначает _copy — берем ту же нумерацию
+        start = db.session.execute(select(func.coalesce(func.max(User.id), 0))).scalar() + 1
+        for index in range(count):
+            yield (
+                rng.choice(self.first_names), rng.choice(self.last_names), rng.choice(self.middle_names),
+                datetime.datetime(1960, 1, 1) + datetime.timedelta(days=rng.randrange(16000)), password,
+                f'user{start + index}@example.com', rng.choice(self.images), True, ProviderEnum.SYSTEM.name, 1,
+            )
+
+    def _organizers(self, count: int, users: range):
+        yield ['name', 'logo', 'background', 'description', 'cardNumber', 'cardHolderName', 'facebook', 'telegram',
+               'vk', 'twitter', 'instagram', 'userId']
+        rng = self.rng
+        for index in range(count):
+            yield (
+                rng.choice(self.companies), rng.choice(self.images), rng.choice(self.images), rng.choice(self.texts),
+                rng.choice(self.cards), rng.choice(self.names), *[rng.choice(self.urls) for _ in range(5)],
+                users[index % len(users)],
+            )
+
+    def _events(self, count: int, organizers: range):
+        yield ['name', 'description', 'expectedAmount', 'recommendedDonation', 'validateStatus', 'countOfMembers',
+               'status', 'concession', 'genreId', 'organizerId']
+        rng = self.rng
+        statuses = [StatusEnum.ACTIVE.name] * 8 + [StatusEnum.APPROVED.name, StatusEnum.POSPOND.name]
+        for _ in range(count):
+            yield (
+                rng.choice(self.sentences), rng.choice(self.texts), rng.randrange(1000, 1000000),
+                rng.choice((100, 300, 500, 1000)), rng.choice(list(ValidateStatusEnum)).name, rng.randrange(10, 5000),
+                rng.choice(statuses), rng.choice(('0+', '6+', '12+', '16+', '18+')), rng.choice(self.genre_ids),
+                self._skewed(organizers),
+            )
+
+    def _venues(self, events: range):
+        yield ['name', 'description', 'photos', 'address', 'seats', 'countryId', 'stateId', 'cityId', 'eventId']
+        rng = self.rng
+        for event_id in events:
+            yield (
+                rng.choice(self.companies), rng.choice(self.texts), _array(rng.sample(self.images, 2)),
+                rng.choice(self.addresses), rng.randrange(50, 2000), *rng.choice(self.locations), event_id,
+            )
+
+    def _event_dates(self, events: range, per_event: int):
+        yield ['startDateTime', 'endDateTime', 'eventId']
+        for event_id in events:
+            start = self._date(180)
+            for week in range(per_event):
+                begins = start + datetime.timedelta(weeks=week)
+                yield begins, begins + datetime.timedelta(hours=3), event_id
+
+    def _bookings(self, count: int, events: range, users: range):
+        yield ['eventId', 'userId']
+        rng = self.rng
+        # Пользователь бронирует событие не больше одного раза: k-я бронь события достается
+        # пользователю (offset + k) по модулю числа пользователей, без множества всех пар в памяти
+        offsets = array('l', (rng.randrange(len(users)) for _ in events))
+        taken = array('l', bytes(8 * len(events)))
+        self.booking_events = array('l')
+        for _ in range(count):
+            event_id = self._skewed(events)
+            index = event_id - events.start
+            if taken[index] >= len(users):
+                continue
+            user_id = users[(offsets[index] + taken[index]) % len(users)]
+            taken[index] += 1
+            self.booking_events.append(event_id)
+            yield event_id, user_id
+
+    def _tickets(self, bookings: range, events: range, dates: range, dates_per_event: int, per_booking: int):
+        yield ['dateTime', 'ticketType', 'seat', 'eventDatesId', 'bookingId']
+        if not dates_per_event:
+            return
+        rng = self.rng
+        # Места по каждой дате выдаются подряд, поэтому пара (eventDatesId, seat) уникальна
+        seats = array('l', bytes(8 * len(dates)))
+        for booking_id, event_id in zip(bookings, self.booking_events):
+            first_date = dates.start + (event_id - events.start) * dates_per_event
+            for _ in range(per_booking):
+                event_dates_id = first_date + rng.randrange(dates_per_event)
+                seats[event_dates_id - dates.start] += 1
+                yield (
+                    self._date(60), TicketTypeEnum.NUMERIC.name, seats[event_dates_id - dates.start], event_dates_id,
+                    booking_id,
+                )
+
+    def _feedbacks(self, count: int, events: range, users: range):
+        yield ['description', 'rate', 'dateTime', 'photos', 'eventId', 'userId']
+        rng = self.rng
+        for _ in range(count):
+            yield (
+                rng.choice(self.texts), rng.choices((1, 2, 3, 4, 5), weights=(1, 1, 2, 4, 5))[0], self._date(180),
+                _array(rng.sample(self.images, rng.randrange(3))), self._skewed(events), rng.choice(users),
+            )
+
+    def _donations(self, count: int, events: range, users: range):
+        yield ['dateTime', 'amount', 'comment', 'userId', 'eventId']
+        rng = self.rng
+        for _ in range(count):
+            yield (
+                self._date(180), rng.choice((100, 200, 500, 1000, 5000)), rng.choice(self.sentences),
+                rng.choice(users), self._skewed(events),
+            )
+
+    def _favourites(self, count: int, organizers: range, users: range):
+        yield ['dateTime', 'userId', 'organizerId']
+        rng = self.rng
+        offsets = array('l', (rng.randrange(len(users)) for _ in organizers))
+        taken = array('l', bytes(8 * len(organizers)))
+        for _ in range(count):
+            organizer_id = self._skewed(organizers)
+            index = organizer_id - organizers.start
+            if taken[index] >= len(users):
+                continue
+            user_id = users[(offsets[index] + taken[index]) % len(users)]
+            taken[index] += 1
+            yield self._date(180), user_id, organizer_id
+
+    def _recompute(self, events: range, organizers: range, dates: range):
+        ranges = {
+            'first_event': events.start, 'last_event': events.stop - 1,
+            'first_organizer': organizers.start, 'last_organizer': organizers.stop - 1,
+            'first_date': dates.start, 'last_date': dates.stop - 1,
+        }
+        db.session.execute(text('''
+            UPDATE event SET "ratingSum" = r.sum, "ratingCount" = r.count, "ratingHistogram" = r.histogram
+            FROM (
+                SELECT "eventId", sum(rate) AS sum, count(*) AS count, ARRAY[
+                    count(*) FILTER (WHERE rate = 1), count(*) FILTER (WHERE rate = 2),
+                    count(*) FILTER (WHERE rate = 3), count(*) FILTER (WHERE rate = 4),
+                    count(*) FILTER (WHERE rate = 5)
+                ] AS histogram
+                FROM feedback WHERE "eventId" BETWEEN :first_event AND :last_event GROUP BY "eventId"
+            ) r
+            WHERE event.id = r."eventId"
+        '''), ranges)
+        db.session.execute(text('''
+            INSERT INTO "organizerStats" ("organizerId", "subscribersCount", "eventsCount", "ratingSum", "ratingCount")
+            SELECT o.id, coalesce(s.count, 0), coalesce(e.count, 0), coalesce(e.sum, 0), coalesce(e.rated, 0)
+            FROM organizer o
+            LEFT JOIN (
+                SELECT "organizerId", count(*) AS count FROM "favouriteOrganizer"
+                WHERE "organizerId" BETWEEN :first_organizer AND :last_organizer GROUP BY "organizerId"
+            ) s ON s."organizerId" = o.id
+            LEFT JOIN (
+                SELECT "organizerId", count(*) AS count, sum("ratingSum") AS sum, sum("ratingCount") AS rated
+                FROM event WHERE "organizerId" BETWEEN :first_organizer AND :last_organizer GROUP BY "organizerId"
+            ) e ON e."organizerId" = o.id
+            WHERE o.id BETWEEN :first_organizer AND :last_organizer
+            ON CONFLICT ("organizerId") DO UPDATE SET
+                "subscribersCount" = excluded."subscribersCount", "eventsCount" = excluded."eventsCount",
+                "ratingSum" = excluded."ratingSum", "ratingCount" = excluded."ratingCount"
+        '''), ranges)
+        db.session.execute(text('''
+            UPDATE "eventDates" d SET capacity = v.seats, "remainingSeats" = greatest(
+                v.seats - (SELECT count(*) FROM ticket t WHERE t."eventDatesId" = d.id), 0
+            )
+            FROM (
+                SELECT "eventId", sum(seats) AS seats FROM venue
+                WHERE "eventId" BETWEEN :first_event AND :last_event GROUP BY "eventId"
+            ) v
+            WHERE d."eventId" = v."eventId" AND d.id BETWEEN :first_date AND :last_date
+        '''), ranges)
@@ -0,0 +1,104 @@
+"""Password hashing off the request threads.
+
+PBKDF2 burns tens of milliseconds of CPU per call by design. Every hash and check runs in a
+process-wide pool of ``PASSWORD_HASH_WORKERS`` threads (``hashlib`` releases the GIL while
+hashing), so a burst of logins can use at most that many cores. At most ``PASSWORD_HASH_QUEUE``
+more calls wait for a free worker; beyond that ``HashingBusy`` is raised right away instead of
+queueing without bound. Hashes made with older parameters than ``PASSWORD_HASH_METHOD`` are
+reported by ``needs_rehash`` so login can replace them.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingPool:
+    def __init__(self):
+        self.workers = 0
+        self.calls = 0
+        self.rejected = 0
+        self.queue_total = 0.0
+        self.queue_max = 0.0
+        self.hash_total = 0.0
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                self.workers = current_app.config.get('PASSWORD_HASH_WORKERS', 2)
+                queue = current_app.config.get('PASSWORD_HASH_QUEUE', 32)
+                self._slots = threading.BoundedSemaphore(self.workers + queue)
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+
+    def run(self, func, *args):
+        if self._executor is None:
+            self._start()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy('Too many password checks in progress, retry later')
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._observe(started - submitted, time.perf_counter() - started)
+
+        try:
+            return self._executor.submit(job).result()
+        finally:
+            self._slots.release()
+
+    def _observe(self, queued: float, hashed: float):
+        with self._lock:
+            self.calls += 1
+            self.queue_total += queued
+            self.queue_max = max(self.queue_max, queued)
+            self.hash_total += hashed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'calls': self.calls,
+                'rejected': self.rejected,
+                'queueAvgMs': round(self.queue_total / self.calls * 1000, 3) if self.calls else 0.0,
+                'queueMaxMs': round(self.queue_max * 1000, 3),
+                'hashAvgMs': round(self.hash_total / self.calls * 1000, 3) if self.calls else 0.0,
+            }
+
+
+pool = HashingPool()
+
+
+def _method() -> str:
+    return current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+
+
+def hash_password(password: str) -> str:
+    return pool.run(generate_password_hash, password, _method())
+
+
+def check_password(pwhash: str, password: str) -> bool:
+    return pool.run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash: str) -> bool:
+    """True when ``pwhash`` was made with other parameters than ``PASSWORD_HASH_METHOD``."""
+    method = _method()
+    if method.startswith('pbkdf2:') and method.count(':') == 1:
+        # Без числа итераций werkzeug подставляет свое значение по умолчанию
+        method = f'{method}:{DEFAULT_PBKDF2_ITERATIONS}'
+    return pwhash.split('$', 1)[0] != method
@@ -0,0 +1,143 @@
+"""Seat allocation for event dates.
+
+Capacity is the sum of the event's venue seats and is kept in ``EventDates.remainingSeats``.
+Reserving a seat is one conditional ``UPDATE ... WHERE remainingSeats > 0``: it only locks the
+row of that event date, and a concurrent request either sees the decremented counter or waits
+for the row lock — there is no table lock and no read-then-write race. The unique
+``(eventDatesId, seat)`` index makes double booking of a concrete seat impossible.
+
+Seats come back through mapper events on ``Ticket``: a deleted ticket, also one removed by an
+ORM cascade from its booking, user or event, and a ticket moved to another date release their
+seat in the flushing transaction. Tickets deleted with Core statements must call ``release``.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, event, func, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from apps.models import EventDates, Ticket, Venue
+from extensions import db
+
+
+class SeatError(Exception):
+    pass
+
+
+class SoldOut(SeatError):
+    pass
+
+
+class SeatTaken(SeatError):
+    pass
+
+
+class InvalidSeat(SeatError):
+    pass
+
+
+def _initialize(event_dates_id: int):
+    capacity = select(func.coalesce(func.sum(Venue.seats), 0)).where(
+        Venue.eventId == EventDates.eventId
+    ).scalar_subquery()
+    sold = select(func.count(Ticket.id)).where(Ticket.eventDatesId == EventDates.id).scalar_subquery()
+    db.session.execute(
+        update(EventDates)
+        .where(EventDates.id == event_dates_id, EventDates.remainingSeats.is_(None))
+        .values(capacity=capacity, remainingSeats=func.greatest(capacity - sold, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reserve(event_dates_id: int) -> int:
+    """Take one seat off the counter and return the capacity of the event date."""
+    reserve = (
+        update(EventDates)
+        .where(EventDates.id == event_dates_id, EventDates.remainingSeats > 0)
+        .values(remainingSeats=EventDates.remainingSeats - 1)
+        .returning(EventDates.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    capacity = db.session.execute(reserve).scalar()
+    if capacity is None:
+        # Счетчик еще не заполнен — считаем его по местам площадок и проданным билетам
+        _initialize(event_dates_id)
+        capacity = db.session.execute(reserve).scalar()
+    if capacity is None:
+        raise SoldOut('No seats left')
+    return capacity
+
+
+def capacity(event_dates_id: int) -> int:
+    """Capacity of the event date, computing the counters first if they are not filled yet."""
+    _initialize(event_dates_id)
+    return db.session.execute(select(EventDates.capacity).where(EventDates.id == event_dates_id)).scalar() or 0
+
+
+def check_seat(seat: int, capacity: int):
+    if not 1 <= seat <= capacity:
+        raise InvalidSeat(f'Seat must be between 1 and {capacity}')
+
+
+def allocate(event_dates_id: int, booking_id: int, ticket_type, seat: int | None = None) -> Ticket:
+    """Create a ticket for ``seat`` or, when it is not given, for the lowest free seat."""
+    capacity = reserve(event_dates_id)
+    values = {
+        'dateTime': datetime.now(),
+        'ticketType': ticket_type,
+        'eventDatesId': event_dates_id,
+        'bookingId': booking_id,
+    }
+
+    if seat is not None:
+        check_seat(seat, capacity)
+        statement = insert(Ticket).values(**values, seat=seat)
+    else:
+        seats = func.generate_series(1, capacity).table_valued('seat')
+        taken = select(Ticket.id).where(and_(Ticket.eventDatesId == event_dates_id, Ticket.seat == seats.c.seat))
+        columns = [literal(value, Ticket.__table__.c[key].type) for key, value in values.items()]
+        free_seat = select(*columns, seats.c.seat).where(~taken.exists()).order_by(seats.c.seat).limit(1)
+        statement = insert(Ticket).from_select([*values, 'seat'], free_seat)
+
+    ticket_id = db.session.execute(
+        statement.on_conflict_do_nothing(index_elements=['eventDatesId', 'seat']).returning(Ticket.id)
+    ).scalar()
+    if ticket_id is None:
+        raise SeatTaken('Seat is already taken') if seat is not None else SoldOut('No seats left')
+    return db.session.get(Ticket, ticket_id)
+
+
+def _release(event_dates_id: int, count: int = 1):
+    return (
+        update(EventDates)
+        .where(EventDates.id == event_dates_id, EventDates.remainingSeats.is_not(None))
+        .values(remainingSeats=func.least(EventDates.remainingSeats + count, EventDates.capacity))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def release(event_dates_id: int, count: int = 1):
+    """Return ``count`` seats to the counter after tickets are deleted with Core statements."""
+    db.session.execute(_release(event_dates_id, count))
+
+
+def reset_capacity(event_id: int):
+    """Drop the counters of an event's dates so they are recomputed after its venues change."""
+    db.session.execute(
+        update(EventDates)
+        .where(EventDates.eventId == event_id)
+        .values(capacity=None, remainingSeats=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@event.listens_for(Ticket, 'after_delete')
+def _ticket_deleted(mapper, connection, target):
+    connection.execute(_release(target.eventDatesId))
+
+
+@event.listens_for(Ticket, 'after_update')
+def _ticket_updated(mapper, connection, target):
+    # Место на новой дате занимает обработчик через reserve, до записи: там нужна проверка SoldOut
+    history = inspect(target).attrs.eventDatesId.history
+    if history.deleted and int(history.deleted[0]) != int(target.eventDatesId):
+        connection.execute(_release(history.deleted[0]))
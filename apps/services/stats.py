@@ -0,0 +1,113 @@
+"""Incrementally maintained organizer and event statistics.
+
+``OrganizerStats`` keeps subscriber, event and rating counters per organizer, and ``Event`` keeps
+its own rating sum, count and 1..5 histogram. Mapper events on ``FavouriteOrganizer``, ``Event``
+and ``Feedback`` apply each change as an atomic ``x = x + delta`` update (an
+``INSERT ... ON CONFLICT DO UPDATE`` for organizers) in the flushing transaction, so ORM
+cascades (deleting a user, an event or an organizer) keep the counters right as well.
+Rows written with Core statements bypass mapper events and must call ``bump_organizer``.
+"""
+from sqlalchemy import event, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from apps.models import Event, FavouriteOrganizer, Feedback, OrganizerStats
+from extensions import db
+
+stats_table = OrganizerStats.__table__
+
+
+def _upsert(source, deltas: dict):
+    statement = insert(OrganizerStats).from_select(['organizerId', *deltas], source, include_defaults=False)
+    return statement.on_conflict_do_update(
+        index_elements=['organizerId'],
+        set_={key: stats_table.c[key] + statement.excluded[key] for key in deltas},
+    )
+
+
+def bump_organizer(connection, organizer_id: int, **deltas):
+    source = select(literal(organizer_id), *[literal(value) for value in deltas.values()])
+    connection.execute(_upsert(source, deltas))
+
+
+def bump_organizer_of_event(connection, event_id: int, **deltas):
+    source = select(Event.organizerId, *[literal(value) for value in deltas.values()]).where(Event.id == event_id)
+    connection.execute(_upsert(source, deltas))
+
+
+def bump_event_rating(connection, event_id: int, rate: int, sign: int = 1):
+    """Add (``sign=1``) or remove (``sign=-1``) one ``rate`` in the rating aggregates of an event."""
+    values = {Event.ratingSum: Event.ratingSum + sign * rate, Event.ratingCount: Event.ratingCount + sign}
+    if 1 <= rate <= 5:
+        values[Event.ratingHistogram[rate]] = Event.ratingHistogram[rate] + sign
+    connection.execute(update(Event).where(Event.id == event_id).values(values))
+
+
+def organizer_stats(organizer_id) -> OrganizerStats | None:
+    return db.session.get(OrganizerStats, organizer_id)
+
+
+def _previous(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(target, attribute)
+
+
+@event.listens_for(FavouriteOrganizer, 'after_insert')
+def _favourite_inserted(mapper, connection, target):
+    bump_organizer(connection, target.organizerId, subscribersCount=1)
+
+
+@event.listens_for(FavouriteOrganizer, 'after_delete')
+def _favourite_deleted(mapper, connection, target):
+    bump_organizer(connection, target.organizerId, subscribersCount=-1)
+
+
+@event.listens_for(FavouriteOrganizer, 'after_update')
+def _favourite_updated(mapper, connection, target):
+    previous = _previous(target, 'organizerId')
+    if int(previous) != int(target.organizerId):
+        bump_organizer(connection, previous, subscribersCount=-1)
+        bump_organizer(connection, target.organizerId, subscribersCount=1)
+
+
+@event.listens_for(Event, 'after_insert')
+def _event_inserted(mapper, connection, target):
+    bump_organizer(connection, target.organizerId, eventsCount=1)
+
+
+@event.listens_for(Event, 'after_delete')
+def _event_deleted(mapper, connection, target):
+    bump_organizer(connection, target.organizerId, eventsCount=-1)
+
+
+@event.listens_for(Event, 'after_update')
+def _event_updated(mapper, connection, target):
+    previous = _previous(target, 'organizerId')
+    if int(previous) != int(target.organizerId):
+        # Отзывы переезжают вместе с событием
+        rating_sum, rating_count = connection.execute(
+            select(Event.ratingSum, Event.ratingCount).where(Event.id == target.id)
+        ).one()
+        bump_organizer(connection, previous, eventsCount=-1, ratingSum=-rating_sum, ratingCount=-rating_count)
+        bump_organizer(connection, target.organizerId, eventsCount=1, ratingSum=rating_sum, ratingCount=rating_count)
+
+
+@event.listens_for(Feedback, 'after_insert')
+def _feedback_inserted(mapper, connection, target):
+    bump_event_rating(connection, target.eventId, target.rate)
+    bump_organizer_of_event(connection, target.eventId, ratingSum=target.rate, ratingCount=1)
+
+
+@event.listens_for(Feedback, 'after_delete')
+def _feedback_deleted(mapper, connection, target):
+    bump_event_rating(connection, target.eventId, target.rate, sign=-1)
+    bump_organizer_of_event(connection, target.eventId, ratingSum=-target.rate, ratingCount=-1)
+
+
+@event.listens_for(Feedback, 'after_update')
+def _feedback_updated(mapper, connection, target):
+    previous_event_id, previous_rate = _previous(target, 'eventId'), _previous(target, 'rate')
+    if (int(previous_event_id), int(previous_rate)) != (int(target.eventId), int(target.rate)):
+        bump_event_rating(connection, previous_event_id, int(previous_rate), sign=-1)
+        bump_event_rating(connection, target.eventId, int(target.rate))
+        bump_organizer_of_event(connection, previous_event_id, ratingSum=-previous_rate, ratingCount=-1)
+        bump_organizer_of_event(connection, target.eventId, ratingSum=target.rate, ratingCount=1)
@@ -0,0 +1,82 @@
+"""Per-table version counters for conditional GET.
+
+Every committed transaction that wrote a table advances the version of that table. Only the
+tables some ETag depends on (``VERSIONED_TABLES``) have a version; each is a Postgres sequence.
+Tables are collected from the flushed ORM objects and from ORM-enabled ``insert``/``update``/
+``delete`` statements run through the session, and advanced with ``nextval`` after the commit.
+``nextval`` takes no row lock and is not rolled back, so concurrent writers of one table do
+not queue behind each other the way they would on a shared counter row. Between the commit
+and the bump a reader may get the new rows under the old tag; its next revalidation then
+fetches them again, but a client never keeps stale rows under a new tag.
+"""
+import logging
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from apps.models.models import VERSIONED_TABLES, table_version_sequences
+from extensions import db
+
+logger = logging.getLogger('eventer.versions')
+
+
+def table_versions(tables) -> dict:
+    """Return ``{table: version}`` for ``tables``; a table that was never written has version 0."""
+    rows = db.session.execute(
+        text(
+            'SELECT sequencename, coalesce(last_value, 0) FROM pg_sequences '
+            'WHERE schemaname = current_schema() AND sequencename = ANY(:names)'
+        ),
+        {'names': [table_version_sequences[table].name for table in tables]},
+    )
+    names = {table_version_sequences[table].name: table for table in tables}
+    versions = dict.fromkeys(tables, 0)
+    versions.update((names[name], version) for name, version in rows.tuples())
+    return versions
+
+
+def _changed_tables(session) -> set:
+    return session.info.setdefault('changed_tables', set())
+
+
+def mark_changed(session, *tables: str):
+    """Bump ``tables`` on commit for writes the session cannot see, such as raw ``COPY``."""
+    _changed_tables(session).update(tables)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_flushed(session, flush_context, instances):
+    changed = [*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj))]
+    _changed_tables(session).update(obj.__table__.name for obj in changed)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _changed_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _flush(session):
+    # Сначала сбрасываем изменения, чтобы учесть таблицы из финального flush коммита
+    session.flush()
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump(session):
+    tables = sorted(session.info.pop('changed_tables', set()) & set(VERSIONED_TABLES))
+    if not tables:
+        return
+    # Транзакция сессии уже завершена: nextval выполняем на отдельном соединении основной базы
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(select(*(table_version_sequences[table].next_value() for table in tables)))
+            connection.commit()
+    except Exception:
+        # Данные уже зафиксированы; ETag этих таблиц обновится со следующей записью
+        logger.exception('Could not bump the versions of %s', ', '.join(tables))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard(session):
+    session.info.pop('changed_tables', None)
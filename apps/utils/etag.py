@@ -0,0 +1,62 @@
+"""Conditional GET for read endpoints.
+
+``@etag(*tables)`` derives the ETag of a response from the request URL and the version
+counters of the tables the response is built from (see ``apps.services.versions``). A
+request whose ``If-None-Match`` matches is answered with ``304 Not Modified`` after one
+lookup of the version sequences, before the handler loads any rows. Only the tables of
+``VERSIONED_TABLES`` have versions.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from flask_restx.utils import unpack
+from werkzeug.exceptions import HTTPException
+
+from apps.models.models import VERSIONED_TABLES
+from apps.services.versions import table_versions
+
+
+class NotModified(HTTPException):
+    code = 304
+    description = 'Not Modified'
+
+    def __init__(self, tag: str):
+        super().__init__()
+        self.tag = tag
+
+    def get_headers(self, environ=None, scope=None):
+        return [('ETag', f'"{self.tag}"')]
+
+
+def compute_etag(versions: dict, user=None) -> str:
+    key = [request.full_path, sorted(versions.items()), user]
+    return hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+
+
+def etag(*tables: str, per_user: bool = False):
+    """Answer ``If-None-Match`` with 304 while none of ``tables`` has changed.
+
+    Put it directly above the handler, under ``jwt_required``, so authentication still runs
+    first. ``per_user`` adds the JWT identity to the tag for responses that depend on the caller.
+    """
+    unversioned = sorted(set(tables) - set(VERSIONED_TABLES))
+    if unversioned:
+        raise ValueError(f'Add {", ".join(unversioned)} to VERSIONED_TABLES to use them in an ETag')
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            # Версии читаем до данных: запись между ними только сделает тег устаревшим, но не наоборот
+            tag = compute_etag(table_versions(tables), get_jwt_identity() if per_user else None)
+            if tag in request.if_none_match:
+                raise NotModified(tag)
+
+            data, code, headers = unpack(handler(*args, **kwargs))
+            if code == 200:
+                headers = {**headers, 'ETag': f'"{tag}"'}
+            return data, code, headers
+        return wrapper
+    return decorator
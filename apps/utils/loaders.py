@@ -0,0 +1,73 @@
+"""Eager-loading profiles derived from flask_restx response models.
+
+Every ``namespace.model`` describes the object graph the serializer is going to walk.
+``loader_options`` turns that description into ``joinedload``/``selectinload``/``undefer``
+options once per (model, entity) pair, so a handler query fetches the whole graph up
+front instead of lazy-loading each relationship during marshalling.
+
+With ``only=True`` (sparse fieldsets) every level also gets ``load_only`` for the columns
+the model renders, unless it renders a plain Python property whose columns are unknown.
+"""
+import weakref
+
+from flask_restx import fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload, undefer
+
+_profiles = {}
+
+
+def loader_options(model, entity, only: bool = False) -> tuple:
+    """Return the loader options needed to marshal ``entity`` rows with ``model``."""
+    key = (id(model), entity, only)
+    if key not in _profiles:
+        _profiles[key] = tuple(_build_options(model, entity, only))
+        # Профиль удаляется вместе с моделью, иначе кэш рос бы с каждым новым набором ?fields=
+        weakref.finalize(model, _profiles.pop, key, None)
+    return _profiles[key]
+
+
+def _field_attribute(name, field):
+    return field.attribute if isinstance(field.attribute, str) else name
+
+
+def _nested_model(field):
+    if isinstance(field, fields.List):
+        field = field.container
+    if isinstance(field, fields.Nested):
+        return field.nested
+    return None
+
+
+def _build_options(model, entity, only: bool = False) -> list:
+    mapper = inspect(entity)
+    options = []
+    columns = []
+    restrict = only
+    for name, field in model.items():
+        attribute = _field_attribute(name, field)
+
+        if attribute in mapper.relationships:
+            nested_model = _nested_model(field)
+            if nested_model is None:
+                continue
+            relationship = mapper.relationships[attribute]
+            # Коллекции грузим отдельным IN-запросом, many-to-one — джойном в основной запрос
+            strategy = selectinload if relationship.uselist else joinedload
+            children = _build_options(nested_model, relationship.mapper.class_, only)
+            options.append(strategy(getattr(entity, attribute)).options(*children))
+
+        elif attribute in mapper.column_attrs:
+            column_attr = mapper.column_attrs[attribute]
+            if column_attr.deferred:
+                options.append(undefer(getattr(entity, attribute)))
+            if ('query_expression', True) not in column_attr.strategy_key:
+                columns.append(getattr(entity, attribute))
+
+        elif hasattr(entity, attribute):
+            # Свойство модели читает неизвестно какие колонки — на этом уровне грузим все
+            restrict = False
+
+    if restrict and columns:
+        options.append(load_only(*columns))
+    return options
@@ -0,0 +1,146 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque urlsafe-base64 JSON list with the sort key values of the last row of
+the previous page. The next page is selected with a row-value comparison on the same key,
+so the cost of a page does not depend on how deep the client has scrolled.
+
+``paginate_list`` is what list endpoints return: the ``{items, nextCursor, total}`` page when
+``cursor`` or ``limit`` is given, otherwise the plain list clients already expect, cut at
+``MAX_LIST_SIZE`` rows; the cursor of the rest is sent in the ``Link`` and ``X-Next-Cursor`` headers
+and the following pages come as envelopes of ``MAX_PAGE_SIZE`` rows.
+"""
+import base64
+import binascii
+import datetime
+import json
+from urllib.parse import urlencode
+
+from flask import abort, current_app, request
+from flask_restx import fields, inputs
+from flask_restx.reqparse import RequestParser
+from sqlalchemy import DateTime, tuple_
+
+from apps.utils.serializers import serialize
+from extensions import cache
+
+PER_PAGE = 15
+MAX_PER_PAGE = 100
+MAX_LIST_SIZE = 1000
+
+pagination_parser = RequestParser(bundle_errors=True)
+pagination_parser.add_argument(name="cursor", type=str, location="args")
+pagination_parser.add_argument(name="limit", type=int, location="args")
+pagination_parser.add_argument(name="withTotal", type=inputs.boolean, default=False, location="args")
+
+
+def encode_cursor(values) -> str:
+    values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, ValueError, TypeError):
+        abort(400, 'Invalid cursor')
+
+
+def page_model(namespace, item_model):
+    """Envelope model for one page of ``item_model`` rows."""
+    return namespace.model(f'{item_model.name} page', {
+        'items': fields.List(fields.Nested(item_model)),
+        'nextCursor': fields.String(),
+        'total': fields.Integer(),
+    })
+
+
+def max_page_size() -> int:
+    return current_app.config.get('MAX_PAGE_SIZE', MAX_PER_PAGE)
+
+
+def clamp_limit(limit) -> int:
+    """Page size for a requested ``limit``: ``PER_PAGE`` by default, at most ``MAX_PAGE_SIZE``."""
+    return max(1, min(limit or PER_PAGE, max_page_size()))
+
+
+def list_cache_key() -> tuple:
+    """Cache key of the ``paginate_list`` response for the current request.
+
+    Built from the parsed pagination arguments, so other query parameters and their order
+    do not multiply the cached copies of one list.
+    """
+    args = pagination_parser.parse_args()
+    if args['cursor'] is None and args['limit'] is None:
+        return ('list',)
+    return ('page', args['cursor'], clamp_limit(args['limit']), args['withTotal'])
+
+
+def _fetch(query, order_by, cursor, limit, descending) -> tuple[list, str | None]:
+    if cursor:
+        key, values = tuple_(*order_by), tuple_(*decode_cursor(cursor, order_by))
+        query = query.filter(key < values if descending else key > values)
+
+    ordering = [column.desc() if descending else column.asc() for column in order_by]
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница, без COUNT
+    items = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in order_by])
+    return items, next_cursor
+
+
+def keyset_paginate(query, order_by, cursor=None, limit=None, descending=False, with_total=False) -> dict:
+    """Return one page of ``query`` ordered by the ``order_by`` columns.
+
+    ``order_by`` must be unique as a whole (end it with the primary key). The total row
+    count costs a separate COUNT(*) and is only computed when ``with_total`` is set.
+    """
+    total = query.order_by(None).count() if with_total else None
+    items, next_cursor = _fetch(query, order_by, cursor, clamp_limit(limit), descending)
+    return {'items': items, 'nextCursor': next_cursor, 'total': total}
+
+
+def _load_list(query, order_by, model, page_model, descending) -> tuple[dict | list, str | None]:
+    """The serialized page, or the serialized plain list and the cursor of the rest."""
+    args = pagination_parser.parse_args()
+    if args['cursor'] is not None or args['limit'] is not None:
+        page = keyset_paginate(query, order_by, args['cursor'], args['limit'], descending, args['withTotal'])
+        return serialize(page, page_model), None
+
+    items, next_cursor = _fetch(
+        query, order_by, None, current_app.config.get('MAX_LIST_SIZE', MAX_LIST_SIZE), descending
+    )
+    return serialize(items, model), next_cursor
+
+
+def paginate_list(query, order_by, model, page_model, descending=False, cache_namespace=None):
+    """Serialize ``query`` as a page or as a bounded plain list, see the module docstring.
+
+    With ``cache_namespace`` the rows are read through the reference cache under ``list_cache_key``.
+    """
+    def load():
+        return _load_list(query, order_by, model, page_model, descending)
+
+    if cache_namespace is None:
+        data, next_cursor = load()
+    else:
+        # В кэше только строки и курсор: ссылка на продолжение зависит от адреса и параметров этого запроса
+        data, next_cursor = cache.get_or_set(cache_namespace, list_cache_key(), load)
+    if isinstance(data, dict):
+        return data
+
+    headers = {}
+    if next_cursor:
+        # Старый клиент получает обычный список, а продолжение — через заголовки, уже постранично
+        query_string = urlencode({**request.args, 'cursor': next_cursor, 'limit': max_page_size()})
+        headers['X-Next-Cursor'] = next_cursor
+        headers['Link'] = f'<{request.base_url}?{query_string}>; rel="next"'
+    return data, 200, headers
@@ -0,0 +1,122 @@
+"""Serializers compiled from flask_restx response models.
+
+``marshal`` re-resolves every field of the model and goes through ``get_value`` and
+``Raw.output`` for every attribute of every object it renders. ``compile_model`` does the
+field dispatch once and generates the source of a plain function for the model, one
+``getattr`` and an inline conversion per field, with nested models compiled the same way.
+``serialize`` then just calls it. The output is the same JSON as ``marshal(data, model)``;
+field masks (``X-Fields``) are not applied.
+"""
+import weakref
+from types import SimpleNamespace
+
+from flask_restx import fields
+from flask_restx.marshalling import make
+
+from extensions import request_timing
+
+# Модели с одинаковыми именами бывают в разных namespace, поэтому ключ — сам объект модели
+_compiled = {}
+
+# Самые частые поля форматируем без вызова Raw.format
+_FORMATTERS = {fields.Integer: 'int', fields.Float: 'float', fields.String: 'str'}
+
+
+def compile_model(model):
+    """Return a function rendering one object with ``model``; compiled once per model."""
+    key = id(model)
+    if key not in _compiled:
+        _compiled[key] = _generate(model)
+        # Модели выборочных полей создаются на лету — функция живет, пока жива модель
+        weakref.finalize(model, _compiled.pop, key, None)
+    return _compiled[key]
+
+
+def serialize(data, model):
+    """Drop-in replacement of ``marshal(data, model)`` for one object or a list of objects."""
+    render = compile_model(model)
+    with request_timing.measure('marshal'):
+        if isinstance(data, (list, tuple)):
+            return [render(item) for item in data]
+        return render(data)
+
+
+def _generate(model):
+    namespace = {'SimpleNamespace': SimpleNamespace}
+    lines = [
+        'def render(obj):',
+        # Словари (например, конверт страницы) читаем так же, как объекты
+        '    if isinstance(obj, dict):',
+        '        obj = SimpleNamespace(**obj)',
+    ]
+    result = []
+    for index, (name, field) in enumerate(model.resolved.items()):
+        value = f'v{index}'
+        lines.extend(f'    {line}' for line in _field_source(name, make(field), value, namespace))
+        result.append(f'{name!r}: {value}')
+    lines.append(f'    return {{{", ".join(result)}}}')
+
+    exec(compile('\n'.join(lines), f'<serializer {model.name}>', 'exec'), namespace)
+    return namespace['render']
+
+
+def _field_source(name, field, value, namespace) -> list[str]:
+    key = name if field.attribute is None else field.attribute
+    if not isinstance(key, str) or '.' in key:
+        # Вычисляемые и составные ключи отдаем самому flask_restx
+        return _fallback(name, field, value, namespace)
+
+    get = f'{value} = getattr(obj, {key!r}, None)'
+    if isinstance(field, fields.Nested) and not (field.skip_none or field.as_list):
+        namespace[f'render_{value}'] = compile_model(field.nested)
+        namespace[f'default_{value}'] = field.default
+        lines = [get]
+        if field.allow_null:
+            lines.append(f'if {value} is not None:')
+        elif field.default is not None:
+            lines.append(f'if {value} is None:')
+            lines.append(f'    {value} = default_{value}')
+            lines.append('else:')
+        else:
+            # Как и marshal, None без allow_null превращается в объект из одних None
+            return [get, f'{value} = render_{value}({value})']
+        lines.append(f'    {value} = render_{value}({value})')
+        return lines
+
+    if isinstance(field, fields.List):
+        item = _list_item_source(make(field.container), value, namespace)
+        if item is None:
+            return _fallback(name, field, value, namespace)
+        namespace[f'default_{value}'] = field.default
+        return [
+            get,
+            f'if {value} is None:',
+            f'    {value} = default_{value}',
+            f'elif isinstance({value}, (list, tuple, set)):',
+            f'    {value} = [{item} for item in {value}]',
+            'else:',
+            f'    {value} = [{item} for item in ({value},)]',
+        ]
+
+    if type(field).output is not fields.Raw.output or field.mask or field.default is not None:
+        return _fallback(name, field, value, namespace)
+    if type(field) in _FORMATTERS:
+        formatter = _FORMATTERS[type(field)]
+    else:
+        namespace[f'format_{value}'] = field.format
+        formatter = f'format_{value}'
+    return [get, f'if {value} is not None:', f'    {value} = {formatter}({value})']
+
+
+def _list_item_source(container, value, namespace) -> str | None:
+    if isinstance(container, fields.Nested) and not (container.skip_none or container.as_list):
+        namespace[f'render_{value}'] = compile_model(container.nested)
+        return f'render_{value}(item)'
+    if type(container) in _FORMATTERS and container.attribute is None and container.default is None:
+        return f'None if item is None else {_FORMATTERS[type(container)]}(item)'
+    return None
+
+
+def _fallback(name, field, value, namespace) -> list[str]:
+    namespace[f'field_{value}'] = field
+    return [f'{value} = field_{value}.output({name!r}, obj)']
@@ -0,0 +1,119 @@
+"""Sparse fieldsets: ``?fields=id,name,organizer.logo,eventDates``.
+
+``fieldset`` turns the ``fields`` argument into a copy of a response model that only has
+the requested fields; a dotted path selects fields of a nested model, a bare nested field
+keeps all of them. Handlers render and load with that copy, so the compiled serializer skips
+the other fields and ``loader_options(..., only=True)`` loads only the needed columns and
+skips the relationships and computed columns nobody asked for.
+"""
+import copy
+import threading
+from collections import OrderedDict, namedtuple
+
+from flask import abort, request
+from flask_restx import Model, fields
+from flask_restx.reqparse import RequestParser
+
+from apps.utils.pagination import page_model
+
+FIELDS_ARG = 'fields'
+MAX_MODELS = 256
+
+fields_parser = RequestParser(bundle_errors=True)
+fields_parser.add_argument(
+    name=FIELDS_ARG, type=str, location="args", help='Comma separated fields, e.g. id,name,organizer.logo'
+)
+
+Fieldset = namedtuple('Fieldset', ['model', 'page', 'sparse'])
+
+# Одинаковый набор полей отдает одну и ту же модель, чтобы сериализатор и опции загрузки строились один раз
+_models = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_fields(value: str) -> dict:
+    """``'id,organizer.logo'`` -> ``{'id': {}, 'organizer': {'logo': {}}}``."""
+    tree = {}
+    for path in value.split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split('.'):
+            if not name:
+                abort(400, f'Invalid field {path}')
+            node = node.setdefault(name, {})
+    if not tree:
+        abort(400, 'fields must not be empty')
+    return tree
+
+
+def _nested(field):
+    if isinstance(field, fields.List) and isinstance(field.container, fields.Nested):
+        return field.container.nested
+    if isinstance(field, fields.Nested):
+        return field.nested
+    return None
+
+
+def _with_nested(field, nested_model):
+    field = copy.copy(field)
+    if isinstance(field, fields.List):
+        field.container = copy.copy(field.container)
+        field.container.model = nested_model
+    else:
+        field.model = nested_model
+    return field
+
+
+def select_fields(model, tree: dict, prefix: str = ''):
+    """Copy of ``model`` with only the fields of ``tree``, in the model's order."""
+    resolved = model.resolved
+    for name in tree:
+        if name not in resolved:
+            abort(400, f'Unknown field {prefix}{name}')
+
+    selected = {}
+    for name, field in resolved.items():
+        if name not in tree:
+            continue
+        if tree[name]:
+            nested_model = _nested(field)
+            if nested_model is None:
+                abort(400, f'Field {prefix}{name} has no subfields')
+            field = _with_nested(field, select_fields(nested_model, tree[name], f'{prefix}{name}.'))
+        selected[name] = field
+    return Model(f'{model.name} sparse', selected)
+
+
+def _key(tree: dict) -> tuple:
+    return tuple(sorted((name, _key(subtree)) for name, subtree in tree.items()))
+
+
+def fieldset(model, page=None) -> Fieldset:
+    """Models to render and load with for the ``fields`` argument; ``model`` and ``page`` without it."""
+    value = request.args.get(FIELDS_ARG)
+    if not value:
+        return Fieldset(model, page, False)
+
+    tree = parse_fields(value)
+    key = (id(model), _key(tree))
+    with _lock:
+        if key in _models:
+            _models.move_to_end(key)
+            return _models[key]
+
+    item_model = select_fields(model, tree)
+    with _lock:
+        result = _models.setdefault(key, Fieldset(item_model, page_model(_Unregistered, item_model), True))
+        if len(_models) > MAX_MODELS:
+            _models.popitem(last=False)
+    return result
+
+
+class _Unregistered:
+    """Stands in for a namespace so ad hoc page models stay out of the swagger schema."""
+
+    @staticmethod
+    def model(name, model_fields):
+        return Model(name, model_fields)
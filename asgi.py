@@ -0,0 +1,5 @@
+from apps.asgi.app import AsgiApp
+from run import app as flask_app
+
+# uvicorn asgi:app --workers 4
+app = AsgiApp(flask_app)
@@ -0,0 +1,118 @@
+"""Compare requests/sec of the WSGI and ASGI servers on hot read endpoints at high concurrency.
+
+Start both servers against the same database, for example::
+
+    python run.py                                   # WSGI on :5000
+    uvicorn asgi:app --port 8000                    # ASGI on :8000
+
+then run from the repository root::
+
+    python -m benchmarks.asgi --target wsgi=http://localhost:5000 --target asgi=http://localhost:8000 \\
+        --path '/api/v1/event/?limit=15' --path /api/v1/organizer/info/1 --concurrency 200 --token ACCESS_TOKEN
+
+Every client keeps one HTTP/1.1 connection open and sends requests back to back, cycling
+through ``--path``. The client only uses the standard library.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _read_response(reader) -> tuple[int, bool]:
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split(' ', 2)[:2]
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return int(status), False
+    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    return int(status), keep_alive
+
+
+async def _client(base_url: str, paths, token: str | None, deadline: float, latencies: list, errors: list):
+    url = urlsplit(base_url)
+    port = url.port or (443 if url.scheme == 'https' else 80)
+    authorization = f'Authorization: Bearer {token}\r\n' if token else ''
+    reader = writer = None
+    for path in itertools.cycle(paths):
+        if time.perf_counter() >= deadline:
+            break
+        if writer is None:
+            reader, writer = await asyncio.open_connection(url.hostname, port, ssl=url.scheme == 'https')
+        started = time.perf_counter()
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n{authorization}\r\n'.encode('latin-1'))
+        try:
+            status, keep_alive = await _read_response(reader)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            errors.append(type(e).__name__)
+            writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def measure(base_url: str, paths, concurrency: int, duration: float, token: str | None = None) -> dict:
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(base_url, paths, token, deadline, latencies, errors) for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50': percentiles[49],
+        'p99': percentiles[98],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--target', action='append', required=True, help='name=base url, e.g. asgi=http://localhost:8000'
+    )
+    parser.add_argument('--path', action='append', required=True)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--token', help='JWT access token for endpoints behind jwt_required')
+    args = parser.parse_args()
+
+    print(f'{"server":<10}{"requests":>10}{"errors":>8}{"req/s":>10}{"p50, ms":>10}{"p99, ms":>10}')
+    for target in args.target:
+        name, base_url = target.split('=', 1)
+        result = asyncio.run(measure(base_url, args.path, args.concurrency, args.duration, args.token))
+        print(
+            f'{name:<10}{result["requests"]:>10}{result["errors"]:>8}{result["rps"]:>10.0f}'
+            f'{result["p50"] * 1000:>10.1f}{result["p99"] * 1000:>10.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""Measure latency, throughput and SQL statements per request of the key endpoints on a dataset tier.
+
+Needs an empty, migrated Postgres database in ``TEST_DATABASE_URL`` (``flask db upgrade``).
+Load a tier once, record a baseline, then compare later runs with it. From the repository root::
+
+    python -m benchmarks.endpoints --tier small --load
+    python -m benchmarks.endpoints --tier small --save-baseline
+    python -m benchmarks.endpoints --tier small
+
+Every endpoint is measured twice against the real ``create_app(testing=True)``. First it runs
+``--requests`` times through the test client, one request at a time. That phase gives the
+statements per request and the latency without contention. Then ``--threads`` HTTP clients
+send requests for ``--duration`` seconds. They hit a threaded werkzeug server in this process,
+or ``--url`` when the app runs under a real server. That phase gives requests/sec and the
+latency under load. The baseline is ``benchmarks/baselines/<tier>.json``. A run exits with 1
+when the statements per request grew, or when latency or throughput got more than
+``--tolerance`` worse than the baseline.
+"""
+import argparse
+import http.client
+import json
+import pathlib
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from sqlalchemy import event, func, select
+from werkzeug.serving import make_server
+
+from apps import create_app
+from apps.models import Event, Organizer, User
+from apps.services.mock_data import PASSWORD, Scale, analyze, generate
+from extensions import db
+
+TIERS = {
+    'small': Scale(),
+    'medium': Scale(users=20000, organizers=500, events=10000, bookings=100000, feedbacks=50000, donations=20000,
+                    favourites=50000),
+    'large': Scale(users=200000, organizers=5000, events=100000, bookings=1000000, feedbacks=500000,
+                   donations=200000, favourites=500000),
+}
+BASELINES = pathlib.Path(__file__).parent / 'baselines'
+# (имя, метод, путь); в пути подставляются id, выбранные в fixtures()
+ENDPOINTS = [
+    ('event list', 'GET', '/api/v1/event/?limit=20'),
+    ('event', 'GET', '/api/v1/event/{event_id}'),
+    ('booking list', 'GET', '/api/v1/booking/?limit=20&userId={user_id}'),
+    ('organizer info', 'GET', '/api/v1/organizer/info/{organizer_id}'),
+    ('login', 'POST', '/api/v1/auth/login'),
+]
+# Для этих метрик больше — хуже; для rps — наоборот
+LATENCY_METRICS = ('p50', 'p95', 'p99')
+
+
+def percentiles(latencies: list[float]) -> dict:
+    if len(latencies) < 2:
+        latencies = latencies * 2 or [0.0, 0.0]
+    cuts = statistics.quantiles(latencies, n=100)
+    return {'p50': cuts[49] * 1000, 'p95': cuts[94] * 1000, 'p99': cuts[98] * 1000}
+
+
+def load(tier: str, seed: int):
+    if db.session.execute(select(func.count(Event.id))).scalar():
+        sys.exit('The database already has events: load a tier into an empty database')
+    counts = generate(TIERS[tier], seed=seed)
+    db.session.commit()
+    analyze(counts)
+    return counts
+
+
+def fixtures(client) -> dict:
+    """Ids of the most popular rows and a token of a generated user."""
+    # Генератор делает первые события и организаторов самыми популярными
+    user = db.session.execute(
+        select(User).where(User.email.like('user%@example.com')).order_by(User.id).limit(1)
+    ).scalar_one()
+    context = {
+        'user_id': user.id,
+        'event_id': db.session.execute(select(func.min(Event.id))).scalar(),
+        'organizer_id': db.session.execute(select(func.min(Organizer.id))).scalar(),
+        'login': json.dumps({'email': user.email, 'password': PASSWORD}).encode(),
+    }
+    response = client.post('/api/v1/auth/login', data=context['login'], content_type='application/json')
+    assert response.status_code == 200, response.data
+    context['token'] = response.json['accessToken']
+    return context
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._executed)
+
+    def _executed(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def _request_args(method: str, path: str, context: dict) -> tuple[str, dict, bytes | None]:
+    headers = {'Authorization': f'Bearer {context["token"]}'}
+    body = None
+    if method == 'POST':
+        headers['Content-Type'] = 'application/json'
+        body = context['login']
+    return path.format(**context), headers, body
+
+
+def measure_client(client, counter: StatementCounter, context: dict, requests: int) -> dict:
+    results = {}
+    for name, method, path in ENDPOINTS:
+        url, headers, body = _request_args(method, path, context)
+        latencies, statements = [], []
+        for _ in range(requests):
+            before = counter.count
+            started = time.perf_counter()
+            response = client.open(url, method=method, headers=headers, data=body)
+            latencies.append(time.perf_counter() - started)
+            statements.append(counter.count - before)
+            assert response.status_code < 400, (name, response.status_code, response.data)
+        # Первый запрос прогревает кэши, берем установившееся значение
+        results[name] = {'statements': statements[-1], **percentiles(latencies)}
+    return results
+
+
+def _http_client(base_url: str, method: str, url: str, headers: dict, body, deadline: float, latencies, errors):
+    address = urlsplit(base_url)
+    while time.perf_counter() < deadline:
+        connection = http.client.HTTPConnection(address.hostname, address.port, timeout=30)
+        started = time.perf_counter()
+        try:
+            connection.request(method, address.path.rstrip('/') + url, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except OSError as e:
+            errors.append(type(e).__name__)
+            continue
+        finally:
+            connection.close()
+        # Быстрые ответы с ошибкой не должны улучшать задержки и пропускную способность
+        if response.status >= 400:
+            errors.append(response.status)
+        else:
+            latencies.append(time.perf_counter() - started)
+
+
+def measure_http(base_url: str, context: dict, threads: int, duration: float) -> dict:
+    results = {}
+    for name, method, path in ENDPOINTS:
+        url, headers, body = _request_args(method, path, context)
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        with ThreadPoolExecutor(threads) as executor:
+            for _ in range(threads):
+                executor.submit(_http_client, base_url, method, url, headers, body, deadline, latencies, errors)
+        # rps и перцентили считаются только по успешным ответам
+        results[name] = {'rps': len(latencies) / duration, 'errors': len(errors), **percentiles(latencies)}
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of ``results`` against ``baseline``, as printable lines; any failed request is one."""
+    regressions = []
+    for name, result in results.items():
+        if result['http']['errors']:
+            regressions.append(f'{name}: {result["http"]["errors"]} failed requests')
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if result['client']['statements'] > old['client']['statements']:
+            regressions.append(
+                f'{name}: {result["client"]["statements"]} statements per request, was {old["client"]["statements"]}'
+            )
+        for phase in ('client', 'http'):
+            for metric in LATENCY_METRICS:
+                if result[phase][metric] > old[phase][metric] * (1 + tolerance):
+                    regressions.append(
+                        f'{name}: {phase} {metric} {result[phase][metric]:.1f} ms, was {old[phase][metric]:.1f} ms'
+                    )
+        if result['http']['rps'] < old['http']['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: {result["http"]["rps"]:.0f} req/s, was {old["http"]["rps"]:.0f} req/s')
+    return regressions
+
+
+def print_results(results: dict):
+    print(f'{"endpoint":<16}{"stmts":>6}{"p50":>8}{"p95":>8}{"p99":>8}   '
+          f'{"req/s":>8}{"errors":>7}{"p50":>8}{"p95":>8}{"p99":>8}')
+    for name, result in results.items():
+        client, http_result = result['client'], result['http']
+        print(
+            f'{name:<16}{client["statements"]:>6}{client["p50"]:>8.1f}{client["p95"]:>8.1f}{client["p99"]:>8.1f}   '
+            f'{http_result["rps"]:>8.0f}{http_result["errors"]:>7}{http_result["p50"]:>8.1f}'
+            f'{http_result["p95"]:>8.1f}{http_result["p99"]:>8.1f}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tier', choices=TIERS, default='small')
+    parser.add_argument('--load', action='store_true', help='generate the tier into the empty database and exit')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=50, help='sequential requests per endpoint')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent HTTP clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per endpoint')
+    parser.add_argument('--url', help='base url of an already running server instead of the in-process one')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    app = create_app(testing=True)
+    with app.app_context():
+        if args.load:
+            for table, count in load(args.tier, args.seed).items():
+                print(f'{table}: {count}')
+            return
+
+        client = app.test_client()
+        counter = StatementCounter(db.engine)
+        context = fixtures(client)
+        results = measure_client(client, counter, context, args.requests)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        for name, result in measure_http(base_url, context, args.threads, args.duration).items():
+            results[name] = {'client': results[name], 'http': result}
+    finally:
+        if server is not None:
+            server.shutdown()
+    print_results(results)
+
+    baseline_path = BASELINES / f'{args.tier}.json'
+    if args.save_baseline:
+        BASELINES.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + '\n')
+        print(f'Baseline saved to {baseline_path}')
+    elif baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {baseline_path}')
+    else:
+        print(f'No baseline at {baseline_path}; record one with --save-baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compare compiled serializers with flask_restx ``marshal`` on in-memory object graphs.
+
+Run from the repository root::
+
+    python -m benchmarks.serializers --rows 1000 --repeat 5
+"""
+import argparse
+import datetime
+import timeit
+from decimal import Decimal
+
+from flask_restx import marshal
+
+from apps.api.booking import booking_response_model
+from apps.api.event import event_response_model
+from apps.api.feedback import feedback_response_model
+from apps.api.ticket import ticket_response_model
+from apps.models import Booking, Category, City, Event, EventDates, Feedback, Genre, Organizer, StatusEnum, Ticket, \
+    TicketTypeEnum, User, ValidateStatusEnum, Venue
+from apps.utils.serializers import serialize
+
+
+def make_events(rows: int, dates: int = 3, venues: int = 2) -> list[Event]:
+    genre = Genre(id=1, name='Rock', category=Category(id=1, name='Music'))
+    organizer = Organizer(id=1, name='Organizer', logo='logo.png')
+    city = City(id=1, name='City')
+    start = datetime.datetime(2023, 5, 1, 19)
+    return [
+        Event(
+            id=i, name=f'Event {i}', description='Description ' * 20, expectedAmount=Decimal('1000.50'),
+            recommendedDonation=Decimal('10'), validateStatus=ValidateStatusEnum.REQUIRED, countOfMembers=10,
+            status=StatusEnum.ACTIVE, concession='16+', ratingSum=9, ratingCount=2, genre=genre, organizer=organizer,
+            eventDates=[
+                EventDates(id=i * dates + j, startDateTime=start, endDateTime=start + datetime.timedelta(hours=4))
+                for j in range(dates)
+            ],
+            venues=[
+                Venue(id=i * venues + j, name='Venue', description='Hall', photos=['a.png', 'b.png'], seats=100,
+                      address='Street 1', city=city)
+                for j in range(venues)
+            ],
+        )
+        for i in range(rows)
+    ]
+
+
+def make_datasets(rows: int) -> dict:
+    events = make_events(rows)
+    user = User(id=1, firstName='Ivan', lastName='Ivanov', middleName='Ivanovich', email='ivan@example.com')
+    bookings = [Booking(id=event.id, user=user, event=event) for event in events]
+    tickets = [
+        Ticket(id=booking.id, ticketType=TicketTypeEnum.NUMERIC, seat=1, booking=booking,
+               eventDates=booking.event.eventDates[0])
+        for booking in bookings
+    ]
+    feedbacks = [
+        Feedback(id=event.id, description='Good', rate=5, dateTime=datetime.datetime(2023, 5, 2), event=event,
+                 user=user, photos=['c.png'])
+        for event in events
+    ]
+    return {
+        'event': (events, event_response_model),
+        'booking': (bookings, booking_response_model),
+        'ticket': (tickets, ticket_response_model),
+        'feedback': (feedbacks, feedback_response_model),
+    }
+
+
+def run(rows: int, repeat: int) -> dict:
+    results = {}
+    for name, (data, model) in make_datasets(rows).items():
+        assert serialize(data, model) == marshal(data, model), name
+        marshal_time = min(timeit.repeat(lambda: marshal(data, model), number=1, repeat=repeat))
+        serialize_time = min(timeit.repeat(lambda: serialize(data, model), number=1, repeat=repeat))
+        results[name] = {'marshal': marshal_time, 'serialize': serialize_time, 'speedup': marshal_time / serialize_time}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"model":<10}{"marshal, ms":>14}{"serialize, ms":>16}{"speedup":>10}')
+    for name, result in run(args.rows, args.repeat).items():
+        marshal_ms, serialize_ms = result['marshal'] * 1000, result['serialize'] * 1000
+        print(f'{name:<10}{marshal_ms:>14.1f}{serialize_ms:>16.1f}{result["speedup"]:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,9 @@
 from .db_exntension import db
 from .restx_extension import api
 from .jwt_extension import jwt
+from .cache_extension import cache
+from .pool_extension import pool_metrics
+from .replica_extension import replica_router
+from .timing_extension import request_timing
+from .slow_query_extension import slow_query_log
+from .metrics_extension import metrics
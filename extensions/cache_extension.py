@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+
+
+class ReferenceCache:
+    """In-process read-through cache for rarely changing reference data.
+
+    Values are stored per namespace (``'country'``, ``'category'``...) and expire after
+    ``REFERENCE_CACHE_TTL`` seconds. Write handlers call ``invalidate`` for the namespaces
+    they touch; the TTL bounds staleness in the other worker processes. At most
+    ``REFERENCE_CACHE_MAX_ENTRIES`` values are kept; the least recently used one goes first.
+    """
+
+    def __init__(self, ttl: int = 300, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        # Контекст, в котором вызывается загрузчик (например, чтение с основной базы вместо реплики)
+        self.loader_context = nullcontext
+
+    def init_app(self, app):
+        self.ttl = app.config.get('REFERENCE_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('REFERENCE_CACHE_MAX_ENTRIES', self.max_entries)
+        app.extensions['reference_cache'] = self
+
+    def get_or_set(self, namespace: str, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                self._entries.move_to_end((namespace, key))
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(namespace, 0)
+
+        with self.loader_context():
+            value = loader()
+        with self._lock:
+            # Не сохраняем значение, если namespace инвалидировали, пока оно загружалось
+            if self._generations.get(namespace, 0) == generation:
+                self._entries[(namespace, key)] = (now + self.ttl, value)
+                self._entries.move_to_end((namespace, key))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] in namespaces]:
+                del self._entries[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRatio': self.hits / requests if requests else 0.0,
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttl': self.ttl,
+            }
+
+
+cache = ReferenceCache()
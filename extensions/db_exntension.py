@@ -1,3 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from .replica_extension import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
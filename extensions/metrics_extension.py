@@ -0,0 +1,168 @@
+import os
+import time
+
+from flask import Response, current_app, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Границы в секундах: от быстрых ответов из кэша до тяжелых выгрузок
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class Metrics:
+    """Prometheus metrics of the API at ``/metrics``.
+
+    Requests are counted and timed per route, labelled ``<namespace>.<Resource>.<method>``
+    (``event.EventList.get``); ``add_api`` tells which namespace a resource belongs to. The
+    hot path does one dict lookup for the label and increments metric children cached per
+    label set. Stats of other components (connection pool, reference cache...) are registered
+    with ``add_stats`` and read when ``/metrics`` is scraped.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (gunicorn with several workers) every worker writes
+    its request metrics to files in that directory and a scrape sums them across workers; the
+    gauges read at scrape time then describe the worker that served the scrape and carry its
+    ``pid``. The directory must be emptied before the server starts, and gunicorn's
+    ``child_exit`` hook should call ``prometheus_client.multiprocess.mark_process_dead``.
+    """
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.requests = Counter(
+            'eventer_http_requests', 'HTTP requests by route and status', ['route', 'status'],
+            registry=self.registry,
+        )
+        self.errors = Counter(
+            'eventer_http_request_errors', 'HTTP requests that ended with a 5xx status or an exception', ['route'],
+            registry=self.registry,
+        )
+        self.latency = Histogram(
+            'eventer_http_request_duration_seconds', 'Time from the first before_request hook to the response',
+            ['route'], buckets=LATENCY_BUCKETS, registry=self.registry,
+        )
+        self.statements = Counter(
+            'eventer_db_statements', 'SQL statements run by requests', ['route'], registry=self.registry,
+        )
+        self.in_progress = Gauge(
+            'eventer_http_requests_in_progress', 'Requests being handled right now', registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self._stats = {}
+        self.registry.register(_StatsCollector(self._stats))
+        self._namespaces = {}
+        self._labels = {}
+        self._children = {}
+
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+
+    def add_api(self, api):
+        """Remember the namespace of every resource of ``api`` for the route labels."""
+        for namespace in api.namespaces:
+            for resource in namespace.resources:
+                self._namespaces[resource.resource] = namespace.name
+
+    def add_stats(self, prefix: str, stats, counters=(), label: str | None = None):
+        """Export the numbers of the ``stats()`` dict as ``<prefix>_<key>``; keys in ``counters`` only grow.
+
+        With ``label`` the ``stats()`` dict maps a value of that label to such a dict, e.g. one per
+        database bind.
+        """
+        self._stats[prefix] = (stats, frozenset(counters), label)
+
+    def route(self) -> str:
+        key = (request.endpoint, request.method)
+        label = self._labels.get(key)
+        if label is None:
+            label = self._labels[key] = self._route_label(*key)
+        return label
+
+    def _route_label(self, endpoint: str | None, method: str) -> str:
+        if endpoint is None:
+            # 404 и 405: не плодим метки из произвольных путей
+            return UNMATCHED_ROUTE
+        view_class = getattr(current_app.view_functions.get(endpoint), 'view_class', None)
+        if view_class is None:
+            return endpoint
+        namespace = self._namespaces.get(view_class)
+        label = f'{view_class.__name__}.{method.lower()}'
+        return f'{namespace}.{label}' if namespace else label
+
+    def _child(self, metric, *labels):
+        key = (metric, *labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+        self.in_progress.inc()
+
+    def _finish(self, response):
+        self._observe(response.status_code)
+        return response
+
+    def _teardown(self, exception):
+        # Необработанное исключение проходит мимо after_request
+        if exception is not None and 'metrics_started' in g:
+            self._observe(500)
+
+    def _observe(self, status: int):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        self.in_progress.dec()
+        route = self.route()
+        self._child(self.requests, route, str(status)).inc()
+        self._child(self.latency, route).observe(time.perf_counter() - started)
+        if status >= 500:
+            self._child(self.errors, route).inc()
+        timing = g.get('request_timing')
+        if timing is not None and timing.statements:
+            self._child(self.statements, route).inc(timing.statements)
+
+    def view(self):
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            MultiProcessCollector(registry)
+            registry.register(_StatsCollector(self._stats, pid=os.getpid()))
+        else:
+            registry = self.registry
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+class _StatsCollector:
+    def __init__(self, sources: dict, pid: int | None = None):
+        self.sources = sources
+        self.labels = {'pid': str(pid)} if pid is not None else {}
+
+    def collect(self):
+        for prefix, (stats, counters, label) in self.sources.items():
+            groups = stats() if label else {None: stats()}
+            metrics = {}
+            for group, values in groups.items():
+                for name, value in values.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    metric = metrics.get(name)
+                    if metric is None:
+                        family = CounterMetricFamily if name in counters else GaugeMetricFamily
+                        metric = metrics[name] = family(
+                            f'{prefix}_{_snake(name)}', f'{name} of {prefix}',
+                            labels=[*([label] if label else []), *self.labels],
+                        )
+                    metric.add_metric([*([str(group)] if label else []), *self.labels.values()], value)
+            yield from metrics.values()
+
+
+def _snake(name: str) -> str:
+    return ''.join(f'_{char.lower()}' if char.isupper() else char for char in name)
+
+
+metrics = Metrics()
@@ -0,0 +1,127 @@
+import threading
+import time
+
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+PRIMARY_BIND = 'primary'
+
+
+class PoolCounters:
+    """Checkouts, waits and connections in use of one connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def checked_out(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def timed_out(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def checked_in(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'inUse': self.in_use,
+                'waitAvgMs': round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+                'waitMaxMs': round(self.wait_max * 1000, 3),
+            }
+
+
+class PoolMetrics:
+    """Connection pool usage of this worker process, per database bind.
+
+    Every pool counts checkouts, how long a request waited for a connection (including opening
+    a new one) and how many connections are checked out right now. The primary and each replica
+    have their own pool, so their numbers are kept apart. ``init_app`` swaps the pool class of
+    ``SQLALCHEMY_ENGINE_OPTIONS`` for its metered subclass below and gives the binds of
+    ``SQLALCHEMY_BINDS`` the same options.
+    """
+
+    def init_app(self, app):
+        # Вызывать до db.init_app: Flask-SQLAlchemy создает движок с этими опциями сразу
+        options = _metered(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        # Flask-SQLAlchemy применяет SQLALCHEMY_ENGINE_OPTIONS только к основной базе
+        app.config['SQLALCHEMY_BINDS'] = {
+            key: _metered({**options, **({'url': value} if isinstance(value, (str, URL)) else value)})
+            for key, value in (app.config.get('SQLALCHEMY_BINDS') or {}).items()
+        }
+        app.extensions['pool_metrics'] = self
+
+    @staticmethod
+    def stats(pool) -> dict:
+        counters = getattr(pool, 'counters', None)
+        data = counters.stats() if counters is not None else {}
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), idle=pool.checkedin(), overflow=max(pool.overflow(), 0))
+        return data
+
+    def stats_by_bind(self, engines: dict) -> dict:
+        """Stats of the pool of every engine of ``db.engines``; the default bind is ``primary``."""
+        return {bind or PRIMARY_BIND: self.stats(engine.pool) for bind, engine in engines.items()}
+
+
+pool_metrics = PoolMetrics()
+
+
+def _metered(options: dict) -> dict:
+    poolclass = options.get('poolclass', QueuePool)
+    return {**options, 'poolclass': METERED_POOLS.get(poolclass, poolclass)}
+
+
+class _Metered:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counters = PoolCounters()
+
+    def recreate(self):
+        # dispose() и сброс пула после разрыва соединений создают новый пул того же движка
+        pool = super().recreate()
+        pool.counters = self.counters
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except TimeoutError:
+            self.counters.timed_out(time.perf_counter() - start)
+            raise
+        self.counters.checked_out(time.perf_counter() - start)
+        return record
+
+    def _do_return_conn(self, record):
+        self.counters.checked_in()
+        super()._do_return_conn(record)
+
+
+class MeteredQueuePool(_Metered, QueuePool):
+    pass
+
+
+class MeteredNullPool(_Metered, NullPool):
+    pass
+
+
+METERED_POOLS = {QueuePool: MeteredQueuePool, NullPool: MeteredNullPool}
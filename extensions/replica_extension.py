@@ -0,0 +1,186 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica'
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+STICKY_COOKIE = 'db_primary_until'
+# Отставание реплики в секундах; на сервере без репликации функции возвращают NULL
+LAG_SQL = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica chosen for the current request.
+
+    Writes, ``SELECT ... FOR UPDATE`` and everything after the first flush go to the primary.
+    Without a request, or when the router chose no replica, it behaves like the default session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get('db_replica')
+            if replica is not None and not _is_write(clause):
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_write(clause) -> bool:
+    return clause is not None and (
+        getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+    )
+
+
+def _pin_primary():
+    if has_app_context():
+        g.db_replica = None
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _flushed(session, flush_context, instances):
+    _pin_primary()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _pin_primary()
+
+
+class ReplicaRouter:
+    """Sends read-only requests to a healthy read replica.
+
+    Replicas are the ``replica*`` binds of ``SQLALCHEMY_BINDS``. A request with a read method
+    picks one replica up front and keeps it for all its reads; it switches to the primary for
+    good as soon as it writes. A client that wrote reads from the primary for
+    ``DB_REPLICA_STICKY_SECONDS`` afterwards (a cookie, and the Authorization header in this
+    process for clients without cookies). A replica that fails the health check or lags more
+    than ``DB_REPLICA_MAX_LAG`` seconds is skipped until the next check.
+    """
+
+    def __init__(self):
+        self.sticky_seconds = 5
+        self.max_lag = 10
+        self.check_interval = 5
+        self._health = {}
+        self._sticky = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        # Вызывать после db.init_app: движки реплик создает Flask-SQLAlchemy
+        self.sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        self.max_lag = app.config.get('DB_REPLICA_MAX_LAG', self.max_lag)
+        self.check_interval = app.config.get('DB_REPLICA_CHECK_INTERVAL', self.check_interval)
+        app.extensions['replica_router'] = self
+
+        with app.app_context():
+            for key, engine in self.replicas().items():
+                event.listen(engine, 'handle_error', self._on_error(key))
+
+        app.before_request(self._route)
+        app.after_request(self._remember_write)
+
+    @staticmethod
+    def replicas() -> dict:
+        engines = current_app.extensions['sqlalchemy'].engines
+        return {key: engine for key, engine in engines.items() if key and key.startswith(REPLICA_PREFIX)}
+
+    def pick(self):
+        """A healthy replica engine, or None to use the primary."""
+        healthy = [engine for key, engine in self.replicas().items() if self.is_healthy(key, engine)]
+        return random.choice(healthy) if healthy else None
+
+    def is_healthy(self, key, engine) -> bool:
+        now = time.monotonic()
+        checked = self._health.get(key)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+
+        try:
+            with engine.connect() as connection:
+                lag = connection.execute(LAG_SQL).scalar()
+            healthy = lag is None or lag <= self.max_lag
+            if not healthy:
+                logger.warning('Replica %s lags %.1f s behind the primary', key, lag)
+        except DBAPIError:
+            logger.warning('Replica %s is unavailable', key, exc_info=True)
+            healthy = False
+        with self._lock:
+            self._health[key] = (now, healthy)
+        return healthy
+
+    def _on_error(self, key):
+        def mark_unhealthy(context):
+            if context.is_disconnect:
+                with self._lock:
+                    self._health[key] = (time.monotonic(), False)
+        return mark_unhealthy
+
+    @contextmanager
+    def primary(self):
+        """Run the block against the primary even in a read-only request."""
+        replica = g.get('db_replica')
+        g.db_replica = None
+        try:
+            yield
+        finally:
+            # После записи запрос так и остается на основной базе
+            if not g.get('db_wrote'):
+                g.db_replica = replica
+
+    def use_primary(self, handler):
+        """Decorator for read handlers that may write or must not see replication lag."""
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            g.db_replica = None
+            return handler(*args, **kwargs)
+        return wrapper
+
+    def _route(self):
+        g.db_replica = None
+        if not isinstance(current_app.extensions['sqlalchemy'].session(), RoutingSession):
+            # Запрос уже обслуживает другая сессия (например, asyncpg в режиме ASGI)
+            return
+        if request.method in READ_METHODS and not self._is_sticky():
+            g.db_replica = self.pick()
+
+    def _is_sticky(self) -> bool:
+        now = time.time()
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        authorization = request.headers.get('Authorization')
+        return authorization is not None and self._sticky.get(authorization, 0) > now
+
+    def _remember_write(self, response):
+        if not g.get('db_wrote') or response.status_code >= 400:
+            return response
+
+        until = time.time() + self.sticky_seconds
+        response.set_cookie(STICKY_COOKIE, str(until), max_age=self.sticky_seconds, httponly=True)
+        authorization = request.headers.get('Authorization')
+        if authorization is not None:
+            with self._lock:
+                if len(self._sticky) > 10000:
+                    now = time.time()
+                    self._sticky = {key: value for key, value in self._sticky.items() if value > now}
+                self._sticky[authorization] = until
+        return response
+
+
+replica_router = ReplicaRouter()
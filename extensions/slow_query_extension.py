@@ -0,0 +1,148 @@
+import datetime
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('eventer.slow_queries')
+
+STARTED_KEY = 'slow_query_started'
+# Параметры могут быть длинными (тексты, массивы) — в журнал попадает только начало
+MAX_PARAMETER_LENGTH = 200
+REDACTED = '<redacted>'
+# Таблица пользователей хранит email и хэши паролей
+SENSITIVE_TABLES = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+"?user"?(?=[\s,;)]|$)', re.IGNORECASE)
+
+
+class SlowQueryLog:
+    """Statements slower than ``SLOW_QUERY_MS``, with the request they came from.
+
+    Every slow statement is logged as a warning to ``eventer.slow_queries`` and kept in a ring
+    buffer of the last ``SLOW_QUERY_BUFFER`` entries of this process. For a
+    ``SLOW_QUERY_EXPLAIN_SAMPLE`` share of slow ``SELECT`` statements the plan is captured with
+    ``EXPLAIN (ANALYZE, BUFFERS)``. That runs the query once more, on the same connection and
+    inside a savepoint, so a failing EXPLAIN does not break the transaction of the request.
+
+    Parameters are kept only for ``SELECT`` statements that do not read the ``user`` table;
+    writes and user lookups carry emails and password hashes, so their parameters are
+    replaced with ``<redacted>`` and their plans, which show the bound values, are not taken.
+    The warning log never contains parameters.
+    """
+
+    def __init__(self):
+        self.threshold = 0.2
+        self.explain_sample = 0.1
+        self.total = 0
+        self._entries = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.threshold = app.config.get('SLOW_QUERY_MS', self.threshold * 1000) / 1000
+        self.explain_sample = app.config.get('SLOW_QUERY_EXPLAIN_SAMPLE', self.explain_sample)
+        self._entries = deque(self._entries, maxlen=app.config.get('SLOW_QUERY_BUFFER', self._entries.maxlen))
+        app.extensions['slow_query_log'] = self
+
+        if self.threshold > 0 and not event.contains(Engine, 'after_cursor_execute', self._after_cursor_execute):
+            if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get(STARTED_KEY)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+
+        plan = None
+        if not executemany and _is_public(statement) and random.random() < self.explain_sample:
+            plan = self.explain(conn, statement, parameters)
+        self.record(statement, parameters, duration, plan)
+
+    @staticmethod
+    def explain(conn, statement: str, parameters) -> str | None:
+        if conn.dialect.name != 'postgresql':
+            return None
+        # Сырой курсор DBAPI: этот запрос не должен снова попасть в события движка
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute('SAVEPOINT slow_query_explain')
+            try:
+                cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters)
+                return '\n'.join(row[0] for row in cursor.fetchall())
+            except Exception:
+                logger.warning('EXPLAIN of a slow query failed', exc_info=True)
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                return None
+            finally:
+                cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        except Exception:
+            logger.warning('Could not set a savepoint to EXPLAIN a slow query', exc_info=True)
+            return None
+        finally:
+            cursor.close()
+
+    def record(self, statement: str, parameters, duration: float, plan: str | None = None):
+        entry = {
+            'at': datetime.datetime.utcnow().isoformat(),
+            'durationMs': round(duration * 1000, 3),
+            'statement': statement,
+            'parameters': _format_parameters(parameters) if _is_public(statement) else REDACTED,
+            'endpoint': request.endpoint if has_request_context() else None,
+            'method': request.method if has_request_context() else None,
+            'path': request.full_path if has_request_context() else None,
+            'plan': plan,
+        }
+        with self._lock:
+            self.total += 1
+            self._entries.append(entry)
+        # Параметры в журнал не пишем: он уходит в общие системы сбора логов
+        logger.warning(
+            'Slow query %.1f ms in %s: %s', entry['durationMs'], entry['endpoint'] or '-', ' '.join(statement.split())
+        )
+
+    def entries(self) -> list[dict]:
+        """Newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[STARTED_KEY] = time.perf_counter()
+
+
+def _is_select(statement: str) -> bool:
+    return statement.lstrip().upper().startswith('SELECT')
+
+
+def _is_public(statement: str) -> bool:
+    return _is_select(statement) and not SENSITIVE_TABLES.search(statement)
+
+
+def _format_parameters(parameters):
+    if isinstance(parameters, dict):
+        return {key: _format_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_format_value(value) for value in parameters]
+    return _format_value(parameters)
+
+
+def _format_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + '...'
+
+
+slow_query_log = SlowQueryLog()
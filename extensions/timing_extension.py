@@ -0,0 +1,116 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('eventer.requests')
+
+STARTED_KEY = 'request_timing_started'
+
+
+class RequestStats:
+    __slots__ = ('started', 'statements', 'db', 'marshal')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db = 0.0
+        self.marshal = 0.0
+
+
+class RequestTiming:
+    """Where the time of each request went.
+
+    Engine events count the SQL statements of the request and the time spent in them; the
+    response serializers report their time through ``measure('marshal')``. The rest of the
+    request is handler time. The result goes to the ``Server-Timing`` header (``SERVER_TIMING``)
+    and, as one JSON line per request, to the ``eventer.requests`` logger at INFO. A request
+    that ran more than ``REQUEST_STATEMENTS_THRESHOLD`` statements is logged as a warning: a
+    statement per row of a list is how an N+1 query shows up.
+    """
+
+    def __init__(self):
+        self.server_timing = True
+        self.statements_threshold = 0
+
+    def init_app(self, app):
+        self.server_timing = app.config.get('SERVER_TIMING', self.server_timing)
+        self.statements_threshold = app.config.get('REQUEST_STATEMENTS_THRESHOLD', self.statements_threshold)
+        app.extensions['request_timing'] = self
+
+        # Слушаем класс Engine: так учитываются и реплики, и синхронная часть движка asyncpg
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @staticmethod
+    def current() -> RequestStats | None:
+        return g.get('request_timing') if has_app_context() else None
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Add the time of the block to ``phase`` of the current request, if any."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.current()
+            if stats is not None:
+                setattr(stats, phase, getattr(stats, phase) + time.perf_counter() - started)
+
+    @staticmethod
+    def _start():
+        g.request_timing = RequestStats()
+
+    def _finish(self, response):
+        stats = self.current()
+        if stats is None:
+            return response
+
+        total = time.perf_counter() - stats.started
+        handler = max(total - stats.db - stats.marshal, 0.0)
+        if self.server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={stats.db * 1000:.2f};desc="{stats.statements} statements", '
+                f'marshal;dur={stats.marshal * 1000:.2f}, app;dur={handler * 1000:.2f}, total;dur={total * 1000:.2f}',
+            )
+
+        over_threshold = 0 < self.statements_threshold < stats.statements
+        level = logging.WARNING if over_threshold else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'statements': stats.statements,
+                'dbMs': round(stats.db * 1000, 3),
+                'marshalMs': round(stats.marshal * 1000, 3),
+                'handlerMs': round(handler * 1000, 3),
+                'totalMs': round(total * 1000, 3),
+                **({'statementsThreshold': self.statements_threshold} if over_threshold else {}),
+            }))
+        return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[STARTED_KEY] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(STARTED_KEY, None)
+    stats = RequestTiming.current()
+    if started is not None and stats is not None:
+        stats.statements += 1
+        stats.db += time.perf_counter() - started
+
+
+request_timing = RequestTiming()
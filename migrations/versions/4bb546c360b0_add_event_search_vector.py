@@ -0,0 +1,32 @@
+"""add event search vector
+
+Revision ID: 4bb546c360b0
+Revises: 
+Create Date: 2026-10-18 15:43:29.335855
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4bb546c360b0'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Базы, созданные через db.create_all() на новых моделях, уже содержат колонку и индекс
+    op.execute(
+        'ALTER TABLE event ADD COLUMN IF NOT EXISTS "searchVector" tsvector GENERATED ALWAYS AS ('
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+        ') STORED'
+    )
+    op.execute('CREATE INDEX IF NOT EXISTS "ix_event_searchVector" ON event USING gin ("searchVector")')
+
+
+def downgrade():
+    op.drop_index('ix_event_searchVector', table_name='event')
+    op.drop_column('event', 'searchVector')
@@ -0,0 +1,47 @@
+"""ticket seat allocation
+
+Tickets that share a seat within one event date (double bookings made before the
+unique index existed) keep the earliest ticket on the seat; the others are moved to
+free seat numbers after the highest seat of that date so the index can be built.
+
+Revision ID: a926550c4613
+Revises: f9e85ed743ab
+Create Date: 2026-10-18 15:49:02.665044
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a926550c4613'
+down_revision = 'f9e85ed743ab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE "eventDates" ADD COLUMN IF NOT EXISTS capacity INTEGER')
+    op.execute('ALTER TABLE "eventDates" ADD COLUMN IF NOT EXISTS "remainingSeats" INTEGER')
+
+    op.execute(
+        'UPDATE ticket t SET seat = d.last_seat + d.shift '
+        'FROM ('
+        '  SELECT id, last_seat, row_number() OVER (PARTITION BY "eventDatesId" ORDER BY id) AS shift '
+        '  FROM ('
+        '    SELECT id, "eventDatesId", '
+        '           max(seat) OVER (PARTITION BY "eventDatesId") AS last_seat, '
+        '           row_number() OVER (PARTITION BY "eventDatesId", seat ORDER BY id) AS seat_number '
+        '    FROM ticket'
+        '  ) s '
+        '  WHERE seat_number > 1'
+        ') d '
+        'WHERE t.id = d.id'
+    )
+    op.execute('CREATE UNIQUE INDEX IF NOT EXISTS "uq_ticket_eventDatesId_seat" ON ticket ("eventDatesId", seat)')
+
+
+def downgrade():
+    op.drop_index('uq_ticket_eventDatesId_seat', table_name='ticket')
+    op.drop_column('eventDates', 'remainingSeats')
+    op.drop_column('eventDates', 'capacity')
@@ -0,0 +1,46 @@
+"""event rating aggregates
+
+Adds the rating sum, count and 1..5 histogram columns to "event" and fills them from
+the existing feedback.
+
+Revision ID: b1007f659db0
+Revises: bc54a0d9b241
+Create Date: 2026-10-18 15:52:35.162108
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1007f659db0'
+down_revision = 'bc54a0d9b241'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('ALTER TABLE event ADD COLUMN IF NOT EXISTS "ratingSum" INTEGER NOT NULL DEFAULT 0')
+    op.execute('ALTER TABLE event ADD COLUMN IF NOT EXISTS "ratingCount" INTEGER NOT NULL DEFAULT 0')
+    op.execute(
+        'ALTER TABLE event ADD COLUMN IF NOT EXISTS "ratingHistogram" INTEGER[] NOT NULL DEFAULT \'{0,0,0,0,0}\''
+    )
+
+    op.execute(
+        'UPDATE event e SET "ratingSum" = r.rating_sum, "ratingCount" = r.rating_count, '
+        '  "ratingHistogram" = r.histogram '
+        'FROM ('
+        '  SELECT "eventId", sum(rate) AS rating_sum, count(*) AS rating_count, '
+        '         ARRAY[count(*) FILTER (WHERE rate = 1), count(*) FILTER (WHERE rate = 2), '
+        '               count(*) FILTER (WHERE rate = 3), count(*) FILTER (WHERE rate = 4), '
+        '               count(*) FILTER (WHERE rate = 5)]::INTEGER[] AS histogram '
+        '  FROM feedback GROUP BY "eventId"'
+        ') r '
+        'WHERE e.id = r."eventId"'
+    )
+
+
+def downgrade():
+    op.drop_column('event', 'ratingHistogram')
+    op.drop_column('event', 'ratingCount')
+    op.drop_column('event', 'ratingSum')
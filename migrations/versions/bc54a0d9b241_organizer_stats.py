@@ -0,0 +1,50 @@
+"""organizer stats
+
+Creates the "organizerStats" table and fills it from the current subscriptions, events
+and feedback; from then on the application keeps it up to date on every write.
+
+Revision ID: bc54a0d9b241
+Revises: a926550c4613
+Create Date: 2026-10-18 15:50:26.510753
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bc54a0d9b241'
+down_revision = 'a926550c4613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS "organizerStats" ('
+        '  "organizerId" INTEGER NOT NULL PRIMARY KEY REFERENCES organizer (id) ON DELETE CASCADE, '
+        '  "subscribersCount" INTEGER NOT NULL DEFAULT 0, '
+        '  "eventsCount" INTEGER NOT NULL DEFAULT 0, '
+        '  "ratingSum" INTEGER NOT NULL DEFAULT 0, '
+        '  "ratingCount" INTEGER NOT NULL DEFAULT 0'
+        ')'
+    )
+    op.execute(
+        'INSERT INTO "organizerStats" ("organizerId", "subscribersCount", "eventsCount", "ratingSum", "ratingCount") '
+        'SELECT o.id, '
+        '       (SELECT count(*) FROM "favouriteOrganizer" f WHERE f."organizerId" = o.id), '
+        '       (SELECT count(*) FROM event e WHERE e."organizerId" = o.id), '
+        '       (SELECT coalesce(sum(fb.rate), 0) FROM feedback fb JOIN event e ON e.id = fb."eventId" '
+        '        WHERE e."organizerId" = o.id), '
+        '       (SELECT count(*) FROM feedback fb JOIN event e ON e.id = fb."eventId" WHERE e."organizerId" = o.id) '
+        'FROM organizer o '
+        'ON CONFLICT ("organizerId") DO UPDATE SET '
+        '  "subscribersCount" = EXCLUDED."subscribersCount", '
+        '  "eventsCount" = EXCLUDED."eventsCount", '
+        '  "ratingSum" = EXCLUDED."ratingSum", '
+        '  "ratingCount" = EXCLUDED."ratingCount"'
+    )
+
+
+def downgrade():
+    op.drop_table('organizerStats')
@@ -0,0 +1,29 @@
+"""table versions
+
+Revision ID: be4ee5136ad2
+Revises: b1007f659db0
+Create Date: 2026-10-18 15:54:35.670725
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'be4ee5136ad2'
+down_revision = 'b1007f659db0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS "tableVersion" ('
+        '  "tableName" VARCHAR(63) NOT NULL PRIMARY KEY, '
+        '  version BIGINT NOT NULL DEFAULT 0'
+        ')'
+    )
+
+
+def downgrade():
+    op.drop_table('tableVersion')
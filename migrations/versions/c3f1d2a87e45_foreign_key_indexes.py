@@ -0,0 +1,101 @@
+"""foreign key indexes
+
+Indexes every foreign key that is not already the leading column of an index, plus the
+columns the handlers filter and sort by. Duplicate bookings of one user for one event and
+duplicate subscriptions are merged first so the unique indexes can be built; the tickets of
+a merged booking move to the booking that is kept.
+
+The indexes are built with CREATE INDEX CONCURRENTLY outside the migration transaction, so
+reads and writes go on while they are built. An index left invalid by an interrupted build
+is dropped and built again.
+
+Revision ID: c3f1d2a87e45
+Revises: be4ee5136ad2
+Create Date: 2026-10-18 16:40:12.318544
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1d2a87e45'
+down_revision = 'be4ee5136ad2'
+branch_labels = None
+depends_on = None
+
+# (имя, таблица, колонки, unique, условие частичного индекса)
+INDEXES = [
+    ('ix_user_email', 'user', ['email'], False, None),
+    ('ix_user_roleId', 'user', ['roleId'], False, None),
+    ('ix_organizer_userId', 'organizer', ['userId'], False, None),
+    ('ix_event_organizerId', 'event', ['organizerId'], False, None),
+    ('ix_event_genreId', 'event', ['genreId'], False, None),
+    ('ix_event_active_id', 'event', ['id'], False, "status = 'ACTIVE'"),
+    ('ix_ticket_bookingId', 'ticket', ['bookingId'], False, None),
+    ('ix_venue_eventId', 'venue', ['eventId'], False, None),
+    ('ix_venue_countryId', 'venue', ['countryId'], False, None),
+    ('ix_venue_stateId', 'venue', ['stateId'], False, None),
+    ('ix_venue_cityId', 'venue', ['cityId'], False, None),
+    ('ix_eventDates_eventId', 'eventDates', ['eventId'], False, None),
+    ('ix_eventDonation_eventId_id', 'eventDonation', ['eventId', 'id'], False, None),
+    ('ix_eventDonation_userId_id', 'eventDonation', ['userId', 'id'], False, None),
+    ('uq_booking_userId_eventId', 'booking', ['userId', 'eventId'], True, None),
+    ('ix_booking_eventId_id', 'booking', ['eventId', 'id'], False, None),
+    ('ix_genre_categoryId', 'genre', ['categoryId'], False, None),
+    ('ix_feedback_eventId', 'feedback', ['eventId'], False, None),
+    ('ix_feedback_userId', 'feedback', ['userId'], False, None),
+    ('ix_feedback_dateTime_id', 'feedback', ['dateTime', 'id'], False, None),
+    ('uq_favouriteOrganizer_organizerId_userId', 'favouriteOrganizer', ['organizerId', 'userId'], True, None),
+    ('ix_favouriteOrganizer_userId_id', 'favouriteOrganizer', ['userId', 'id'], False, None),
+]
+
+
+def merge_duplicates():
+    duplicates = 'SELECT id, min(id) OVER (PARTITION BY "userId", "eventId") AS keep FROM booking'
+    op.execute(
+        f'UPDATE ticket t SET "bookingId" = d.keep FROM ({duplicates}) d '
+        f'WHERE t."bookingId" = d.id AND d.id <> d.keep'
+    )
+    op.execute(f'DELETE FROM booking b USING ({duplicates}) d WHERE b.id = d.id AND d.id <> d.keep')
+
+    op.execute(
+        'DELETE FROM "favouriteOrganizer" f USING ('
+        '  SELECT id, min(id) OVER (PARTITION BY "organizerId", "userId") AS keep FROM "favouriteOrganizer"'
+        ') d WHERE f.id = d.id AND d.id <> d.keep'
+    )
+    # Счетчик подписчиков считался и по дублям
+    op.execute(
+        'UPDATE "organizerStats" s SET "subscribersCount" = ('
+        '  SELECT count(*) FROM "favouriteOrganizer" f WHERE f."organizerId" = s."organizerId"'
+        ')'
+    )
+
+
+def create_index(name, table, columns, unique, where):
+    invalid = op.get_bind().execute(
+        sa.text('SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE c.relname = :name AND NOT i.indisvalid'),
+        {'name': name},
+    ).scalar()
+    if invalid:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    quoted = ', '.join(f'"{column}"' for column in columns)
+    statement = f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({quoted})'
+    op.execute(f'{statement} WHERE {where}' if where else statement)
+
+
+def upgrade():
+    merge_duplicates()
+    # CONCURRENTLY нельзя выполнять в транзакции; autocommit_block сначала фиксирует слияние дублей
+    with op.get_context().autocommit_block():
+        for index in INDEXES:
+            create_index(*index)
+        for table in sorted({table for _, table, *_ in INDEXES}):
+            op.execute(f'ANALYZE "{table}"')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, *_ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
@@ -0,0 +1,53 @@
+"""table version sequences
+
+Moves the ETag versions from the rows of "tableVersion" to one sequence per table. Writers of
+a table no longer lock a shared counter row until their commit; nextval takes no row lock.
+Each sequence starts after the version the table had, so no old ETag can match again.
+
+Revision ID: d7a3e91b5c20
+Revises: c3f1d2a87e45
+Create Date: 2026-10-18 19:05:41.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3e91b5c20'
+down_revision = 'c3f1d2a87e45'
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    'booking', 'category', 'city', 'country', 'event', 'eventDates', 'feedback', 'genre', 'organizer', 'state', 'user',
+    'venue',
+)
+
+
+def upgrade():
+    # В базе, созданной db.create_all() на новых моделях, последовательности уже есть, а таблицы нет
+    has_versions = op.get_bind().execute(sa.text('SELECT to_regclass(\'"tableVersion"\')')).scalar()
+    for table in TABLES:
+        op.execute(f'CREATE SEQUENCE IF NOT EXISTS "tableVersion_{table}"')
+        if has_versions:
+            op.execute(
+                f'SELECT setval(\'"tableVersion_{table}"\', coalesce('
+                f'(SELECT version FROM "tableVersion" WHERE "tableName" = \'{table}\'), 0) + 1)'
+            )
+    op.execute('DROP TABLE IF EXISTS "tableVersion"')
+
+
+def downgrade():
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS "tableVersion" ('
+        '  "tableName" VARCHAR(63) NOT NULL PRIMARY KEY, '
+        '  version BIGINT NOT NULL DEFAULT 0'
+        ')'
+    )
+    for table in TABLES:
+        op.execute(
+            f'INSERT INTO "tableVersion" ("tableName", version) '
+            f'SELECT \'{table}\', last_value + 1 FROM "tableVersion_{table}"'
+        )
+        op.execute(f'DROP SEQUENCE IF EXISTS "tableVersion_{table}"')
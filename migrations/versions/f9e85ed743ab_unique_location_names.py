@@ -0,0 +1,44 @@
+"""unique location names
+
+Revision ID: f9e85ed743ab
+Revises: 4bb546c360b0
+Create Date: 2026-10-18 15:45:58.786150
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9e85ed743ab'
+down_revision = '4bb546c360b0'
+branch_labels = None
+depends_on = None
+
+
+def merge_duplicates(table, key_columns, references):
+    """Оставляет строку с минимальным id среди дублей и перевешивает на нее внешние ключи."""
+    partition = ', '.join(f'"{column}"' for column in key_columns)
+    duplicates = f'SELECT id, min(id) OVER (PARTITION BY {partition}) AS keep FROM "{table}"'
+    for ref_table, ref_column in references:
+        op.execute(
+            f'UPDATE "{ref_table}" r SET "{ref_column}" = d.keep FROM ({duplicates}) d '
+            f'WHERE r."{ref_column}" = d.id AND d.id <> d.keep'
+        )
+    op.execute(f'DELETE FROM "{table}" t USING ({duplicates}) d WHERE t.id = d.id AND d.id <> d.keep')
+
+
+def upgrade():
+    merge_duplicates('country', ['name'], [('state', 'countryId'), ('venue', 'countryId')])
+    merge_duplicates('state', ['countryId', 'name'], [('city', 'stateId'), ('venue', 'stateId')])
+    merge_duplicates('city', ['stateId', 'name'], [('venue', 'cityId')])
+
+    op.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_country_name ON country (name)')
+    op.execute('CREATE UNIQUE INDEX IF NOT EXISTS "uq_state_countryId_name" ON state ("countryId", name)')
+    op.execute('CREATE UNIQUE INDEX IF NOT EXISTS "uq_city_stateId_name" ON city ("stateId", name)')
+
+
+def downgrade():
+    op.drop_index('uq_city_stateId_name', table_name='city')
+    op.drop_index('uq_state_countryId_name', table_name='state')
+    op.drop_index('uq_country_name', table_name='country')
@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.endpoints import _http_client, compare, percentiles
+
+
+def result(statements=3, p50=10.0, p95=20.0, p99=30.0, rps=100.0, errors=0):
+    latency = {'p50': p50, 'p95': p95, 'p99': p99}
+    return {'client': {'statements': statements, **latency}, 'http': {'rps': rps, 'errors': errors, **latency}}
+
+
+class FailingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(500 if self.path.startswith('/fail') else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class CompareTestCase(unittest.TestCase):
+    def testWithinTolerance(self):
+        self.assertEqual(compare({'event': result(p95=23.0, rps=85.0)}, {'event': result()}, 0.2), [])
+
+    def testRegressions(self):
+        regressions = compare({'event': result(statements=4, p99=40.0, rps=70.0)}, {'event': result()}, 0.2)
+        self.assertEqual(len(regressions), 4)
+        self.assertIn('event: 4 statements per request, was 3', regressions)
+
+    def testNewEndpointIsNotARegression(self):
+        self.assertEqual(compare({'login': result()}, {}, 0.2), [])
+
+    def testFailedRequestsAreARegression(self):
+        self.assertEqual(compare({'login': result(errors=2)}, {}, 0.2), ['login: 2 failed requests'])
+
+    def testFailedRequestsAreNotTimed(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FailingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        for url, timed in (('/fail', False), ('/ok', True)):
+            latencies, errors = [], []
+            _http_client(base_url, 'GET', url, {}, None, time.perf_counter() + 0.05, latencies, errors)
+            self.assertEqual((bool(latencies), bool(errors)), (timed, not timed))
+        latencies, errors = [], []
+        _http_client('http://127.0.0.1:1', 'GET', '/', {}, None, time.perf_counter() + 0.05, latencies, errors)
+        self.assertEqual(latencies, [])
+        self.assertIn('ConnectionRefusedError', errors)
+
+    def testPercentiles(self):
+        self.assertEqual(percentiles([0.001])['p99'], 1.0)
+        self.assertAlmostEqual(percentiles([i / 1000 for i in range(1, 101)])['p50'], 50.5)
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from extensions.cache_extension import ReferenceCache
+
+
+class ReferenceCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = ReferenceCache(ttl=60)
+
+    def testReadThrough(self):
+        loader = mock.Mock(return_value=[{'id': 1}])
+        self.assertEqual(self.cache.get_or_set('country', 'list', loader), [{'id': 1}])
+        self.assertEqual(self.cache.get_or_set('country', 'list', loader), [{'id': 1}])
+        loader.assert_called_once()
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def testExpiry(self):
+        loader = mock.Mock(return_value=[])
+        with mock.patch('extensions.cache_extension.time.monotonic', return_value=0):
+            self.cache.get_or_set('genre', 'list', loader)
+        with mock.patch('extensions.cache_extension.time.monotonic', return_value=61):
+            self.cache.get_or_set('genre', 'list', loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def testInvalidate(self):
+        self.cache.get_or_set('country', 'list', lambda: ['old'])
+        self.cache.get_or_set('category', 'list', lambda: ['kept'])
+        self.cache.invalidate('country')
+        self.assertEqual(self.cache.get_or_set('country', 'list', lambda: ['new']), ['new'])
+        self.assertEqual(self.cache.get_or_set('category', 'list', lambda: ['other']), ['kept'])
+
+    def testInvalidateDuringLoadIsNotStored(self):
+        def loader():
+            self.cache.invalidate('state')
+            return ['stale']
+
+        self.cache.get_or_set('state', 'list', loader)
+        self.assertEqual(self.cache.get_or_set('state', 'list', lambda: ['fresh']), ['fresh'])
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        self.cache.max_entries = 2
+        self.cache.get_or_set('country', 1, lambda: 'first')
+        self.cache.get_or_set('country', 2, lambda: 'second')
+        # Обращение делает первую запись самой свежей
+        self.cache.get_or_set('country', 1, lambda: 'reloaded')
+        self.cache.get_or_set('country', 3, lambda: 'third')
+        self.assertEqual(self.cache.stats()['size'], 2)
+        self.assertEqual(self.cache.get_or_set('country', 1, lambda: 'reloaded'), 'first')
+        self.assertEqual(self.cache.get_or_set('country', 2, lambda: 'reloaded'), 'reloaded')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+from flask_restx import Api, Resource
+
+from apps.utils.etag import etag
+
+
+class EtagTestCase(unittest.TestCase):
+    def setUp(self):
+        self.versions = {'category': 1}
+        self.handler = mock.Mock(return_value=[{'id': 1}])
+        patcher = mock.patch('apps.utils.etag.table_versions', side_effect=lambda tables: dict(self.versions))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = Flask(__name__)
+        api = Api(app)
+        handler = self.handler
+
+        @api.route('/category/')
+        class CategoryList(Resource):
+            @etag('category')
+            def get(self):
+                return handler()
+
+        self.client = app.test_client()
+
+    def testNotModified(self):
+        response = self.client.get('/category/')
+        self.assertEqual(response.status_code, 200)
+        tag = response.headers['ETag']
+
+        response = self.client.get('/category/', headers={'If-None-Match': tag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], tag)
+        self.assertEqual(response.data, b'')
+        self.handler.assert_called_once()
+
+    def testVersionBumpChangesTag(self):
+        tag = self.client.get('/category/').headers['ETag']
+        self.versions['category'] = 2
+        response = self.client.get('/category/', headers={'If-None-Match': tag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], tag)
+
+    def testQueryStringChangesTag(self):
+        tag = self.client.get('/category/').headers['ETag']
+        self.assertNotEqual(self.client.get('/category/?page=2').headers['ETag'], tag)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from decimal import Decimal
+
+from apps.models import StatusEnum
+from apps.services.event_import import ItemError, _validate
+
+EVENT = {
+    'name': 'Концерт',
+    'description': 'Описание',
+    'expectedAmount': 1000.5,
+    'recommendedDonation': '100',
+    'validateStatus': 'REQUIRED',
+    'countOfMembers': 50,
+    'status': 'ACTIVE',
+    'concession': 'нет',
+    'genreId': 1,
+    'organizerId': 1,
+    'eventDateTimes': [{'startDateTime': '2023-06-01T18:00:00', 'endDateTime': '2023-06-01T21:00:00'}],
+    'venues': [{
+        'name': 'Клуб', 'description': 'Зал', 'address': 'ул. Ленина, 1', 'seats': 100, 'photos': [],
+        'country': 'Россия', 'state': 'Московская область', 'city': 'Москва',
+    }],
+}
+
+
+class ValidateItemTestCase(unittest.TestCase):
+    def testValidItem(self):
+        event, dates, venues = _validate(EVENT)
+        self.assertEqual(event['expectedAmount'], Decimal('1000.5'))
+        self.assertEqual(event['status'], StatusEnum.ACTIVE)
+        self.assertEqual(len(dates), 1)
+        self.assertEqual(venues[0]['city'], 'Москва')
+
+    def testInvalidItems(self):
+        for item, message in [
+            ([], 'item must be an object'),
+            ({**EVENT, 'name': None}, 'name is required'),
+            ({**EVENT, 'status': 'UNKNOWN'}, 'status must be one of'),
+            ({**EVENT, 'countOfMembers': True}, 'countOfMembers must be int'),
+            ({**EVENT, 'eventDateTimes': []}, 'eventDateTimes must not be empty'),
+            ({**EVENT, 'venues': [{'name': 'Клуб'}]}, 'venues[0].description is required'),
+        ]:
+            with self.assertRaisesRegex(ItemError, message.replace('[', r'\[')):
+                _validate(item)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import csv
+import datetime
+import io
+import json
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from apps.api.event_donation import event_donation_response_model
+from apps.models import Event, EventDonation, User
+from apps.utils import export
+from apps.utils.export import csv_lines, ndjson_lines
+from apps.utils.serializers import serialize
+
+
+def make_donations(count):
+    user = User(id=1, firstName='Ivan', lastName='Ivanov', email='ivan@example.com')
+    event = Event(id=1, name='Event')
+    return [
+        EventDonation(id=i, dateTime=datetime.datetime(2023, 5, 1), amount=Decimal('10.50'), comment='Спасибо',
+                      user=user, event=event)
+        for i in range(count)
+    ]
+
+
+class ExportTestCase(unittest.TestCase):
+    def testNdjsonLinesMatchListItems(self):
+        donations = make_donations(3)
+        lines = list(ndjson_lines(iter(donations), event_donation_response_model))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+        self.assertEqual([json.loads(line) for line in lines], serialize(donations, event_donation_response_model))
+
+    def testCsvFlattensNestedObjects(self):
+        rows = list(csv.DictReader(io.StringIO(''.join(csv_lines(make_donations(2), event_donation_response_model)))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['amount'], '10.5')
+        self.assertEqual(rows[0]['comment'], 'Спасибо')
+        self.assertEqual(rows[0]['user.email'], 'ivan@example.com')
+        self.assertEqual(rows[0]['event.name'], 'Event')
+        self.assertEqual(json.loads(rows[0]['event.venues']), [])
+
+    def testCsvIsStreamedInChunks(self):
+        with mock.patch.object(export, 'CHUNK_SIZE', 1024):
+            chunks = list(csv_lines(make_donations(50), event_donation_response_model))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks).count('ivan@example.com'), 50)
+
+    def testEmptyExport(self):
+        self.assertEqual(list(csv_lines([], event_donation_response_model)), [])
+        self.assertEqual(list(ndjson_lines([], event_donation_response_model)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
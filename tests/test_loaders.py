@@ -0,0 +1,33 @@
+import unittest
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from apps.api.event import event_response_model
+from apps.api.ticket import ticket_response_model
+from apps.models import Event, Ticket
+from apps.utils.loaders import loader_options
+
+
+def compile_query(query):
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+class LoaderOptionsTestCase(unittest.TestCase):
+    def testEventProfileLoadsSerializedGraph(self):
+        sql = compile_query(select(Event).options(*loader_options(event_response_model, Event)))
+        self.assertIn('LEFT OUTER JOIN organizer', sql)
+        self.assertIn('LEFT OUTER JOIN genre', sql)
+        self.assertIn('count(booking.id)', sql)
+
+    def testNestedManyToOneIsJoined(self):
+        sql = compile_query(select(Ticket).options(*loader_options(ticket_response_model, Ticket)))
+        self.assertIn('LEFT OUTER JOIN booking', sql)
+        self.assertIn('LEFT OUTER JOIN "user"', sql)
+
+    def testProfileIsCached(self):
+        self.assertIs(loader_options(event_response_model, Event), loader_options(event_response_model, Event))
+
+
+if __name__ == '__main__':
+    unittest.main()
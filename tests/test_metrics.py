@@ -0,0 +1,71 @@
+import unittest
+
+from flask import Blueprint, Flask
+from flask_restx import Api, Namespace, Resource
+
+from extensions.metrics_extension import Metrics
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        namespace = Namespace('item')
+
+        @namespace.route('/')
+        class ItemList(Resource):
+            def get(self):
+                return []
+
+            def post(self):
+                raise RuntimeError('boom')
+
+        @namespace.route('/<int:id>')
+        class ItemApi(Resource):
+            def get(self, id):
+                return {'message': 'unavailable'}, 503
+
+        blueprint = Blueprint('api', __name__, url_prefix='/api/v1')
+        api = Api(blueprint)
+        api.add_namespace(namespace, path='/item')
+
+        app = Flask(__name__)
+        self.metrics = Metrics()
+        self.metrics.init_app(app)
+        app.register_blueprint(blueprint)
+        self.metrics.add_api(api)
+        self.metrics.add_stats('eventer_test_cache', lambda: {'hits': 3, 'hitRatio': 0.75, 'name': 'x'}, ['hits'])
+        self.metrics.add_stats(
+            'eventer_test_pool', lambda: {'primary': {'inUse': 2}, 'replica0': {'inUse': 1}}, label='bind',
+        )
+        self.client = app.test_client()
+
+    def value(self, name, **labels):
+        return self.metrics.registry.get_sample_value(name, labels)
+
+    def testRequestsPerRoute(self):
+        self.client.get('/api/v1/item/')
+        self.client.get('/api/v1/item/')
+        self.client.get('/api/v1/item/1')
+        self.client.get('/missing')
+        self.assertEqual(self.value('eventer_http_requests_total', route='item.ItemList.get', status='200'), 2)
+        self.assertEqual(self.value('eventer_http_requests_total', route='item.ItemApi.get', status='503'), 1)
+        self.assertEqual(self.value('eventer_http_requests_total', route='unmatched', status='404'), 1)
+        self.assertEqual(self.value('eventer_http_request_errors_total', route='item.ItemApi.get'), 1)
+        self.assertEqual(self.value('eventer_http_request_duration_seconds_count', route='item.ItemList.get'), 2)
+        self.assertEqual(self.value('eventer_http_requests_in_progress'), 0)
+
+    def testUnhandledException(self):
+        self.client.application.config['PROPAGATE_EXCEPTIONS'] = True
+        with self.assertRaises(RuntimeError):
+            self.client.post('/api/v1/item/')
+        self.assertEqual(self.value('eventer_http_request_errors_total', route='item.ItemList.post'), 1)
+        self.assertEqual(self.value('eventer_http_requests_in_progress'), 0)
+
+    def testExposition(self):
+        self.client.get('/api/v1/item/')
+        text = self.client.get('/metrics').data.decode()
+        self.assertIn('eventer_http_requests_total{route="item.ItemList.get",status="200"} 1.0', text)
+        self.assertIn('eventer_test_cache_hits_total 3.0', text)
+        self.assertIn('eventer_test_cache_hit_ratio 0.75', text)
+        self.assertNotIn('eventer_test_cache_name', text)
+        self.assertIn('eventer_test_pool_in_use{bind="primary"} 2.0', text)
+        self.assertIn('eventer_test_pool_in_use{bind="replica0"} 1.0', text)
@@ -0,0 +1,62 @@
+import unittest
+
+from apps.services.mock_data import Scale, _Generator, _array, generate
+
+
+class MockDataTestCase(unittest.TestCase):
+    def setUp(self):
+        self.generator = _Generator(seed=1)
+        self.generator._pools()
+        self.generator.genre_ids = [1, 2]
+        self.generator.locations = [(1, 1, 1)]
+
+    def rows(self, rows):
+        columns = next(rows)
+        rows = list(rows)
+        for row in rows:
+            self.assertEqual(len(row), len(columns))
+        return rows
+
+    def testSameSeedSameRows(self):
+        other = _Generator(seed=1)
+        other._pools()
+        other.genre_ids, other.locations = self.generator.genre_ids, self.generator.locations
+        events = range(1, 11)
+        self.assertEqual(self.rows(self.generator._events(10, range(1, 4))), self.rows(other._events(10, range(1, 4))))
+        self.assertEqual(self.rows(self.generator._venues(events)), self.rows(other._venues(events)))
+
+    def testBookingsAreUnique(self):
+        # Пользователей меньше, чем бронирований популярного события
+        rows = self.rows(self.generator._bookings(500, range(1, 21), range(100, 105)))
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertEqual(len(rows), len(self.generator.booking_events))
+        self.assertTrue(all(100 <= user_id < 105 for _, user_id in rows))
+
+    def testSeatsAreUniquePerDate(self):
+        events, dates = range(1, 21), range(1, 61)
+        bookings = self.rows(self.generator._bookings(300, events, range(1, 101)))
+        tickets = self.rows(self.generator._tickets(range(1, len(bookings) + 1), events, dates, 3, 2))
+        self.assertEqual(len(tickets), 2 * len(bookings))
+        seats = [(event_dates_id, seat) for _, _, seat, event_dates_id, _ in tickets]
+        self.assertEqual(len(seats), len(set(seats)))
+        for _, _, _, event_dates_id, booking_id in tickets:
+            event_id = self.generator.booking_events[booking_id - 1]
+            self.assertIn(event_dates_id, range(1 + (event_id - 1) * 3, 1 + event_id * 3))
+
+    def testFavouritesAreUnique(self):
+        rows = [(user_id, organizer_id) for _, user_id, organizer_id
+                in self.rows(self.generator._favourites(200, range(1, 4), range(1, 11)))]
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertLessEqual(len(rows), 30)
+
+    def testArrayLiteral(self):
+        self.assertEqual(_array(['a', 'b "c"', 'd\\e']), '{"a","b \\"c\\"","d\\\\e"}')
+        self.assertEqual(_array([]), '{}')
+
+    def testRejectsEmptyScale(self):
+        with self.assertRaises(ValueError):
+            generate(Scale(events=0))
+
+    def testRejectsScaleOverLimit(self):
+        with self.assertRaisesRegex(ValueError, 'tickets must not exceed 2'):
+            generate(Scale(tickets=3), limit=Scale(tickets=2))
@@ -0,0 +1,104 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from flask import Flask
+from flask_restx import Model, fields
+from werkzeug.exceptions import BadRequest
+
+from apps.models import Feedback
+from apps.utils.pagination import clamp_limit, decode_cursor, encode_cursor, list_cache_key, paginate_list
+from extensions.cache_extension import ReferenceCache
+
+
+class CursorTestCase(unittest.TestCase):
+    def testCursorRoundTrip(self):
+        values = [datetime.datetime(2023, 5, 1, 12, 30), 42]
+        cursor = encode_cursor(values)
+        self.assertEqual(decode_cursor(cursor, [Feedback.dateTime, Feedback.id]), values)
+
+    def testInvalidCursor(self):
+        with self.assertRaises(BadRequest):
+            decode_cursor('not-a-cursor', [Feedback.id])
+        with self.assertRaises(BadRequest):
+            decode_cursor(encode_cursor([1, 2]), [Feedback.id])
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.limit_value = None
+
+    def order_by(self, *columns):
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    def all(self):
+        return self.rows[:self.limit_value]
+
+
+row_model = Model('Row', {'id': fields.Integer()})
+row_page_model = Model('Row page', {
+    'items': fields.List(fields.Nested(row_model)),
+    'nextCursor': fields.String(),
+    'total': fields.Integer(),
+})
+
+
+class PaginateListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(MAX_PAGE_SIZE=20, MAX_LIST_SIZE=50)
+        self.query = FakeQuery([SimpleNamespace(id=i) for i in range(1, 101)])
+
+    def paginate(self, query_string='', base_url=None, cache_namespace=None):
+        with self.app.test_request_context(f'/api/v1/venue/{query_string}', base_url=base_url):
+            return paginate_list(self.query, [Feedback.id], row_model, row_page_model, cache_namespace=cache_namespace)
+
+    def testLimitIsClamped(self):
+        with self.app.app_context():
+            self.assertEqual(clamp_limit(None), 15)
+            self.assertEqual(clamp_limit(1000), 20)
+            self.assertEqual(clamp_limit(0), 15)
+
+    def testPlainListIsCut(self):
+        items, code, headers = self.paginate()
+        self.assertEqual(len(items), 50)
+        self.assertEqual(decode_cursor(headers['X-Next-Cursor'], [Feedback.id]), [50])
+        self.assertIn('limit=20', headers['Link'])
+
+    def testPageEnvelope(self):
+        page = self.paginate('?limit=500')
+        self.assertEqual(len(page['items']), 20)
+        self.assertEqual(decode_cursor(page['nextCursor'], [Feedback.id]), [20])
+        self.assertIsNone(page['total'])
+
+    def testShortListHasNoNextCursor(self):
+        self.query.rows = self.query.rows[:10]
+        items, code, headers = self.paginate()
+        self.assertEqual(len(items), 10)
+        self.assertEqual(headers, {})
+
+    def testCachedListBuildsLinkPerRequest(self):
+        with mock.patch('apps.utils.pagination.cache', ReferenceCache()) as cache:
+            self.paginate('?x=1', 'http://one.example.com', cache_namespace='venue')
+            items, code, headers = self.paginate('?x=2', 'http://two.example.com', cache_namespace='venue')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(len(items), 50)
+        self.assertTrue(headers['Link'].startswith('<http://two.example.com/api/v1/venue/?x=2&cursor='))
+
+    def testCacheKeyIgnoresOtherParameters(self):
+        keys = []
+        for query_string in ('?limit=500&x=1', '?x=2&limit=20', '?limit=20&withTotal=false', '', '?x=1'):
+            with self.app.test_request_context(f'/api/v1/country/{query_string}'):
+                keys.append(list_cache_key())
+        self.assertEqual(len(set(keys[:3])), 1)
+        self.assertEqual(keys[3], keys[4])
+
+
+if __name__ == '__main__':
+    unittest.main()
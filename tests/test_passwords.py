@@ -0,0 +1,54 @@
+import threading
+import unittest
+from unittest import mock
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from apps.services import passwords
+
+
+class PasswordsTestCase(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.config.update(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0)
+        context = app.app_context()
+        context.push()
+        self.addCleanup(context.pop)
+        self.pool = passwords.HashingPool()
+        patcher = mock.patch.object(passwords, 'pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def testHashAndCheck(self):
+        pwhash = passwords.hash_password('secret')
+        self.assertTrue(pwhash.startswith('pbkdf2:sha256:1000$'))
+        self.assertTrue(passwords.check_password(pwhash, 'secret'))
+        self.assertFalse(passwords.check_password(pwhash, 'wrong'))
+        self.assertEqual(self.pool.stats()['calls'], 3)
+
+    def testNeedsRehash(self):
+        self.assertFalse(passwords.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:1000')))
+        self.assertTrue(passwords.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:500')))
+
+    def testBusy(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+
+        # Пул создается по конфигурации приложения при первом вызове
+        passwords.hash_password('secret')
+        worker = threading.Thread(target=self.pool.run, args=(slow,))
+        worker.start()
+        started.wait(5)
+        with self.assertRaises(passwords.HashingBusy):
+            passwords.check_password('pbkdf2:sha256:1000$salt$hash', 'secret')
+        release.set()
+        worker.join()
+        self.assertEqual(self.pool.stats()['rejected'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import unittest
+from unittest import mock
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import NullPool
+
+from apps.config import engine_options
+from extensions.pool_extension import MeteredQueuePool, pool_metrics
+
+
+class PoolMetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = self.create_pool()
+
+    @staticmethod
+    def create_pool():
+        return MeteredQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=1, max_overflow=0, timeout=0.01)
+
+    def testCheckoutAndCheckin(self):
+        connection = self.pool.connect()
+        stats = pool_metrics.stats(self.pool)
+        self.assertEqual((stats['checkouts'], stats['inUse'], stats['size']), (1, 1, 1))
+        connection.close()
+        self.assertEqual(pool_metrics.stats(self.pool)['inUse'], 0)
+        self.assertEqual(pool_metrics.stats(self.pool)['idle'], 1)
+
+    def testTimeout(self):
+        connection = self.pool.connect()
+        with self.assertRaises(TimeoutError):
+            self.pool.connect()
+        stats = pool_metrics.stats(self.pool)
+        self.assertEqual((stats['timeouts'], stats['inUse']), (1, 1))
+        self.assertGreaterEqual(stats['waitMaxMs'], 10)
+        connection.close()
+
+    def testStatsPerBind(self):
+        replica = self.create_pool()
+        connection = self.pool.connect()
+        replica.connect().close()
+        engines = {None: mock.Mock(pool=self.pool), 'replica0': mock.Mock(pool=replica)}
+        stats = pool_metrics.stats_by_bind(engines)
+        self.assertEqual(list(stats), ['primary', 'replica0'])
+        self.assertEqual((stats['primary']['inUse'], stats['replica0']['inUse']), (1, 0))
+        self.assertEqual(stats['replica0']['checkouts'], 1)
+        connection.close()
+
+    def testCountersSurviveRecreate(self):
+        self.pool.connect().close()
+        self.assertEqual(pool_metrics.stats(self.pool.recreate())['checkouts'], 1)
+
+
+class EngineOptionsTestCase(unittest.TestCase):
+    def testFromEnvironment(self):
+        with mock.patch.dict(os.environ, {'DB_POOL_SIZE': '20', 'DB_POOL_PRE_PING': 'false'}):
+            options = engine_options()
+        self.assertEqual(options['pool_size'], 20)
+        self.assertFalse(options['pool_pre_ping'])
+
+    def testPgBouncer(self):
+        with mock.patch.dict(os.environ, {'DB_PGBOUNCER': 'true'}):
+            self.assertEqual(engine_options(), {'poolclass': NullPool})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+from flask import Flask, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, select
+
+from extensions.replica_extension import STICKY_COOKIE, ReplicaRouter, RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+class Item(db.Model):
+    id = Column(Integer, primary_key=True)
+
+
+class ReplicaRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        app.config['SQLALCHEMY_BINDS'] = {'replica0': 'sqlite://'}
+        db.init_app(app)
+        self.router = ReplicaRouter()
+        self.router.init_app(app)
+        self.healthy = mock.patch.object(ReplicaRouter, 'is_healthy', return_value=True)
+        self.healthy.start()
+        self.addCleanup(self.healthy.stop)
+
+        def bind_name():
+            engine = db.session.get_bind(clause=select(Item))
+            return 'replica' if engine is db.engines['replica0'] else 'primary'
+
+        @app.route('/read', methods=['GET', 'POST'])
+        def read():
+            return bind_name()
+
+        @app.route('/write', methods=['POST'])
+        def write():
+            g.db_wrote = True
+            return bind_name()
+
+        @app.route('/lock')
+        def lock():
+            engine = db.session.get_bind(clause=select(Item).with_for_update())
+            return 'replica' if engine is db.engines['replica0'] else 'primary'
+
+        self.app = app
+        self.client = app.test_client()
+
+    def testReadsGoToReplica(self):
+        self.assertEqual(self.client.get('/read').text, 'replica')
+        self.assertEqual(self.client.post('/read').text, 'primary')
+        self.assertEqual(self.client.get('/lock').text, 'primary')
+
+    def testReadYourWrites(self):
+        response = self.client.post('/write', headers={'Authorization': 'Bearer a'})
+        self.assertIsNotNone(response.headers.get('Set-Cookie'))
+        self.assertIn(STICKY_COOKIE, response.headers['Set-Cookie'])
+        self.assertEqual(self.client.get('/read').text, 'primary')
+        # Клиент без cookie узнается по заголовку Authorization
+        self.client.delete_cookie('localhost', STICKY_COOKIE)
+        self.assertEqual(self.client.get('/read', headers={'Authorization': 'Bearer a'}).text, 'primary')
+        self.assertEqual(self.client.get('/read', headers={'Authorization': 'Bearer b'}).text, 'replica')
+
+    def testUnhealthyReplica(self):
+        ReplicaRouter.is_healthy.return_value = False
+        self.assertEqual(self.client.get('/read').text, 'primary')
+
+    def testHealthCheckIsCached(self):
+        self.healthy.stop()
+        with self.app.app_context():
+            engine = db.engines['replica0']
+            # На SQLite функций репликации нет — проверка падает и реплика считается недоступной
+            self.assertFalse(self.router.is_healthy('replica0', engine))
+            with mock.patch.object(engine, 'connect') as connect:
+                self.assertFalse(self.router.is_healthy('replica0', engine))
+            connect.assert_not_called()
+        self.healthy.start()
+
+
+if __name__ == '__main__':
+    unittest.main()
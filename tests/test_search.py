@@ -0,0 +1,102 @@
+import os
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from apps import create_app
+from apps.api.event import EventList, escape_html, to_prefix_tsquery
+from apps.models import Category, Event, Genre, Organizer, StatusEnum, User, ValidateStatusEnum
+from apps.models.models import Role
+from extensions import db
+
+
+def compile_sql(expression) -> str:
+    return str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def query_text(expression) -> str:
+    config, text = expression.compile(dialect=postgresql.dialect()).params.values()
+    return text
+
+
+class PrefixQueryTestCase(unittest.TestCase):
+    def testPrefixForm(self):
+        self.assertEqual(query_text(to_prefix_tsquery('рок фест')), 'рок:* & фест:*')
+
+    def testOperatorsAndPunctuationAreStripped(self):
+        self.assertEqual(
+            query_text(to_prefix_tsquery("jazz & !blues | (soul):* 'x'")), 'jazz:* & blues:* & soul:* & x:*'
+        )
+
+    def testNoWords(self):
+        self.assertIsNone(to_prefix_tsquery(''))
+        self.assertIsNone(to_prefix_tsquery(' &|!():* '))
+
+    def testHighlightTextIsEscaped(self):
+        # Амперсанд экранируется первым, иначе испортились бы уже вставленные сущности
+        self.assertEqual(
+            compile_sql(escape_html(Event.description)),
+            "replace(replace(replace(event.description, '&', '&amp;'), '<', '&lt;'), '>', '&gt;')",
+        )
+
+
+@unittest.skipUnless(os.getenv('TEST_DATABASE_URL'), 'needs a Postgres database in TEST_DATABASE_URL')
+class SearchTestCase(unittest.TestCase):
+    """Full text search of ``GET /event/?search=``; the rows live in a rolled back transaction."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        db.session.merge(Role(id=1, role='user'))
+        user = User(firstName='Test', lastName='Test', middleName='Test', password='-', email='search@example.com')
+        genre = Genre(name='Search', category=Category(name='Search'))
+        self.organizers = [
+            Organizer(name=f'Search {i}', logo='logo', cardNumber='0', cardHolderName='Test', user=user)
+            for i in range(2)
+        ]
+        db.session.add_all(
+            Event(
+                name=name, description=description, organizer=self.organizers[organizer], genre=genre,
+                expectedAmount=0, recommendedDonation=0, validateStatus=ValidateStatusEnum.NOT_REQUIRED,
+                countOfMembers=0, status=StatusEnum.ACTIVE, concession='none',
+            )
+            for name, description, organizer in (
+                ('Zyxwort festival', 'Open air', 0),
+                ('Open air', 'Every zyxwort is welcome <img src=x onerror=alert(1)>', 0),
+                ('Zyxwort night', 'Late', 1),
+            )
+        )
+        db.session.flush()
+
+    def tearDown(self):
+        db.session.rollback()
+        self.context.pop()
+
+    def search(self, text, limit=None, **filters):
+        return EventList.search(Event.query.filter_by(status=StatusEnum.ACTIVE, **filters), text, limit)
+
+    def testNameRanksAboveDescription(self):
+        found = self.search('zyxw')
+        self.assertEqual(len(found), 3)
+        # Совпадение в названии (вес A) выше совпадения в описании (вес B)
+        self.assertEqual(found[-1].name, 'Open air')
+        self.assertGreater(found[0].searchRank, found[-1].searchRank)
+
+    def testOrganizerFilter(self):
+        found = self.search('zyxwort', organizerId=self.organizers[1].id)
+        self.assertEqual([event.name for event in found], ['Zyxwort night'])
+
+    def testLimit(self):
+        self.assertEqual(len(self.search('zyxwort', limit=2)), 2)
+
+    def testHighlightIsEscaped(self):
+        event, = self.search('zyxwort welcome')
+        self.assertIn('<b>zyxwort</b>', event.descriptionHighlight)
+        self.assertIn('&lt;img', event.descriptionHighlight)
+        self.assertNotIn('<img', event.descriptionHighlight)
+
+
+if __name__ == '__main__':
+    unittest.main()
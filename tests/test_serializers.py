@@ -0,0 +1,65 @@
+import datetime
+import unittest
+from decimal import Decimal
+
+from flask_restx import marshal
+
+from apps.api.booking import booking_response_model
+from apps.api.event import event_page_model, event_response_model, event_search_response_model
+from apps.api.feedback import feedback_response_model
+from apps.api.ticket import ticket_response_model
+from apps.models import Booking, Category, City, Event, EventDates, Feedback, Genre, Organizer, StatusEnum, Ticket, \
+    TicketTypeEnum, User, ValidateStatusEnum, Venue
+from apps.utils.serializers import compile_model, serialize
+
+
+def make_event(id):
+    return Event(
+        id=id, name=f'Event {id}', description='Description', expectedAmount=Decimal('1000.50'),
+        recommendedDonation=Decimal('10'), validateStatus=ValidateStatusEnum.REQUIRED, countOfMembers=10,
+        status=StatusEnum.ACTIVE, concession='16+', ratingSum=9, ratingCount=2,
+        genre=Genre(id=1, name='Rock', category=Category(id=1, name='Music')),
+        organizer=Organizer(id=1, name='Organizer', logo='logo.png'),
+        eventDates=[EventDates(
+            id=id, startDateTime=datetime.datetime(2023, 5, 1, 19), endDateTime=datetime.datetime(2023, 5, 1, 23)
+        )],
+        venues=[Venue(id=id, name='Venue', description='Hall', photos=['a.png', 'b.png'], seats=100,
+                      address='Street 1', city=City(id=1, name='City'))],
+    )
+
+
+class SerializerTestCase(unittest.TestCase):
+    def assertSameAsMarshal(self, data, model):
+        self.assertEqual(serialize(data, model), marshal(data, model))
+
+    def testEvent(self):
+        self.assertSameAsMarshal([make_event(1), make_event(2)], event_response_model)
+
+    def testEventWithoutRelationships(self):
+        self.assertSameAsMarshal(Event(id=1, name='Empty'), event_response_model)
+
+    def testEventSearchAndPage(self):
+        event = make_event(1)
+        event.searchRank, event.nameHighlight = 0.5, '<b>Event</b> 1'
+        self.assertSameAsMarshal(event, event_search_response_model)
+        self.assertSameAsMarshal({'items': [event], 'nextCursor': 'abc', 'total': None}, event_page_model)
+
+    def testBookingTicketFeedback(self):
+        event = make_event(1)
+        user = User(id=1, firstName='Ivan', lastName='Ivanov', middleName='Ivanovich', email='ivan@example.com')
+        booking = Booking(id=1, user=user, event=event)
+        ticket = Ticket(
+            id=1, ticketType=TicketTypeEnum.NUMERIC, seat=5, booking=booking, eventDates=event.eventDates[0]
+        )
+        feedback = Feedback(id=1, description='Good', rate=5, dateTime=datetime.datetime(2023, 5, 2), event=event,
+                            user=user, photos=['c.png'])
+        self.assertSameAsMarshal([booking], booking_response_model)
+        self.assertSameAsMarshal([ticket], ticket_response_model)
+        self.assertSameAsMarshal([feedback], feedback_response_model)
+
+    def testCompiledOnce(self):
+        self.assertIs(compile_model(event_response_model), compile_model(event_response_model))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from extensions.slow_query_extension import SlowQueryLog
+
+
+class SlowQueryLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        # Медленным считается любой запрос
+        self.app.config.update(SLOW_QUERY_MS=0.000001, SLOW_QUERY_EXPLAIN_SAMPLE=1, SLOW_QUERY_BUFFER=2)
+        self.log = SlowQueryLog()
+        self.log.init_app(self.app)
+        engine = create_engine('sqlite://')
+
+        @self.app.route('/query/<int:value>')
+        def query(value):
+            with engine.connect() as connection:
+                return str(connection.execute(text('SELECT :value'), {'value': value}).scalar())
+
+        self.client = self.app.test_client()
+
+    def testRecordsRequest(self):
+        with self.assertLogs('eventer.slow_queries', 'WARNING'):
+            self.client.get('/query/7')
+        entry = self.log.entries()[0]
+        self.assertEqual((entry['endpoint'], entry['method'], entry['path']), ('query', 'GET', '/query/7?'))
+        self.assertEqual(entry['statement'], 'SELECT ?')
+        self.assertEqual(entry['parameters'], [7])
+        # EXPLAIN снимается только на Postgres
+        self.assertIsNone(entry['plan'])
+
+    def testBufferIsBounded(self):
+        with self.assertLogs('eventer.slow_queries', 'WARNING'):
+            for value in range(3):
+                self.client.get(f'/query/{value}')
+        self.assertEqual([entry['parameters'] for entry in self.log.entries()], [[2], [1]])
+        self.assertEqual(self.log.total, 3)
+        self.log.clear()
+        self.assertEqual(self.log.entries(), [])
+
+    def testLongParametersAreTruncated(self):
+        with self.assertLogs('eventer.slow_queries', 'WARNING'):
+            self.log.record('SELECT %(text)s', {'text': 'x' * 1000}, 1.0)
+        self.assertEqual(len(self.log.entries()[0]['parameters']['text']), 203)
+
+    def testRedactsWritesAndUserTable(self):
+        with self.assertLogs('eventer.slow_queries', 'WARNING') as logs:
+            self.log.record('INSERT INTO event (name) VALUES (%(name)s)', {'name': 'Concert'}, 1.0)
+            self.log.record(
+                'SELECT "user".id, "user".password FROM "user" WHERE "user".email = %(email)s',
+                {'email': 'test@gmail.com'}, 1.0,
+            )
+        self.assertEqual([entry['parameters'] for entry in self.log.entries()], ['<redacted>', '<redacted>'])
+        self.assertNotIn('test@gmail.com', '\n'.join(logs.output))
+
+        with self.assertLogs('eventer.slow_queries', 'WARNING'):
+            self.log.record('SELECT event.id FROM event WHERE event."userId" = %(id)s', {'id': 3}, 1.0)
+        self.assertEqual(self.log.entries()[0]['parameters'], {'id': 3})
+
+    def testExplainInsideSavepoint(self):
+        conn = mock.Mock()
+        conn.dialect.name = 'postgresql'
+        cursor = conn.connection.cursor.return_value
+        cursor.fetchall.return_value = [('Seq Scan on event',), ('Execution Time: 1.0 ms',)]
+        plan = SlowQueryLog.explain(conn, 'SELECT * FROM event WHERE id = %(id)s', {'id': 1})
+        self.assertEqual(plan, 'Seq Scan on event\nExecution Time: 1.0 ms')
+        self.assertEqual([call.args[0] for call in cursor.execute.call_args_list], [
+            'SAVEPOINT slow_query_explain',
+            'EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM event WHERE id = %(id)s',
+            'RELEASE SAVEPOINT slow_query_explain',
+        ])
+
+    def testFailedExplainRollsBackToSavepoint(self):
+        conn = mock.Mock()
+        conn.dialect.name = 'postgresql'
+        cursor = conn.connection.cursor.return_value
+        cursor.execute.side_effect = lambda sql, *args: (_ for _ in ()).throw(ValueError) if 'EXPLAIN' in sql else None
+        with self.assertLogs('eventer.slow_queries', 'WARNING'):
+            self.assertIsNone(SlowQueryLog.explain(conn, 'SELECT 1', {}))
+        self.assertIn('ROLLBACK TO SAVEPOINT slow_query_explain', [c.args[0] for c in cursor.execute.call_args_list])
@@ -0,0 +1,64 @@
+import unittest
+
+from flask import Flask
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from werkzeug.exceptions import BadRequest
+
+from apps.api.event import event_page_model, event_response_model
+from apps.models import Event, Organizer
+from apps.utils.loaders import loader_options
+from apps.utils.serializers import serialize
+from apps.utils.sparse import fieldset, parse_fields
+
+app = Flask(__name__)
+
+
+def compile_query(query):
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+class SparseFieldsetTestCase(unittest.TestCase):
+    def testParseFields(self):
+        self.assertEqual(
+            parse_fields('id, organizer.logo,organizer.name'), {'id': {}, 'organizer': {'logo': {}, 'name': {}}}
+        )
+        with self.assertRaises(BadRequest):
+            parse_fields(',')
+        with self.assertRaises(BadRequest):
+            parse_fields('organizer..logo')
+
+    def testWithoutFieldsKeepsModels(self):
+        with app.test_request_context('/'):
+            self.assertEqual(
+                fieldset(event_response_model, event_page_model), (event_response_model, event_page_model, False)
+            )
+
+    def testPrunesOutput(self):
+        event = Event(id=1, name='Event', description='Long text', organizer=Organizer(id=2, name='Org', logo='a.png'))
+        with app.test_request_context('/?fields=name,organizer.logo'):
+            selected = fieldset(event_response_model, event_page_model)
+            self.assertTrue(selected.sparse)
+            self.assertEqual(serialize(event, selected.model), {'name': 'Event', 'organizer': {'logo': 'a.png'}})
+            self.assertEqual(list(selected.page.resolved), list(event_page_model.resolved))
+            self.assertIs(fieldset(event_response_model, event_page_model), selected)
+
+    def testUnknownField(self):
+        for value in ('secret', 'organizer.secret', 'name.first'):
+            with app.test_request_context(f'/?fields={value}'), self.assertRaises(BadRequest):
+                fieldset(event_response_model)
+
+    def testLoadsOnlyRequestedColumns(self):
+        with app.test_request_context('/?fields=id,name,organizer.name'):
+            selected = fieldset(event_response_model)
+        sql = compile_query(select(Event).options(*loader_options(selected.model, Event, only=selected.sparse)))
+        self.assertIn('event.name', sql)
+        self.assertIn('organizer_1.name', sql)
+        self.assertNotIn('event.description', sql)
+        self.assertNotIn('organizer_1.logo', sql)
+        self.assertNotIn('count(booking.id)', sql)
+        self.assertNotIn('genre', sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
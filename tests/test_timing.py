@@ -0,0 +1,52 @@
+import json
+import re
+import unittest
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+
+from extensions.timing_extension import RequestTiming
+
+
+class RequestTimingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.timing = RequestTiming()
+        engine = create_engine('sqlite://')
+
+        @self.app.route('/items/<int:count>')
+        def items(count):
+            with engine.connect() as connection:
+                rows = [connection.execute(text('SELECT :id'), {'id': i}).scalar() for i in range(count)]
+            with self.timing.measure('marshal'):
+                return jsonify(rows)
+
+        self.client = self.app.test_client()
+
+    def testServerTiming(self):
+        self.timing.init_app(self.app)
+        header = self.client.get('/items/3').headers['Server-Timing']
+        self.assertIn('desc="3 statements"', header)
+        self.assertEqual(re.findall(r'(\w+);dur=', header), ['db', 'marshal', 'app', 'total'])
+
+    def testStatementsThreshold(self):
+        self.app.config['REQUEST_STATEMENTS_THRESHOLD'] = 2
+        self.timing.init_app(self.app)
+        with self.assertLogs('eventer.requests', 'INFO') as logs:
+            self.client.get('/items/2')
+            self.client.get('/items/5')
+        self.assertEqual([record.levelname for record in logs.records], ['INFO', 'WARNING'])
+        entry = json.loads(logs.records[1].getMessage())
+        self.assertEqual((entry['endpoint'], entry['statements'], entry['status']), ('items', 5, 200))
+
+    def testServerTimingCanBeTurnedOff(self):
+        self.app.config['SERVER_TIMING'] = False
+        self.timing.init_app(self.app)
+        self.assertNotIn('Server-Timing', self.client.get('/items/1').headers)
+
+    def testStatementsOutsideRequestsAreIgnored(self):
+        self.timing.init_app(self.app)
+        with self.app.app_context():
+            self.assertIsNone(self.timing.current())
+            with self.timing.measure('marshal'):
+                pass
@@ -0,0 +1,50 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+
+from apps.services import versions
+from apps.utils.etag import etag
+
+
+class VersionBumpTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(versions, 'db')
+        self.db = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.connection = self.db.engine.connect.return_value.__enter__.return_value
+
+    def bump(self, *tables):
+        session = SimpleNamespace(info={})
+        versions.mark_changed(session, *tables)
+        versions._bump(session)
+        self.assertNotIn('changed_tables', session.info)
+
+    def testOnlyVersionedTablesAreBumped(self):
+        self.bump('ticket', 'booking', 'eventDates')
+        statement, = self.connection.execute.call_args.args
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.assertIn('''nextval('"tableVersion_booking"')''', sql)
+        self.assertIn('''nextval('"tableVersion_eventDates"')''', sql)
+        self.assertNotIn('ticket', sql)
+        self.connection.commit.assert_called_once()
+
+    def testUnversionedWritesSkipTheDatabase(self):
+        self.bump('ticket', 'organizerStats')
+        self.db.engine.connect.assert_not_called()
+
+    def testFailedBumpDoesNotFailTheRequest(self):
+        self.connection.execute.side_effect = RuntimeError('connection lost')
+        with self.assertLogs('eventer.versions', 'ERROR'):
+            self.bump('booking')
+
+
+class VersionedTablesTestCase(unittest.TestCase):
+    def testEtagNeedsVersionedTables(self):
+        with self.assertRaisesRegex(ValueError, 'ticket'):
+            etag('event', 'ticket')
+
+
+if __name__ == '__main__':
+    unittest.main()